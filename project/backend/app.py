@@ -1,9 +1,15 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file
 from flask_cors import CORS
-from pymongo import MongoClient
 from dotenv import load_dotenv
 import os
 
+from services.thread_budget import ThreadBudget, status as thread_budget_status
+
+load_dotenv()
+
+# Thread caps must be in the environment before NumPy (BLAS) is imported
+thread_budget = ThreadBudget.from_env().apply()
+
 try:
     from flask_pymongo import PyMongo
 except ImportError:
@@ -11,379 +17,421 @@ except ImportError:
 from datetime import datetime, timedelta
 import os
 import pandas as pd
-import numpy as np
 import json
-try:
-    import pickle
-except ImportError:
-    pickle = None
-try:
-    from tensorflow.keras.models import load_model
-except ImportError:
-    load_model = None
-try:
-    import joblib
-except ImportError:
-    joblib = None
-from pathlib import Path
 try:
     from bson import ObjectId
 except ImportError:
     ObjectId = None
-from tensorflow.keras.losses import MeanSquaredError
+from services.forecast_store import ForecastStore, ForecastAccessLog, FORECAST_COLUMNS, export_frame
+from services.persistence import MongoPersistence
+from services.retention import ForecastRetentionManager, RollupScheduler
+from services.ensemble import inverse_error_weights, ensemble_forecast
+from services.model_loader import ModelDataLoader, ModelPublishWatcher, MODEL_TYPES
+from services.single_flight import SingleFlight, SingleFlightTimeout
+from services.admission import AdmissionController
+from services.precompute import (
+    MaterializedForecastStore, ForecastPrecomputer, PrecomputeScheduler, STANDARD_CONFIDENCE
+)
+from services.memory import process_memory
+from services.streaming import STREAM_FORMATS, STREAM_HEADERS, forecast_events, encode_events
+from services.hierarchy import HierarchicalForecaster, RECONCILIATION_METHODS
+from services.economic_snapshot import EconomicSnapshotService
+from services.data_quality import screen_upload
+from services.artifact_graph import dashboard_artifacts
+from services.wire_format import JSON_MIMETYPE, negotiate, forecast_columns, encode_columns
+from concurrent.futures import ThreadPoolExecutor
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)
 
-load_dotenv()
-
 # Get Mongo URI from environment
 mongo_uri = os.getenv("MONGO_URI")
 
-# MongoDB configuration
-try:
-    mongo_client = MongoClient(mongo_uri)
-    mongo_db = mongo_client["growthiq"]
-    print("✅ Connected to MongoDB Atlas")
-except Exception as e:
-    mongo_db = None
-    print(f"❌ MongoDB connection failed: {e}")
-
-
-# Model and Data Loader Class
-class ModelDataLoader:
-    def __init__(self):
-        self.base_path = Path(__file__).parent
-        self.model_path = self.base_path / 'model'
-        self.data_path = self.base_path / 'data'
-        self.output_path = self.base_path / 'output'
-
-        # Ensure directories exist
-        self.model_path.mkdir(exist_ok=True)
-        self.data_path.mkdir(exist_ok=True)
-        self.output_path.mkdir(exist_ok=True)
-
-        self.lstm_model = None
-        self.sarima_model = None
-        self.scaler = None
-        self.fred_data = None
-        self.model_metrics = None
-        self.scenario_inputs = None
-
-        self._load_models_and_data()
-
-    def _load_models_and_data(self):
-        """Load pre-trained models and data files"""
-        try:
-            # Load LSTM model
-            lstm_path = self.model_path / 'lstm_model.h5'
-            if lstm_path.exists():
-                try:
-                    self.lstm_model = load_model(str(lstm_path), compile=False)
-                    self.lstm_model.compile(loss=MeanSquaredError())
-                    print("✅ LSTM model loaded and compiled successfully")
-                except Exception as e:
-                    print(f"❌ Error loading LSTM model: {e}")
-                    self.lstm_model = None
-            else:
-                print("⚠️ LSTM model file not found")
-
-            # Load SARIMA model
-            sarima_path = self.model_path / 'sarima_model.pkl'
-            if sarima_path.exists():
-                try:
-                    # First attempt with joblib
-                    try:
-                        self.sarima_model = joblib.load(sarima_path)
-                        print("✅ SARIMA model loaded successfully (joblib)")
-                    except Exception as joblib_err:
-                        print(f"⚠️ joblib failed, trying pickle: {joblib_err}")
-                        # Fallback to pickle
-                        with open(sarima_path, 'rb') as f:
-                            self.sarima_model = pickle.load(f)
-                        print("✅ SARIMA model loaded successfully (pickle)")
-                except Exception as e:
-                    print(f"❌ Failed to load SARIMA model: {e}")
-                    self.sarima_model = None
-            else:
-                print("⚠️ SARIMA model file not found")
-
-            # Load Scaler
-            scaler_path = self.model_path / 'scaler.pkl'
-            if scaler_path.exists():
-                try:
-                    self.scaler = joblib.load(scaler_path)
-                    print("✅ Scaler loaded successfully")
-                except Exception as e:
-                    print(f"❌ Error loading scaler: {e}")
-                    self.scaler = None
-            else:
-                print("⚠️ Scaler file not found")
-
-            # Load additional data files
-            self._load_data_files()
-
-        except Exception as e:
-            print(f"❌ Unexpected error during model/data loading: {e}")
-    
-    def _load_data_files(self):
-        """Load CSV data files"""
-        try:
-            # Load FRED series data
-            fred_path = self.data_path / 'fred_series.csv'
-            if fred_path.exists():
-                self.fred_data = pd.read_csv(fred_path)
-                print("✅ FRED data loaded successfully")
-            
-            # Load model metrics
-            metrics_path = self.data_path / 'model_metrics.csv'
-            if metrics_path.exists():
-                self.model_metrics = pd.read_csv(metrics_path)
-                print("✅ Model metrics loaded successfully")
-            
-            # Load scenario inputs
-            scenario_path = self.data_path / 'scenario_inputs.csv'
-            if scenario_path.exists():
-                self.scenario_inputs = pd.read_csv(scenario_path)
-                print("✅ Scenario inputs loaded successfully")
-                
-        except Exception as e:
-            print(f"Error loading data files: {e}")
-    
-    def generate_forecast(self, model_type='lstm', periods=12):
-        """Generate forecast using pre-trained models"""
-        try:
-            if model_type == 'lstm' and self.lstm_model is not None:
-                return self._lstm_forecast(periods)
-            elif model_type == 'sarima' and self.sarima_model is not None:
-                return self._sarima_forecast(periods)
-            else:
-                # Fallback to mock data if models not available
-                return self._generate_mock_forecast(model_type, periods)
-                
-        except Exception as e:
-            print(f"Error generating forecast: {e}")
-            return self._generate_mock_forecast(model_type, periods)
-
-    def _lstm_forecast(self, periods):
-        """Generate LSTM forecast using pre-trained model"""
-        if self.lstm_model is None or self.scaler is None or self.fred_data is None:
-            print("❌ Required components not loaded for LSTM forecast")
-            return None
-
-        try:
-            # Step 1: Get the last N steps of historical data
-            data = self.fred_data.copy()
-            last_n = 12  # number of time steps used in training
-            last_values = data['Revenue'].values[-last_n:]
-
-            # Step 2: Scale data
-            scaled_values = self.scaler.transform(last_values.reshape(-1, 1))
+# Preload-and-fork mode (gunicorn.conf.py): the master process loads data and
+# models once; database clients, background threads and TensorFlow are set up
+# in each worker after the fork
+PRELOAD_MODE = os.getenv('GROWTHIQ_PRELOAD', 'false').lower() in ('1', 'true', 'yes')
 
-            # Step 3: Predict iteratively
-            forecast = []
-            input_seq = scaled_values.reshape(1, last_n, 1)
-            for _ in range(periods):
-                next_pred = self.lstm_model.predict(input_seq, verbose=0)
-                forecast.append(next_pred[0, 0])
-                # Append prediction and slide window
-                input_seq = np.append(input_seq[:, 1:, :], [[[next_pred[0, 0]]]], axis=1)
+persistence = None
+mongo_db = None
+forecast_store = None
+retention_manager = None
+rollup_scheduler = None
+access_log = None
 
-            # Step 4: Inverse transform
-            forecast = self.scaler.inverse_transform(np.array(forecast).reshape(-1, 1)).flatten()
+def init_database(client=None):
+    """
+    Connect to MongoDB and create forecast and retention indexes
 
-            # Step 5: Create forecast DataFrame
-            last_date = pd.to_datetime(data['Date'].iloc[-1])
-            future_dates = pd.date_range(start=last_date + pd.DateOffset(months=1), periods=periods, freq='MS')
+    Args:
+        client: Pre-built client (e.g. mongomock in the load-test harness)
+    """
+    global persistence, mongo_db, forecast_store, retention_manager
 
-            forecast_df = pd.DataFrame({'Date': future_dates, 'Forecast': forecast})
-            return forecast_df
+    # MongoDB configuration (pooled client behind a circuit breaker)
+    try:
+        persistence = MongoPersistence(mongo_uri, db_name="growthiq", client=client)
+        mongo_db = persistence.db
+        print("✅ Connected to MongoDB Atlas" if client is None else "✅ Using the provided MongoDB client")
+    except Exception as e:
+        persistence = None
+        mongo_db = None
+        print(f"❌ MongoDB connection failed: {e}")
 
+    # Run-centric forecast storage
+    forecast_store = ForecastStore(mongo_db) if mongo_db is not None else None
+    if forecast_store is not None:
+        try:
+            persistence.call(forecast_store.ensure_indexes)
         except Exception as e:
-            print(f"❌ LSTM forecast error: {e}")
-            return None
-
-    def _sarima_forecast(self, periods):
-        """Generate SARIMA forecast using pre-trained model"""
-        if self.sarima_model is None or self.fred_data is None:
-            print("❌ SARIMA model or data not loaded")
-            return None
+            print(f"⚠️ Forecast index creation failed: {e}")
 
+    # Retention (TTL expiry) and background daily rollups of forecast history
+    retention_manager = ForecastRetentionManager(mongo_db) if mongo_db is not None else None
+    if retention_manager is not None:
         try:
-            # Step 1: Forecast future periods
-            forecast_values = self.sarima_model.forecast(steps=periods)
+            persistence.call(retention_manager.ensure_indexes)
+        except Exception as e:
+            print(f"⚠️ Retention index creation failed: {e}")
 
-            # Step 2: Generate future dates
-            last_date = pd.to_datetime(self.fred_data['Date'].iloc[-1])
-            future_dates = pd.date_range(start=last_date + pd.DateOffset(months=1), periods=periods, freq='MS')
+# Shared pool for running model forecasts concurrently (TensorFlow and
+# statsmodels both release the GIL for most of their numeric work); sized by
+# the thread budget so executor x intra-op threads fit the worker's share
+forecast_executor = ThreadPoolExecutor(
+    max_workers=thread_budget.executor_workers,
+    thread_name_prefix='forecast'
+)
 
-            # Step 3: Format result as DataFrame
-            forecast_df = pd.DataFrame({
-                'Date': future_dates,
-                'Forecast': forecast_values
-            })
+# Per-endpoint-class concurrency limits; cheap endpoints get their own lane
+admission = AdmissionController()
 
-            return forecast_df
+# Coalesces identical concurrent forecast requests into one computation
+forecast_flight = SingleFlight()
+FORECAST_COALESCE_TIMEOUT = float(os.getenv('FORECAST_COALESCE_TIMEOUT_SECONDS', 30))
 
-        except Exception as e:
-            print(f"❌ SARIMA forecast error: {e}")
-            return None
+# Initialize model loader (TensorFlow is left to the workers in preload mode)
+model_loader = ModelDataLoader(defer_lstm=PRELOAD_MODE)
 
-    def _generate_mock_forecast(self, model_type, periods):
-        """Generate mock forecast data for demonstration"""
-        base_revenue = 1000000
-        forecasts = []
-        
-        for i in range(periods):
-            date = datetime.now() + timedelta(days=30 * (i + 1))
-            
-            # Different patterns for different models
-            if model_type == 'lstm':
-                trend = 0.02 * i
-                seasonal = np.sin((i * np.pi) / 6) * 0.08
-                noise = np.random.normal(0, 0.015)
-            else:  # sarima
-                trend = 0.015 * i
-                seasonal = np.sin((i * np.pi) / 6) * 0.1
-                noise = np.random.normal(0, 0.02)
-            
-            base_projection = base_revenue * (1 + trend + seasonal + noise)
-            
-            forecasts.append({
-                'date': date.strftime('%Y-%m-%d'),
-                'forecasted_revenue': round(base_projection),
-                'growth_5': round(base_projection * 1.05),
-                'growth_10': round(base_projection * 1.10),
-                'decline_5': round(base_projection * 0.95),
-            })
-        
-        return forecasts
-    
-    def get_model_metrics(self):
-        """Get model performance metrics"""
-        if self.model_metrics is not None:
-            return self.model_metrics.to_dict('records')
-        
-        # Mock metrics if file not available
-        return [
-            {
-                'model_type': 'lstm',
-                'rmse': 111.6,
-                'mae': 8.2,
-                'mse': 12450,
-                'accuracy': 0.874
-            },
-            {
-                'model_type': 'sarima',
-                'rmse': 114.9,
-                'mae': 9.1,
-                'mse': 13200,
-                'accuracy': 0.852
-            }
-        ]
-    
-    def get_historical_data(self):
-        """Get historical FRED data"""
-        if self.fred_data is not None:
-            return self.fred_data.to_dict('records')
-        
-        # Mock historical data if file not available
-        dates = pd.date_range(start='2020-01-01', end='2023-12-01', freq='MS')
-        base_revenue = 950000
-        
-        historical = []
-        for i, date in enumerate(dates):
-            trend = 0.01 * i
-            seasonal = np.sin((i * np.pi) / 6) * 0.1
-            noise = np.random.normal(0, 0.05)
-            
-            revenue = base_revenue * (1 + trend + seasonal + noise)
-            historical.append({
-                'date': date.strftime('%Y-%m-%d'),
-                'revenue': round(revenue)
-            })
-        
-        return historical
-    
-    def get_scenario_data(self):
-        """Get scenario planning data"""
-        if self.scenario_inputs is not None:
-            return self.scenario_inputs.to_dict('records')
-        
-        # Mock scenario data
-        return [
-            {'scenario': 'base', 'growth_rate': 0.0, 'description': 'Current trajectory'},
-            {'scenario': 'optimistic_5', 'growth_rate': 0.05, 'description': '5% growth scenario'},
-            {'scenario': 'optimistic_10', 'growth_rate': 0.10, 'description': '10% growth scenario'},
-            {'scenario': 'pessimistic', 'growth_rate': -0.05, 'description': '5% decline scenario'}
-        ]
+def _persist_forecast(model_type, periods, forecasts, user_id='anonymous', scenario='base', model_version=None):
+    """
+    Store a forecast run, returning its run ID (None if the database is unavailable)
 
-# Initialize model loader
-model_loader = ModelDataLoader()
+    Args:
+        model_version: Version that produced the forecast ('mock' for a
+            fallback); defaults to the loaded model's
+    """
+    if forecast_store is None:
+        return None
+
+    try:
+        run_id, _ = persistence.call(
+            forecast_store.save_run,
+            model_type,
+            periods,
+            forecasts,
+            model_loader.forecast_hash(model_type, periods, scenario, model_version),
+            user_id=user_id
+        )
+        return run_id
+    except Exception as e:
+        print(f"⚠️ MongoDB save failed: {e}")
+        return None
+
+def _generate_and_persist(model_type, periods, confidence=0.95, user_id='anonymous', scenario='base'):
+    """Generate a forecast and store its run; returns (forecasts, run_id)"""
+    forecasts, model_version = model_loader.generate_forecast_with_version(model_type, periods, confidence, scenario)
+    if not forecasts:
+        return None, None
+    return forecasts, _persist_forecast(model_type, periods, forecasts, user_id, scenario, model_version)
+
+# Coherent forecasts for every node of the revenue hierarchy
+hierarchical_forecaster = HierarchicalForecaster(model_loader)
+
+# Standard-horizon forecasts, rematerialized after each model publish or exog update
+materialized_forecasts = MaterializedForecastStore(
+    os.getenv('PRECOMPUTE_STORE_PATH', model_loader.output_path / 'materialized_forecasts.json')
+)
+forecast_precomputer = ForecastPrecomputer(
+    model_loader,
+    materialized_forecasts,
+    MODEL_TYPES,
+    persist=lambda model_type, periods, forecasts: _persist_forecast(model_type, periods, forecasts, 'precompute')
+)
+# Derived files (stats, metrics, scenarios, exports, plots) rebuilt with the
+# forecasts, each only when its inputs changed
+artifact_graph = dashboard_artifacts(model_loader, forecast_precomputer, max_workers=thread_budget.executor_workers)
+precompute_scheduler = PrecomputeScheduler(forecast_precomputer, artifact_graph)
+
+# Model publishes reach every worker through a shared marker file
+publish_watcher = ModelPublishWatcher(
+    model_loader, model_loader.output_path / 'model_publish.json', on_reload=precompute_scheduler.trigger
+)
+
+def _on_economic_change(observations):
+    """Realign SARIMAX regressors from new FRED data; rematerialize if they changed"""
+    if model_loader.update_exog(observations):
+        precompute_scheduler.trigger('exog_update')
+
+# Economic indicators and recession risk from FRED, refreshed in the background
+# (None without a FRED API key)
+economic_snapshot = EconomicSnapshotService.from_env(on_change=_on_economic_change)
+
+def init_worker(mongo_client=None, rollups=True):
+    """
+    Per-process setup: database, deferred LSTM and background threads
+
+    Args:
+        mongo_client: Pre-built client passed to init_database
+        rollups: Start the background rollup thread (the load-test harness
+            turns it off: mongomock has no $merge)
+    """
+    global rollup_scheduler, access_log
+
+    init_database(mongo_client)
+    if model_loader.defer_lstm:
+        model_loader.load_lstm()
+
+    if retention_manager is not None and rollups:
+        rollup_scheduler = RollupScheduler(retention_manager, persistence)
+        rollup_scheduler.start()
+    if forecast_store is not None:
+        access_log = ForecastAccessLog(lambda hits: persistence.call(forecast_store.record_accesses, hits))
+        access_log.start()
+    precompute_scheduler.start()
+    publish_watcher.start()
+    if economic_snapshot is not None:
+        economic_snapshot.start()
+
+def _negotiated_response(payload, records_key, columns, wire):
+    """
+    Respond as JSON, or with one record field as columns in the negotiated type
+
+    Args:
+        payload: JSON response body
+        records_key: Payload field holding the row records
+        columns: Callable returning those records as column arrays
+        wire: Response type from :func:`negotiate`
+    """
+    if wire == JSON_MIMETYPE:
+        response = jsonify(payload)
+    else:
+        meta = {k: v for k, v in payload.items() if k != records_key}
+        body, mimetype = encode_columns(columns(), meta, wire)
+        response = Response(body, mimetype=mimetype)
+    response.headers['Vary'] = 'Accept'
+    return response
+
+# In preload mode gunicorn's post_fork hook calls init_worker() instead
+if not PRELOAD_MODE:
+    init_worker()
 
 # API Routes
 @app.route('/api/forecast', methods=['GET'])
+@admission.limit('forecast')
 def get_forecast():
     """Get revenue forecast from specified model"""
     model_type = request.args.get('model', 'lstm')
     periods = int(request.args.get('periods', 12))
+    confidence = float(request.args.get('confidence', 0.95))
+    scenario = request.args.get('scenario', 'base')
+    wire = negotiate(request.accept_mimetypes)
     
-    if model_type not in ['lstm', 'sarima']:
+    if model_type not in MODEL_TYPES:
         return jsonify({'error': 'Invalid model type. Use lstm or sarima'}), 400
+    if not 0 < confidence < 1:
+        return jsonify({'error': 'Confidence must be between 0 and 1'}), 400
+    if scenario not in model_loader.exog_scenarios:
+        return jsonify({'error': f'Unknown scenario. Use one of: {", ".join(model_loader.exog_scenarios)}'}), 400
+    
+    # Standard dashboard requests are a keyed lookup in the materialized store
+    if confidence == STANDARD_CONFIDENCE and scenario == 'base':
+        content_hash = model_loader.forecast_hash(model_type, periods)
+        entry = materialized_forecasts.get(model_type, periods, content_hash)
+        if entry is not None:
+            # Recorded like a live request (access entry, renewed run TTL), but
+            # queued and written in batches so the hit does no database I/O
+            if access_log is not None:
+                access_log.record(model_type, periods, entry['forecasts'], content_hash,
+                                  entry['run_id'], request.args.get('user_id', 'anonymous'))
+            metrics = model_loader.get_model_metrics()
+            return _negotiated_response({
+                'model': model_type,
+                'periods': periods,
+                'scenario': scenario,
+                'forecasts': entry['forecasts'],
+                'run_id': entry['run_id'],
+                'metrics': next((m for m in metrics if m.get('model_type') == model_type), {}),
+                'generated_at': entry['materialized_at'],
+                'materialized': True,
+                'version': '1.0.0'
+            }, 'forecasts', lambda: forecast_columns(entry['forecasts']), wire)
     
     try:
-        # Generate forecast using pre-trained models
-        forecasts = model_loader.generate_forecast(model_type, periods)
+        # Generate forecast using pre-trained models and save the run to
+        # MongoDB; identical concurrent requests share one computation
+        forecasts, run_id = forecast_flight.do(
+            ('forecast', model_type, periods, confidence, scenario),
+            _generate_and_persist, model_type, periods, confidence,
+            request.args.get('user_id', 'anonymous'), scenario,
+            timeout=FORECAST_COALESCE_TIMEOUT
+        )
 
         if not forecasts:
             return jsonify({'error': 'Forecast generation failed'}), 500
-        # Save forecast run to MongoDB
-        if mongo_db:
-            try:
-                forecast_run = {
-                    'model_type': model_type,
-                    'periods': periods,
-                    'forecast_data': forecasts,
-                    'user_id': request.args.get('user_id', 'anonymous'),
-                    'created_at': datetime.utcnow()
-                }
-                mongo_db.db.forecast_runs.insert_one(forecast_run)
-                
-                # Save individual forecasts to MongoDB
-                forecast_documents = []
-                for forecast_data in forecasts:
-                    forecast_documents.append({
-                        'date': datetime.strptime(forecast_data['date'], '%Y-%m-%d'),
-                        'forecasted_revenue': forecast_data['forecasted_revenue'],
-                        'growth_5': forecast_data['growth_5'],
-                        'growth_10': forecast_data['growth_10'],
-                        'decline_5': forecast_data['decline_5'],
-                        'model_type': model_type,
-                        'created_at': datetime.utcnow()
-                    })
-                
-                if forecast_documents:
-                    mongo_db.db.forecasts.insert_many(forecast_documents)
-            except Exception as e:
-                print(f"⚠️ MongoDB save failed: {e}")
         
         # Get model metrics
         metrics = model_loader.get_model_metrics()
-        model_metric = next((m for m in metrics if m['model_type'] == model_type), {})
+        model_metric = next((m for m in metrics if m.get('model_type') == model_type), {})
         
-        return jsonify({
+        return _negotiated_response({
             'model': model_type,
             'periods': periods,
+            'scenario': scenario,
             'forecasts': forecasts,
+            'run_id': run_id,
             'metrics': model_metric,
             'generated_at': datetime.utcnow().isoformat(),
             'version': '1.0.0'
+        }, 'forecasts', lambda: forecast_columns(forecasts), wire)
+        
+    except SingleFlightTimeout as e:
+        return jsonify({'error': str(e)}), 504
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/forecast/stream', methods=['GET'])
+def stream_forecast():
+    """Stream forecast points as server-sent events (or NDJSON) while they are computed"""
+    model_type = request.args.get('model', 'lstm')
+    periods = int(request.args.get('periods', 12))
+    confidence = float(request.args.get('confidence', 0.95))
+    stream_format = request.args.get('format', 'sse')
+    block_size = max(int(request.args.get('block', 1)), 1)
+    user_id = request.args.get('user_id', 'anonymous')
+    scenario = request.args.get('scenario', 'base')
+    
+    if model_type not in MODEL_TYPES:
+        return jsonify({'error': 'Invalid model type. Use lstm or sarima'}), 400
+    if not 0 < confidence < 1:
+        return jsonify({'error': 'Confidence must be between 0 and 1'}), 400
+    if scenario not in model_loader.exog_scenarios:
+        return jsonify({'error': f'Unknown scenario. Use one of: {", ".join(model_loader.exog_scenarios)}'}), 400
+    if stream_format not in STREAM_FORMATS:
+        return jsonify({'error': f'Invalid format. Use {" or ".join(STREAM_FORMATS)}'}), 400
+    
+    # Filled in by iter_forecast with the model version that produced the stream
+    source = {}
+    events = forecast_events(
+        {
+            'model': model_type,
+            'periods': periods,
+            'scenario': scenario,
+            'confidence': confidence,
+            'generated_at': datetime.utcnow().isoformat(),
+            'version': '1.0.0'
+        },
+        model_loader.iter_forecast(model_type, periods, confidence, block_size, state=source, scenario=scenario),
+        # The complete forecast is stored like a regular /api/forecast run
+        on_complete=lambda forecasts: {
+            'run_id': _persist_forecast(model_type, periods, forecasts, user_id, scenario,
+                                        source.get('model_version'))
+        }
+    )
+    
+    # The forecast slot is held for the whole stream, not just this function
+    stream = admission.admit_stream('forecast', encode_events(events, stream_format))
+    if isinstance(stream, tuple):
+        return stream
+    
+    mimetype, _ = STREAM_FORMATS[stream_format]
+    return Response(stream, mimetype=mimetype, headers=STREAM_HEADERS)
+
+@app.route('/api/forecast/compare', methods=['GET'])
+@admission.limit('forecast')
+def compare_forecasts():
+    """Run LSTM and SARIMA forecasts concurrently and add an error-weighted ensemble"""
+    periods = int(request.args.get('periods', 12))
+    user_id = request.args.get('user_id', 'anonymous')
+    
+    try:
+        # Both models (and the cached backtest) run in parallel, so latency is
+        # close to the slower model rather than the sum
+        forecast_futures = {
+            model_type: forecast_executor.submit(
+                forecast_flight.do,
+                ('forecast', model_type, periods, 0.95, 'base'),
+                _generate_and_persist, model_type, periods, 0.95, user_id,
+                timeout=FORECAST_COALESCE_TIMEOUT
+            )
+            for model_type in MODEL_TYPES
+        }
+        errors_future = forecast_executor.submit(model_loader.backtest_errors)
+        
+        results = {model_type: future.result() for model_type, future in forecast_futures.items()}
+        forecasts = {model_type: result[0] for model_type, result in results.items()}
+        backtest_errors = errors_future.result()
+        
+        if not all(forecasts.values()):
+            failed = [m for m, f in forecasts.items() if not f]
+            return jsonify({'error': f'Forecast generation failed for: {", ".join(failed)}'}), 500
+        
+        weights = inverse_error_weights(backtest_errors)
+        metrics = model_loader.get_model_metrics()
+        
+        models = {}
+        for model_type in MODEL_TYPES:
+            models[model_type] = {
+                'forecasts': forecasts[model_type],
+                'run_id': results[model_type][1],
+                'metrics': next((m for m in metrics if m.get('model_type') == model_type), {}),
+                'backtest_rmse': backtest_errors.get(model_type),
+                'weight': weights[model_type]
+            }
+        
+        return jsonify({
+            'periods': periods,
+            'models': models,
+            'ensemble': {
+                'forecasts': ensemble_forecast(forecasts, weights),
+                'weights': weights
+            },
+            'generated_at': datetime.utcnow().isoformat(),
+            'version': '1.0.0'
         })
         
+    except SingleFlightTimeout as e:
+        return jsonify({'error': str(e)}), 504
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/forecast/hierarchy', methods=['GET'])
+@admission.limit('forecast')
+def get_hierarchical_forecast():
+    """Forecast every node of the revenue hierarchy and reconcile the levels"""
+    model_type = request.args.get('model', 'sarima')
+    periods = int(request.args.get('periods', 12))
+    method = request.args.get('method', 'mint_diag')
+    levels = [level for level in request.args.get('level', '').split(',') if level] or None
+    
+    if model_type not in MODEL_TYPES:
+        return jsonify({'error': 'Invalid model type. Use lstm or sarima'}), 400
+    if method not in RECONCILIATION_METHODS:
+        return jsonify({'error': f'Invalid method. Use {", ".join(RECONCILIATION_METHODS)}'}), 400
+    
+    try:
+        result = forecast_flight.do(
+            ('hierarchy', model_type, periods, method, tuple(levels or ())),
+            hierarchical_forecaster.forecast, model_type, periods, method, levels,
+            timeout=FORECAST_COALESCE_TIMEOUT
+        )
+        return jsonify(result)
+    except SingleFlightTimeout as e:
+        return jsonify({'error': str(e)}), 504
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/metrics', methods=['GET'])
+@admission.limit('light')
 def get_metrics():
     """Get model performance metrics"""
     try:
@@ -396,18 +444,20 @@ def get_metrics():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/historical', methods=['GET'])
+@admission.limit('light')
 def get_historical():
     """Get historical FRED data"""
     try:
-        historical_data = model_loader.get_historical_data()
-        return jsonify({
-            'historical_data': historical_data,
-            'timestamp': datetime.utcnow().isoformat()
-        })
+        wire = negotiate(request.accept_mimetypes)
+        payload = {'timestamp': datetime.utcnow().isoformat()}
+        if wire == JSON_MIMETYPE:
+            payload['historical_data'] = model_loader.get_historical_data()
+        return _negotiated_response(payload, 'historical_data', model_loader.historical_columns, wire)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/scenario', methods=['GET'])
+@admission.limit('light')
 def get_scenario():
     """Get scenario planning data"""
     try:
@@ -419,72 +469,140 @@ def get_scenario():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/economic', methods=['GET'])
+@admission.limit('light')
+def get_economic():
+    """Get the economic indicator and recession risk snapshot (served from memory)"""
+    if economic_snapshot is None:
+        return jsonify({'error': 'FRED API not configured'}), 503
+    if not economic_snapshot.loaded:
+        return jsonify({'error': 'Economic data not loaded yet', 'refreshing': True}), 503
+
+    try:
+        return jsonify({
+            **economic_snapshot.snapshot(),
+            'timestamp': datetime.utcnow().isoformat()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/economic/indicators', methods=['GET'])
+@admission.limit('light')
+def get_economic_indicators():
+    """Get current economic dashboard indicators"""
+    if economic_snapshot is None:
+        return jsonify({'error': 'FRED API not configured'}), 503
+    if not economic_snapshot.loaded:
+        return jsonify({'error': 'Economic data not loaded yet', 'refreshing': True}), 503
+
+    try:
+        snapshot = economic_snapshot.snapshot()
+        return jsonify({
+            'indicators': snapshot['indicators'],
+            'refreshed_at': snapshot['refreshed_at'],
+            'stale': snapshot['stale'],
+            'timestamp': datetime.utcnow().isoformat()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/economic/recession', methods=['GET'])
+@admission.limit('light')
+def get_economic_recession():
+    """Get recession risk score history"""
+    try:
+        days = int(request.args.get('days', 365))
+    except ValueError:
+        return jsonify({'error': 'days must be an integer'}), 400
+    if days < 1:
+        return jsonify({'error': 'days must be positive'}), 400
+    days = min(days, 3650)
+
+    if economic_snapshot is None:
+        return jsonify({'error': 'FRED API not configured'}), 503
+    if not economic_snapshot.loaded:
+        return jsonify({'error': 'Economic data not loaded yet', 'refreshing': True}), 503
+
+    try:
+        snapshot = economic_snapshot.snapshot()
+        return jsonify({
+            'days': days,
+            'latest': snapshot['recession'],
+            'history': economic_snapshot.recession_history(days),
+            'refreshed_at': snapshot['refreshed_at'],
+            'stale': snapshot['stale'],
+            'timestamp': datetime.utcnow().isoformat()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/forecast/runs', methods=['GET'])
+@admission.limit('light')
+def get_forecast_runs():
+    """List recent stored forecast runs for a model"""
+    model_type = request.args.get('model', 'lstm')
+    limit = min(int(request.args.get('limit', 20)), 100)
+
+    if forecast_store is None:
+        return jsonify({'error': 'Database not configured'}), 503
+
+    try:
+        return jsonify({
+            'model': model_type,
+            'runs': persistence.call(forecast_store.list_runs, model_type, limit),
+            'timestamp': datetime.utcnow().isoformat()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/forecast/history', methods=['GET'])
+@admission.limit('light')
+def get_forecast_history():
+    """Get daily forecast value statistics per target month from rollups"""
+    model_type = request.args.get('model', 'lstm')
+    days = min(int(request.args.get('days', 30)), 3650)
+
+    if retention_manager is None:
+        return jsonify({'error': 'Database not configured'}), 503
+
+    try:
+        end = datetime.utcnow()
+        start = end - timedelta(days=days)
+        return jsonify({
+            'model': model_type,
+            'history': persistence.call(retention_manager.history, model_type, start, end),
+            'timestamp': datetime.utcnow().isoformat()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/export/forecast', methods=['GET'])
+@admission.limit('export')
 def export_forecast():
     """Export latest forecast as CSV"""
     try:
         model_type = request.args.get('model', 'lstm')
+        df = None
         
-        # Get latest forecast from MongoDB
-        if mongo_db:
+        # Get latest forecast run from MongoDB (single indexed read)
+        if forecast_store is not None:
             try:
-                latest_forecasts = list(mongo_db.db.forecasts.find(
-                    {'model_type': model_type}
-                ).sort('created_at', -1).limit(12))
-                
-                if latest_forecasts:
-                    # Convert to list for DataFrame
-                    forecast_data = []
-                    for forecast in latest_forecasts:
-                        forecast_data.append({
-                            'Date': forecast['date'].strftime('%Y-%m-%d'),
-                            'Forecasted_Revenue': forecast['forecasted_revenue'],
-                            'Growth_5%': forecast['growth_5'],
-                            'Growth_10%': forecast['growth_10'],
-                            'Decline_5%': forecast['decline_5']
-                        })
-                    
-                    df = pd.DataFrame(forecast_data)
-                else:
-                    # Generate fallback data if no DB data
-                    forecasts = model_loader.generate_forecast(model_type, 12)
-                    forecast_data = []
-                    for forecast in forecasts:
-                        forecast_data.append({
-                            'Date': forecast['date'],
-                            'Forecasted_Revenue': forecast['forecasted_revenue'],
-                            'Growth_5%': forecast['growth_5'],
-                            'Growth_10%': forecast['growth_10'],
-                            'Decline_5%': forecast['decline_5']
-                        })
-                    df = pd.DataFrame(forecast_data)
+                latest_run = persistence.call(forecast_store.latest_run, model_type)
+                if latest_run:
+                    df = export_frame(
+                        [d.strftime('%Y-%m-%d') for d in latest_run['dates']],
+                        latest_run
+                    )
             except Exception as e:
                 print(f"⚠️ MongoDB query failed: {e}")
-                # Generate fallback data
-                forecasts = model_loader.generate_forecast(model_type, 12)
-                forecast_data = []
-                for forecast in forecasts:
-                    forecast_data.append({
-                        'Date': forecast['date'],
-                        'Forecasted_Revenue': forecast['forecasted_revenue'],
-                        'Growth_5%': forecast['growth_5'],
-                        'Growth_10%': forecast['growth_10'],
-                        'Decline_5%': forecast['decline_5']
-                    })
-                df = pd.DataFrame(forecast_data)
-        else:
-            # Generate fallback data if no MongoDB
+        
+        if df is None:
+            # Generate fallback data if no stored run is available
             forecasts = model_loader.generate_forecast(model_type, 12)
-            forecast_data = []
-            for forecast in forecasts:
-                forecast_data.append({
-                    'Date': forecast['date'],
-                    'Forecasted_Revenue': forecast['forecasted_revenue'],
-                    'Growth_5%': forecast['growth_5'],
-                    'Growth_10%': forecast['growth_10'],
-                    'Decline_5%': forecast['decline_5']
-                })
-            df = pd.DataFrame(forecast_data)
+            df = export_frame(
+                [f['date'] for f in forecasts],
+                {column: [f[column] for f in forecasts] for column in FORECAST_COLUMNS}
+            )
         
         # Save to output directory
         output_file = model_loader.output_path / f'forecast_{model_type}_{datetime.now().strftime("%Y%m%d")}.csv'
@@ -501,6 +619,7 @@ def export_forecast():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/upload', methods=['POST'])
+@admission.limit('upload')
 def upload_data():
     """Upload new training data"""
     if 'file' not in request.files:
@@ -518,18 +637,22 @@ def upload_data():
             
             # Validate file structure
             df = pd.read_csv(upload_path)
+            # Flag gaps, duplicates, outliers and level shifts (rows are kept as uploaded)
+            flags_path = model_loader.output_path / 'quality' / f'{upload_path.stem}_flags.csv'
+            quality = screen_upload(df, flags_path)
             
             # Save upload info to MongoDB
-            if mongo_db:
+            if mongo_db is not None:
                 try:
                     upload_info = {
                         'filename': file.filename,
                         'upload_path': str(upload_path),
                         'records': len(df),
                         'columns': list(df.columns),
+                        'quality': quality,
                         'created_at': datetime.utcnow()
                     }
-                    mongo_db.db.uploads.insert_one(upload_info)
+                    persistence.call(mongo_db['uploads'].insert_one, upload_info)
                 except Exception as e:
                     print(f"⚠️ MongoDB upload logging failed: {e}")
             
@@ -538,7 +661,8 @@ def upload_data():
                 'filename': file.filename,
                 'records': len(df),
                 'columns': list(df.columns),
-                'upload_path': str(upload_path)
+                'upload_path': str(upload_path),
+                'quality': quality
             })
         else:
             return jsonify({'error': 'Only CSV files are supported'}), 400
@@ -546,14 +670,33 @@ def upload_data():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/models/publish', methods=['POST'])
+@admission.limit('upload')
+def publish_models():
+    """Reload model files from the model directory and rematerialize forecasts
+
+    Other workers pick up the publish within PUBLISH_POLL_SECONDS.
+    """
+    try:
+        publish_watcher.publish()
+        return jsonify({
+            'message': 'Models reloaded',
+            'model_versions': model_loader.model_versions,
+            'timestamp': datetime.utcnow().isoformat()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/health', methods=['GET'])
+@admission.limit('light')
 def health_check():
     """Health check endpoint"""
     try:
         # Test MongoDB connection
-        if mongo_db:
+        if persistence is not None:
             try:
-                mongo_db.db.command('ping')
+                # Skips the round-trip while the circuit is open
+                persistence.call(persistence.ping)
                 db_status = 'connected'
             except Exception:
                 db_status = 'disconnected'
@@ -564,12 +707,25 @@ def health_check():
     
     return jsonify({
         'status': 'healthy',
+        'serving_mode': 'wsgi_preload' if PRELOAD_MODE else 'wsgi',
         'timestamp': datetime.utcnow().isoformat(),
         'version': '1.0.0',
         'database': db_status,
+        'database_persistence': persistence.status() if persistence is not None else None,
+        'forecast_rollups': rollup_scheduler.status() if rollup_scheduler is not None else None,
+        'forecast_access_log': access_log.status() if access_log is not None else None,
+        'request_coalescing': forecast_flight.stats(),
+        'forecast_precompute': precompute_scheduler.status(),
+        'model_publish': publish_watcher.status(),
+        'economic_snapshot': economic_snapshot.status() if economic_snapshot is not None else None,
+        'exog_features': model_loader.exog_features.stats() if model_loader.exog_features is not None else None,
+        'data_quality': model_loader.data_quality,
+        'admission': admission.stats(),
+        'memory': process_memory(),
+        'threads': thread_budget_status(),
         'models_loaded': {
             'lstm': model_loader.lstm_model is not None,
-            'sarima': model_loader.sarima_model is not None,
+            'sarima': model_loader.sarima_loaded,
             'scaler': model_loader.scaler is not None
         },
         'data_files_loaded': {
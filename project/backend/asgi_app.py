@@ -0,0 +1,758 @@
+"""Async (ASGI) serving mode for the GrowthIQ API
+
+Serves the same endpoints as ``app.py`` with async route handlers: MongoDB
+access goes through the Motor driver and model inference runs in a thread
+pool, so waiting on the database never ties up a worker thread and one
+process can hold many concurrent connections.
+
+Run with:
+    uvicorn asgi_app:app --host 0.0.0.0 --port 5000
+
+The synchronous Flask app (``python app.py``) is unchanged. Background daily
+rollups only run in the Flask process; ASGI deployments that need them should
+keep one Flask instance (or another scheduler) running alongside.
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+
+from services.thread_budget import ThreadBudget, status as thread_budget_status
+
+load_dotenv()
+
+# Thread caps must be in the environment before NumPy (BLAS) is imported
+thread_budget = ThreadBudget.from_env().apply()
+
+import pandas as pd
+from quart import Quart, Response, request, jsonify, send_file
+from quart_cors import cors
+
+from services.admission import AdmissionController, AsyncAdmissionLane
+from services.ensemble import inverse_error_weights, ensemble_forecast
+from services.forecast_store import AsyncForecastStore, ForecastAccessLog, FORECAST_COLUMNS, export_frame
+from services.memory import process_memory
+from services.model_loader import ModelDataLoader, ModelPublishWatcher, MODEL_TYPES
+from services.persistence import AsyncMongoPersistence
+from services.precompute import (
+    MaterializedForecastStore, ForecastPrecomputer, PrecomputeScheduler, STANDARD_CONFIDENCE
+)
+from services.retention import history_async
+from services.single_flight import AsyncSingleFlight, SingleFlightTimeout
+from services.streaming import STREAM_FORMATS, STREAM_HEADERS, forecast_events, encode_events
+from services.hierarchy import HierarchicalForecaster, RECONCILIATION_METHODS
+from services.economic_snapshot import EconomicSnapshotService
+from services.data_quality import screen_upload
+from services.artifact_graph import dashboard_artifacts
+from services.wire_format import JSON_MIMETYPE, negotiate, forecast_columns, encode_columns
+
+app = Quart(__name__)
+app = cors(app)
+
+mongo_uri = os.getenv("MONGO_URI")
+
+# Created on startup so the Motor client binds to the server's event loop
+persistence = None
+forecast_store = None
+access_log = None
+
+# CPU-bound inference runs here, off the event loop (sized by the thread budget)
+forecast_executor = ThreadPoolExecutor(
+    max_workers=thread_budget.executor_workers,
+    thread_name_prefix='forecast'
+)
+
+admission = AdmissionController(lane_class=AsyncAdmissionLane)
+
+forecast_flight = AsyncSingleFlight()
+FORECAST_COALESCE_TIMEOUT = float(os.getenv('FORECAST_COALESCE_TIMEOUT_SECONDS', 30))
+
+model_loader = ModelDataLoader()
+hierarchical_forecaster = HierarchicalForecaster(model_loader)
+
+# Standard-horizon forecasts; the scheduler starts with the event loop
+materialized_forecasts = MaterializedForecastStore(
+    os.getenv('PRECOMPUTE_STORE_PATH', model_loader.output_path / 'materialized_forecasts.json')
+)
+precompute_scheduler = None
+
+
+def _trigger_precompute(reason):
+    if precompute_scheduler is not None:
+        precompute_scheduler.trigger(reason)
+
+
+# Model publishes reach every uvicorn worker through a shared marker file
+publish_watcher = ModelPublishWatcher(
+    model_loader, model_loader.output_path / 'model_publish.json', on_reload=_trigger_precompute
+)
+
+
+def _on_economic_change(observations):
+    """Realign SARIMAX regressors from new FRED data; rematerialize if they changed"""
+    if model_loader.update_exog(observations) and precompute_scheduler is not None:
+        precompute_scheduler.trigger('exog_update')
+
+
+# Economic indicators and recession risk from FRED (None without an API key)
+economic_snapshot = EconomicSnapshotService.from_env(on_change=_on_economic_change)
+
+
+@app.before_serving
+async def connect_database():
+    global persistence, forecast_store
+    try:
+        persistence = AsyncMongoPersistence(mongo_uri, db_name="growthiq")
+        forecast_store = AsyncForecastStore(persistence.db)
+        print("✅ Connected to MongoDB Atlas (async)")
+    except Exception as e:
+        persistence = None
+        forecast_store = None
+        print(f"❌ MongoDB connection failed: {e}")
+        return
+
+    try:
+        await persistence.call(forecast_store.ensure_indexes)
+    except Exception as e:
+        print(f"⚠️ Forecast index creation failed: {e}")
+
+
+@app.before_serving
+async def start_precompute():
+    global precompute_scheduler, access_log
+    loop = asyncio.get_running_loop()
+
+    def persist(model_type, periods, forecasts):
+        # Called from the scheduler thread; the Motor write runs on the loop
+        return asyncio.run_coroutine_threadsafe(
+            _persist_forecast(model_type, periods, forecasts, 'precompute'), loop
+        ).result()
+
+    precomputer = ForecastPrecomputer(model_loader, materialized_forecasts, MODEL_TYPES, persist=persist)
+    # Derived files (stats, metrics, scenarios, exports, plots) rebuilt with the
+    # forecasts, each only when its inputs changed
+    precompute_scheduler = PrecomputeScheduler(precomputer, dashboard_artifacts(
+        model_loader, precomputer, max_workers=thread_budget.executor_workers
+    ))
+    precompute_scheduler.start()
+    publish_watcher.start()
+    if economic_snapshot is not None:
+        economic_snapshot.start()
+
+    if forecast_store is not None:
+        # Batched materialized-forecast hits, flushed from a thread like the
+        # precompute writes above
+        access_log = ForecastAccessLog(lambda hits: asyncio.run_coroutine_threadsafe(
+            persistence.call(forecast_store.record_accesses, hits), loop
+        ).result())
+        access_log.start()
+
+
+@app.after_serving
+async def shutdown():
+    if precompute_scheduler is not None:
+        precompute_scheduler.stop()
+    publish_watcher.stop()
+    if economic_snapshot is not None:
+        economic_snapshot.stop()
+    if access_log is not None:
+        # The final flush waits on a write scheduled on this loop
+        await asyncio.get_running_loop().run_in_executor(None, access_log.stop)
+    forecast_executor.shutdown(wait=False)
+    if persistence is not None:
+        persistence.client.close()
+
+
+async def run_in_executor(fn, *args):
+    """Run blocking model or file work in the forecast pool"""
+    return await asyncio.get_running_loop().run_in_executor(forecast_executor, fn, *args)
+
+
+async def iterate_in_executor(iterator):
+    """Async iteration over a blocking iterator, computing each item in the forecast pool"""
+    iterator = iter(iterator)
+    done = object()
+    while True:
+        item = await run_in_executor(next, iterator, done)
+        if item is done:
+            return
+        yield item
+
+
+def _negotiated_response(payload, records_key, columns, wire):
+    """Respond as JSON, or with one record field as columns in the negotiated type"""
+    if wire == JSON_MIMETYPE:
+        response = jsonify(payload)
+    else:
+        meta = {k: v for k, v in payload.items() if k != records_key}
+        body, mimetype = encode_columns(columns(), meta, wire)
+        response = Response(body, mimetype=mimetype)
+    response.headers['Vary'] = 'Accept'
+    return response
+
+
+async def _persist_forecast(model_type, periods, forecasts, user_id='anonymous', scenario='base', model_version=None):
+    """
+    Store a forecast run, returning its run ID (None if the database is unavailable)
+
+    Args:
+        model_version: Version that produced the forecast ('mock' for a
+            fallback); defaults to the loaded model's
+    """
+    if forecast_store is None:
+        return None
+
+    try:
+        run_id, _ = await persistence.call(
+            forecast_store.save_run,
+            model_type,
+            periods,
+            forecasts,
+            model_loader.forecast_hash(model_type, periods, scenario, model_version),
+            user_id=user_id
+        )
+        return run_id
+    except Exception as e:
+        print(f"⚠️ MongoDB save failed: {e}")
+        return None
+
+
+async def _generate_and_persist(model_type, periods, confidence=0.95, user_id='anonymous', scenario='base'):
+    """Generate a forecast off the event loop and store its run; returns (forecasts, run_id)"""
+    forecasts, model_version = await run_in_executor(
+        model_loader.generate_forecast_with_version, model_type, periods, confidence, scenario
+    )
+    if not forecasts:
+        return None, None
+    return forecasts, await _persist_forecast(model_type, periods, forecasts, user_id, scenario, model_version)
+
+
+def _forecast_key(model_type, periods, confidence, scenario='base'):
+    return ('forecast', model_type, periods, confidence, scenario)
+
+
+# API Routes
+@app.route('/api/forecast', methods=['GET'])
+@admission.limit('forecast')
+async def get_forecast():
+    """Get revenue forecast from specified model"""
+    model_type = request.args.get('model', 'lstm')
+    periods = int(request.args.get('periods', 12))
+    confidence = float(request.args.get('confidence', 0.95))
+    scenario = request.args.get('scenario', 'base')
+    wire = negotiate(request.accept_mimetypes)
+
+    if model_type not in MODEL_TYPES:
+        return jsonify({'error': 'Invalid model type. Use lstm or sarima'}), 400
+    if not 0 < confidence < 1:
+        return jsonify({'error': 'Confidence must be between 0 and 1'}), 400
+    if scenario not in model_loader.exog_scenarios:
+        return jsonify({'error': f'Unknown scenario. Use one of: {", ".join(model_loader.exog_scenarios)}'}), 400
+
+    # Standard dashboard requests are a keyed lookup in the materialized store
+    if confidence == STANDARD_CONFIDENCE and scenario == 'base':
+        content_hash = model_loader.forecast_hash(model_type, periods)
+        entry = materialized_forecasts.get(model_type, periods, content_hash)
+        if entry is not None:
+            # Recorded like a live request (access entry, renewed run TTL), but
+            # queued and written in batches so the hit does no database I/O
+            if access_log is not None:
+                access_log.record(model_type, periods, entry['forecasts'], content_hash,
+                                  entry['run_id'], request.args.get('user_id', 'anonymous'))
+            metrics = model_loader.get_model_metrics()
+            return _negotiated_response({
+                'model': model_type,
+                'periods': periods,
+                'scenario': scenario,
+                'forecasts': entry['forecasts'],
+                'run_id': entry['run_id'],
+                'metrics': next((m for m in metrics if m.get('model_type') == model_type), {}),
+                'generated_at': entry['materialized_at'],
+                'materialized': True,
+                'version': '1.0.0'
+            }, 'forecasts', lambda: forecast_columns(entry['forecasts']), wire)
+
+    try:
+        forecasts, run_id = await forecast_flight.do(
+            _forecast_key(model_type, periods, confidence, scenario),
+            _generate_and_persist, model_type, periods, confidence,
+            request.args.get('user_id', 'anonymous'), scenario,
+            timeout=FORECAST_COALESCE_TIMEOUT
+        )
+
+        if not forecasts:
+            return jsonify({'error': 'Forecast generation failed'}), 500
+
+        metrics = model_loader.get_model_metrics()
+        model_metric = next((m for m in metrics if m.get('model_type') == model_type), {})
+
+        return _negotiated_response({
+            'model': model_type,
+            'periods': periods,
+            'scenario': scenario,
+            'forecasts': forecasts,
+            'run_id': run_id,
+            'metrics': model_metric,
+            'generated_at': datetime.utcnow().isoformat(),
+            'version': '1.0.0'
+        }, 'forecasts', lambda: forecast_columns(forecasts), wire)
+
+    except SingleFlightTimeout as e:
+        return jsonify({'error': str(e)}), 504
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/forecast/stream', methods=['GET'])
+async def stream_forecast():
+    """Stream forecast points as server-sent events (or NDJSON) while they are computed"""
+    model_type = request.args.get('model', 'lstm')
+    periods = int(request.args.get('periods', 12))
+    confidence = float(request.args.get('confidence', 0.95))
+    stream_format = request.args.get('format', 'sse')
+    block_size = max(int(request.args.get('block', 1)), 1)
+    user_id = request.args.get('user_id', 'anonymous')
+    scenario = request.args.get('scenario', 'base')
+
+    if model_type not in MODEL_TYPES:
+        return jsonify({'error': 'Invalid model type. Use lstm or sarima'}), 400
+    if not 0 < confidence < 1:
+        return jsonify({'error': 'Confidence must be between 0 and 1'}), 400
+    if scenario not in model_loader.exog_scenarios:
+        return jsonify({'error': f'Unknown scenario. Use one of: {", ".join(model_loader.exog_scenarios)}'}), 400
+    if stream_format not in STREAM_FORMATS:
+        return jsonify({'error': f'Invalid format. Use {" or ".join(STREAM_FORMATS)}'}), 400
+
+    loop = asyncio.get_running_loop()
+    # Filled in by iter_forecast with the model version that produced the stream
+    source = {}
+
+    def persist(forecasts):
+        # Runs in the forecast pool; the Motor write itself happens on the loop
+        run_id = asyncio.run_coroutine_threadsafe(
+            _persist_forecast(model_type, periods, forecasts, user_id, scenario,
+                              source.get('model_version')), loop
+        ).result()
+        return {'run_id': run_id}
+
+    events = forecast_events(
+        {
+            'model': model_type,
+            'periods': periods,
+            'scenario': scenario,
+            'confidence': confidence,
+            'generated_at': datetime.utcnow().isoformat(),
+            'version': '1.0.0'
+        },
+        model_loader.iter_forecast(model_type, periods, confidence, block_size, state=source, scenario=scenario),
+        on_complete=persist
+    )
+
+    # Each model step runs in the pool; the slot is held for the whole stream
+    stream = await admission.admit_stream_async(
+        'forecast', iterate_in_executor(encode_events(events, stream_format))
+    )
+    if isinstance(stream, tuple):
+        return stream
+
+    mimetype, _ = STREAM_FORMATS[stream_format]
+    response = Response(stream, mimetype=mimetype, headers=STREAM_HEADERS)
+    response.timeout = None
+    return response
+
+
+@app.route('/api/forecast/compare', methods=['GET'])
+@admission.limit('forecast')
+async def compare_forecasts():
+    """Run LSTM and SARIMA forecasts concurrently and add an error-weighted ensemble"""
+    periods = int(request.args.get('periods', 12))
+    user_id = request.args.get('user_id', 'anonymous')
+
+    try:
+        results = await asyncio.gather(*[
+            forecast_flight.do(
+                _forecast_key(model_type, periods, 0.95),
+                _generate_and_persist, model_type, periods, 0.95, user_id,
+                timeout=FORECAST_COALESCE_TIMEOUT
+            )
+            for model_type in MODEL_TYPES
+        ], run_in_executor(model_loader.backtest_errors))
+
+        backtest_errors = results[-1]
+        results = dict(zip(MODEL_TYPES, results[:-1]))
+        forecasts = {model_type: result[0] for model_type, result in results.items()}
+
+        if not all(forecasts.values()):
+            failed = [m for m, f in forecasts.items() if not f]
+            return jsonify({'error': f'Forecast generation failed for: {", ".join(failed)}'}), 500
+
+        weights = inverse_error_weights(backtest_errors)
+        metrics = model_loader.get_model_metrics()
+
+        models = {}
+        for model_type in MODEL_TYPES:
+            models[model_type] = {
+                'forecasts': forecasts[model_type],
+                'run_id': results[model_type][1],
+                'metrics': next((m for m in metrics if m.get('model_type') == model_type), {}),
+                'backtest_rmse': backtest_errors.get(model_type),
+                'weight': weights[model_type]
+            }
+
+        return jsonify({
+            'periods': periods,
+            'models': models,
+            'ensemble': {
+                'forecasts': ensemble_forecast(forecasts, weights),
+                'weights': weights
+            },
+            'generated_at': datetime.utcnow().isoformat(),
+            'version': '1.0.0'
+        })
+
+    except SingleFlightTimeout as e:
+        return jsonify({'error': str(e)}), 504
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/forecast/hierarchy', methods=['GET'])
+@admission.limit('forecast')
+async def get_hierarchical_forecast():
+    """Forecast every node of the revenue hierarchy and reconcile the levels"""
+    model_type = request.args.get('model', 'sarima')
+    periods = int(request.args.get('periods', 12))
+    method = request.args.get('method', 'mint_diag')
+    levels = [level for level in request.args.get('level', '').split(',') if level] or None
+
+    if model_type not in MODEL_TYPES:
+        return jsonify({'error': 'Invalid model type. Use lstm or sarima'}), 400
+    if method not in RECONCILIATION_METHODS:
+        return jsonify({'error': f'Invalid method. Use {", ".join(RECONCILIATION_METHODS)}'}), 400
+
+    try:
+        result = await forecast_flight.do(
+            ('hierarchy', model_type, periods, method, tuple(levels or ())),
+            run_in_executor, hierarchical_forecaster.forecast, model_type, periods, method, levels,
+            timeout=FORECAST_COALESCE_TIMEOUT
+        )
+        return jsonify(result)
+    except SingleFlightTimeout as e:
+        return jsonify({'error': str(e)}), 504
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/metrics', methods=['GET'])
+@admission.limit('light')
+async def get_metrics():
+    """Get model performance metrics"""
+    try:
+        return jsonify({
+            'metrics': model_loader.get_model_metrics(),
+            'timestamp': datetime.utcnow().isoformat()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/historical', methods=['GET'])
+@admission.limit('light')
+async def get_historical():
+    """Get historical FRED data"""
+    try:
+        wire = negotiate(request.accept_mimetypes)
+        payload = {'timestamp': datetime.utcnow().isoformat()}
+        if wire == JSON_MIMETYPE:
+            payload['historical_data'] = model_loader.get_historical_data()
+        return _negotiated_response(payload, 'historical_data', model_loader.historical_columns, wire)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/scenario', methods=['GET'])
+@admission.limit('light')
+async def get_scenario():
+    """Get scenario planning data"""
+    try:
+        return jsonify({
+            'scenarios': model_loader.get_scenario_data(),
+            'timestamp': datetime.utcnow().isoformat()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/economic', methods=['GET'])
+@admission.limit('light')
+async def get_economic():
+    """Get the economic indicator and recession risk snapshot (served from memory)"""
+    if economic_snapshot is None:
+        return jsonify({'error': 'FRED API not configured'}), 503
+    if not economic_snapshot.loaded:
+        return jsonify({'error': 'Economic data not loaded yet', 'refreshing': True}), 503
+
+    try:
+        return jsonify({
+            **economic_snapshot.snapshot(),
+            'timestamp': datetime.utcnow().isoformat()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/economic/indicators', methods=['GET'])
+@admission.limit('light')
+async def get_economic_indicators():
+    """Get current economic dashboard indicators"""
+    if economic_snapshot is None:
+        return jsonify({'error': 'FRED API not configured'}), 503
+    if not economic_snapshot.loaded:
+        return jsonify({'error': 'Economic data not loaded yet', 'refreshing': True}), 503
+
+    try:
+        snapshot = economic_snapshot.snapshot()
+        return jsonify({
+            'indicators': snapshot['indicators'],
+            'refreshed_at': snapshot['refreshed_at'],
+            'stale': snapshot['stale'],
+            'timestamp': datetime.utcnow().isoformat()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/economic/recession', methods=['GET'])
+@admission.limit('light')
+async def get_economic_recession():
+    """Get recession risk score history"""
+    try:
+        days = int(request.args.get('days', 365))
+    except ValueError:
+        return jsonify({'error': 'days must be an integer'}), 400
+    if days < 1:
+        return jsonify({'error': 'days must be positive'}), 400
+    days = min(days, 3650)
+
+    if economic_snapshot is None:
+        return jsonify({'error': 'FRED API not configured'}), 503
+    if not economic_snapshot.loaded:
+        return jsonify({'error': 'Economic data not loaded yet', 'refreshing': True}), 503
+
+    try:
+        snapshot = economic_snapshot.snapshot()
+        return jsonify({
+            'days': days,
+            'latest': snapshot['recession'],
+            'history': economic_snapshot.recession_history(days),
+            'refreshed_at': snapshot['refreshed_at'],
+            'stale': snapshot['stale'],
+            'timestamp': datetime.utcnow().isoformat()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/forecast/runs', methods=['GET'])
+@admission.limit('light')
+async def get_forecast_runs():
+    """List recent stored forecast runs for a model"""
+    model_type = request.args.get('model', 'lstm')
+    limit = min(int(request.args.get('limit', 20)), 100)
+
+    if forecast_store is None:
+        return jsonify({'error': 'Database not configured'}), 503
+
+    try:
+        return jsonify({
+            'model': model_type,
+            'runs': await persistence.call(forecast_store.list_runs, model_type, limit),
+            'timestamp': datetime.utcnow().isoformat()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/forecast/history', methods=['GET'])
+@admission.limit('light')
+async def get_forecast_history():
+    """Get daily forecast value statistics per target month from rollups"""
+    model_type = request.args.get('model', 'lstm')
+    days = min(int(request.args.get('days', 30)), 3650)
+
+    if persistence is None:
+        return jsonify({'error': 'Database not configured'}), 503
+
+    try:
+        end = datetime.utcnow()
+        start = end - timedelta(days=days)
+        return jsonify({
+            'model': model_type,
+            'history': await persistence.call(history_async, persistence.db, model_type, start, end),
+            'timestamp': datetime.utcnow().isoformat()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/export/forecast', methods=['GET'])
+@admission.limit('export')
+async def export_forecast():
+    """Export latest forecast as CSV"""
+    try:
+        model_type = request.args.get('model', 'lstm')
+        df = None
+
+        if forecast_store is not None:
+            try:
+                latest_run = await persistence.call(forecast_store.latest_run, model_type)
+                if latest_run:
+                    df = export_frame(
+                        [d.strftime('%Y-%m-%d') for d in latest_run['dates']],
+                        latest_run
+                    )
+            except Exception as e:
+                print(f"⚠️ MongoDB query failed: {e}")
+
+        if df is None:
+            forecasts = await run_in_executor(model_loader.generate_forecast, model_type, 12)
+            df = export_frame(
+                [f['date'] for f in forecasts],
+                {column: [f[column] for f in forecasts] for column in FORECAST_COLUMNS}
+            )
+
+        output_file = model_loader.output_path / f'forecast_{model_type}_{datetime.now().strftime("%Y%m%d")}.csv'
+        await run_in_executor(lambda: df.to_csv(output_file, index=False))
+
+        return await send_file(
+            str(output_file),
+            as_attachment=True,
+            attachment_filename=f'forecast_{model_type}.csv',
+            mimetype='text/csv'
+        )
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/upload', methods=['POST'])
+@admission.limit('upload')
+async def upload_data():
+    """Upload new training data"""
+    files = await request.files
+    if 'file' not in files:
+        return jsonify({'error': 'No file provided'}), 400
+
+    file = files['file']
+    if file.filename == '':
+        return jsonify({'error': 'No file selected'}), 400
+
+    try:
+        if not file.filename.endswith('.csv'):
+            return jsonify({'error': 'Only CSV files are supported'}), 400
+
+        upload_path = model_loader.data_path / f'uploaded_{datetime.now().strftime("%Y%m%d_%H%M%S")}_{file.filename}'
+        await file.save(str(upload_path))
+
+        df = await run_in_executor(pd.read_csv, upload_path)
+        # Flag gaps, duplicates, outliers and level shifts (rows are kept as uploaded)
+        flags_path = model_loader.output_path / 'quality' / f'{upload_path.stem}_flags.csv'
+        quality = await run_in_executor(screen_upload, df, flags_path)
+
+        if persistence is not None:
+            try:
+                upload_info = {
+                    'filename': file.filename,
+                    'upload_path': str(upload_path),
+                    'records': len(df),
+                    'columns': list(df.columns),
+                    'quality': quality,
+                    'created_at': datetime.utcnow()
+                }
+                await persistence.call(persistence.db['uploads'].insert_one, upload_info)
+            except Exception as e:
+                print(f"⚠️ MongoDB upload logging failed: {e}")
+
+        return jsonify({
+            'message': 'Data uploaded successfully',
+            'filename': file.filename,
+            'records': len(df),
+            'columns': list(df.columns),
+            'upload_path': str(upload_path),
+            'quality': quality
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/models/publish', methods=['POST'])
+@admission.limit('upload')
+async def publish_models():
+    """Reload model files from the model directory and rematerialize forecasts
+
+    Other workers pick up the publish within PUBLISH_POLL_SECONDS.
+    """
+    try:
+        await run_in_executor(publish_watcher.publish)
+        return jsonify({
+            'message': 'Models reloaded',
+            'model_versions': model_loader.model_versions,
+            'timestamp': datetime.utcnow().isoformat()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/health', methods=['GET'])
+@admission.limit('light')
+async def health_check():
+    """Health check endpoint"""
+    if persistence is not None:
+        try:
+            # Skips the round-trip while the circuit is open
+            await persistence.call(persistence.ping)
+            db_status = 'connected'
+        except Exception:
+            db_status = 'disconnected'
+    else:
+        db_status = 'not_configured'
+
+    return jsonify({
+        'status': 'healthy',
+        'serving_mode': 'asgi',
+        'timestamp': datetime.utcnow().isoformat(),
+        'version': '1.0.0',
+        'database': db_status,
+        'database_persistence': persistence.status() if persistence is not None else None,
+        'forecast_rollups': None,
+        'forecast_access_log': access_log.status() if access_log is not None else None,
+        'request_coalescing': forecast_flight.stats(),
+        'forecast_precompute': precompute_scheduler.status() if precompute_scheduler is not None else None,
+        'model_publish': publish_watcher.status(),
+        'economic_snapshot': economic_snapshot.status() if economic_snapshot is not None else None,
+        'exog_features': model_loader.exog_features.stats() if model_loader.exog_features is not None else None,
+        'data_quality': model_loader.data_quality,
+        'admission': admission.stats(),
+        'memory': process_memory(),
+        'threads': thread_budget_status(),
+        'models_loaded': {
+            'lstm': model_loader.lstm_model is not None,
+            'sarima': model_loader.sarima_loaded,
+            'scaler': model_loader.scaler is not None
+        },
+        'data_files_loaded': {
+            'fred_data': model_loader.fred_data is not None,
+            'model_metrics': model_loader.model_metrics is not None,
+            'scenario_inputs': model_loader.scenario_inputs is not None
+        }
+    })
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    print("🚀 Starting GrowthIQ Backend Server (ASGI)...")
+    uvicorn.run(app, host='0.0.0.0', port=int(os.getenv('PORT', 5000)))
@@ -0,0 +1,42 @@
+"""Preload-and-fork multi-worker serving mode
+
+    gunicorn -c gunicorn.conf.py app:app
+
+The master imports the app once: CSV data, the memory-mapped series store,
+the SARIMA results and its forecast cache are loaded before the workers are
+forked, so every worker shares those pages copy-on-write. MongoDB clients,
+background threads and TensorFlow (which is not fork-safe) are created in
+each worker by the post_fork hook.
+"""
+import gc
+import os
+
+# Read by app.py / services.model_loader when the preloaded app is imported
+os.environ.setdefault('GROWTHIQ_PRELOAD', 'true')
+os.environ.setdefault('SERIES_STORE_MMAP', 'true')
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', 4))
+# Workers sharing the host; the app divides the CPUs between them (services/thread_budget.py)
+os.environ['GROWTHIQ_WORKERS'] = str(workers)
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+# Queued requests hold a thread too, so admission lanes are sized to fit (services/admission.py)
+os.environ['GROWTHIQ_THREADS'] = str(threads)
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+preload_app = True
+
+
+def when_ready(server):
+    # Move everything loaded so far out of the collector's reach; otherwise a
+    # collection in a worker touches (and so copies) every shared object page
+    gc.collect()
+    gc.freeze()
+    server.log.info("Preloaded app frozen; forking %s workers", workers)
+
+
+def post_fork(server, worker):
+    import app
+
+    app.init_worker()
+    server.log.info("Worker %s initialized", worker.pid)
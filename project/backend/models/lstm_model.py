@@ -8,6 +8,8 @@ from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau
 from sklearn.preprocessing import MinMaxScaler
 from sklearn.metrics import mean_squared_error, mean_absolute_error
 import joblib
+import json
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -33,6 +35,8 @@ class LSTMForecaster:
         self.is_fitted = False
         self.history = None
         self.training_data = None
+        # Best validation loss of the last full training; fine-tuning is judged against it
+        self.reference_val_loss = None
 
     def prepare_data(self, data):
         """Prepare time series data for LSTM modeling"""
@@ -115,12 +119,155 @@ class LSTMForecaster:
             )
 
             self.is_fitted = True
+            val_losses = self.history.history.get('val_loss')
+            self.reference_val_loss = float(min(val_losses)) if val_losses else None
             return self.history
 
         except Exception as e:
             print(f"Error fitting LSTM model: {e}")
             raise
 
+    def fine_tune(self, data, recent_window=36, validation_months=6, replay_ratio=0.5, epochs=5,
+                  batch_size=32, learning_rate=0.0001, degradation_threshold=0.25, max_scale_drift=0.2,
+                  seed=42, full_retrain_kwargs=None):
+        """
+        Warm-start the current weights on data with newly appended months
+
+        The loaded weights and scaler are kept. Training uses the sequences
+        ending in the last ``recent_window`` months plus a random replay sample
+        of older sequences (to avoid forgetting), for a few epochs at a low
+        learning rate. The last ``validation_months`` sequences are held out.
+        A full retrain via :meth:`fit` is done instead when the new data falls
+        far outside the scaler's range, or when validation loss after
+        fine-tuning exceeds the reference loss by ``degradation_threshold``.
+
+        Args:
+            data: Full history including the appended months (same format as ``fit``)
+            recent_window: Months of recent sequences always trained on
+            validation_months: Most recent sequences held out for validation
+            replay_ratio: Older sequences replayed, as a fraction of the recent ones
+            epochs: Maximum fine-tuning epochs
+            batch_size: Batch size
+            learning_rate: Fine-tuning learning rate
+            degradation_threshold: Relative validation loss increase that triggers a full retrain
+            max_scale_drift: How far scaled values may leave [0, 1] before a full retrain
+            seed: Seed for the replay sample
+            full_retrain_kwargs: Keyword arguments passed to ``fit`` on a full retrain
+
+        Returns:
+            Dict describing what was done (mode, losses, sample counts, seconds)
+        """
+        if not self.is_fitted:
+            raise ValueError("Model must be fitted or loaded before fine-tuning")
+
+        start = time.perf_counter()
+        full_retrain_kwargs = full_retrain_kwargs or {}
+
+        def retrain(reason):
+            print(f"⚠️ Falling back to full retrain: {reason}")
+            self.fit(data, **full_retrain_kwargs)
+            return {
+                'mode': 'full_retrain',
+                'reason': reason,
+                'val_loss': self.reference_val_loss,
+                'seconds': round(time.perf_counter() - start, 2)
+            }
+
+        try:
+            ts_data = self.prepare_data(data)
+            # Keep the fitted scaler: refitting would change what the weights mean
+            scaled_data = self.scaler.transform(ts_data)
+            if scaled_data.min() < -max_scale_drift or scaled_data.max() > 1 + max_scale_drift:
+                return retrain('data outside scaler range')
+
+            X, y = self.create_sequences(scaled_data, self.lookback_window)
+            if len(X) <= validation_months + 1:
+                raise ValueError(f"Not enough data points to hold out {validation_months} validation months")
+
+            X_val, y_val = X[-validation_months:], y[-validation_months:]
+            X_train, y_train = X[:-validation_months], y[:-validation_months]
+
+            # Recent sequences plus a replay sample of older ones
+            recent = min(recent_window, len(X_train))
+            older = len(X_train) - recent
+            replay = min(older, int(round(recent * replay_ratio)))
+            rng = np.random.default_rng(seed)
+            replay_idx = rng.choice(older, size=replay, replace=False) if replay else np.empty(0, dtype=int)
+            idx = np.concatenate([np.sort(replay_idx), np.arange(older, len(X_train))])
+
+            def compile_warm():
+                # Fresh optimizer state at the low fine-tuning rate
+                self.model.compile(
+                    optimizer=Adam(learning_rate=learning_rate),
+                    loss='mean_squared_error',
+                    metrics=[tf.keras.metrics.MeanAbsoluteError()]
+                )
+
+            def warm_fit(X_fit, y_fit, n_epochs, validation_data=None):
+                compile_warm()
+                callbacks = [EarlyStopping(monitor='val_loss', patience=2, restore_best_weights=True)] \
+                    if validation_data is not None else []
+                return self.model.fit(
+                    X_fit, y_fit,
+                    epochs=n_epochs,
+                    batch_size=batch_size,
+                    validation_data=validation_data,
+                    callbacks=callbacks,
+                    shuffle=True,
+                    verbose=0
+                )
+
+            compile_warm()
+            val_loss_before = float(self.model.evaluate(X_val, y_val, verbose=0, return_dict=True)['loss'])
+            reference = self.reference_val_loss if self.reference_val_loss is not None else val_loss_before
+            previous_weights = self.model.get_weights()
+
+            self.history = warm_fit(X_train[idx], y_train[idx], epochs, validation_data=(X_val, y_val))
+            val_losses = self.history.history['val_loss']
+            val_loss_after = float(min(val_losses))
+            best_epochs = int(np.argmin(val_losses)) + 1
+
+            # Never keep a fine-tune that made the held-out months worse
+            improved = val_loss_after < val_loss_before
+            if not improved:
+                self.model.set_weights(previous_weights)
+                val_loss_after = val_loss_before
+
+            if val_loss_after > reference * (1 + degradation_threshold):
+                return retrain(
+                    f'validation loss {val_loss_after:.5f} exceeds reference {reference:.5f} '
+                    f'by more than {degradation_threshold:.0%}'
+                )
+
+            if improved:
+                # The held-out months are the newest data: refit from the previous
+                # weights with the chosen epoch count, now including them
+                self.model.set_weights(previous_weights)
+                warm_fit(
+                    np.concatenate([X_train[idx], X_val]),
+                    np.concatenate([y_train[idx], y_val]),
+                    best_epochs
+                )
+
+            self.training_data = data
+            if self.reference_val_loss is None:
+                self.reference_val_loss = reference
+
+            return {
+                'mode': 'fine_tune',
+                'epochs': best_epochs if improved else 0,
+                'train_samples': int(len(idx)),
+                'replay_samples': int(replay),
+                'val_loss_before': val_loss_before,
+                'val_loss_after': val_loss_after,
+                'reference_val_loss': reference,
+                'seconds': round(time.perf_counter() - start, 2)
+            }
+
+        except Exception as e:
+            print(f"Error fine-tuning LSTM model: {e}")
+            raise
+
     def forecast(self, steps=12):
         """Generate forecasts for specified number of steps"""
         if not self.is_fitted:
@@ -200,8 +347,8 @@ class LSTMForecaster:
             print(f"Error evaluating model: {e}")
             raise
 
-    def save_model(self, model_path, scaler_path):
-        """Save trained model and scaler"""
+    def save_model(self, model_path, scaler_path, metadata_path=None):
+        """Save trained model and scaler, plus the reference validation loss if a metadata path is given"""
         if not self.is_fitted:
             raise ValueError("Model must be fitted before saving")
 
@@ -210,17 +357,34 @@ class LSTMForecaster:
             joblib.dump(self.scaler, scaler_path)
             print(f"Model saved to {model_path}")
             print(f"Scaler saved to {scaler_path}")
+            if metadata_path:
+                with open(metadata_path, 'w') as f:
+                    json.dump({
+                        'lookback_window': self.lookback_window,
+                        'reference_val_loss': self.reference_val_loss
+                    }, f)
 
         except Exception as e:
             print(f"Error saving model: {e}")
             raise
 
-    def load_model(self, model_path, scaler_path):
-        """Load trained model and scaler"""
+    def load_model(self, model_path, scaler_path, metadata_path=None):
+        """Load trained model and scaler (and metadata written by ``save_model``, if present)"""
         try:
             self.model = load_model(model_path, custom_objects={"mae": custom_mae})
             self.scaler = joblib.load(scaler_path)
             self.is_fitted = True
+            metadata = {}
+            if metadata_path:
+                try:
+                    with open(metadata_path) as f:
+                        metadata = json.load(f)
+                except FileNotFoundError:
+                    pass
+            self.reference_val_loss = metadata.get('reference_val_loss')
+            # Predictions need the window the model was trained with; older
+            # models without metadata still carry it in their input shape
+            self.lookback_window = metadata.get('lookback_window') or self.model.input_shape[1]
             print(f"Model loaded from {model_path}")
             print(f"Scaler loaded from {scaler_path}")
 
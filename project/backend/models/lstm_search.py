@@ -0,0 +1,299 @@
+"""Parallel LSTM hyperparameter search with successive halving
+
+Candidates are trained in a process pool with each worker's thread count
+capped, so trials run side by side without oversubscribing the CPU. After
+each rung only the best ``1/eta`` of the trials continue training (from their
+saved checkpoint); the rest are stopped early. The best trial's model, with
+the weights of its best validation epoch, and its scaler are written to a
+registry directory together with the full results.
+
+Example:
+    python -m models.lstm_search --data data/fred_series.csv --trials 27 --workers 4
+"""
+import argparse
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Values searched per LSTMForecaster constructor argument
+DEFAULT_SEARCH_SPACE = {
+    'lookback_window': [6, 12, 18, 24],
+    'lstm_units': [32, 50, 64],
+    'dropout_rate': [0.1, 0.2, 0.3]
+}
+
+
+def _init_worker(threads: int):
+    """Cap BLAS and TensorFlow threads in a worker process, before TensorFlow is imported"""
+    from services.thread_budget import ThreadBudget, configure_tensorflow
+
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+    # NumPy is already loaded (this module imports it); apply() caps it through threadpoolctl
+    ThreadBudget(cpus=threads, threads_per_worker=threads, executor_workers=1).apply()
+
+    import tensorflow as tf
+    configure_tensorflow(tf)
+
+
+def _fit_scaler(forecaster, data: pd.DataFrame, validation_months: int) -> np.ndarray:
+    """Fit the forecaster's scaler on the training months only; returns the scaled series"""
+    values = forecaster.prepare_data(data)
+    forecaster.scaler.fit(values[:len(values) - validation_months])
+    return forecaster.scaler.transform(values)
+
+
+def _train_trial(trial_id: int, config: Dict, data: pd.DataFrame, checkpoint: str, best_checkpoint: str,
+                 best_val_loss: Optional[float], start_epoch: int, end_epoch: int, validation_months: int,
+                 batch_size: int, seed: int) -> Dict:
+    """
+    Train one trial from ``start_epoch`` to ``end_epoch`` (runs in a worker process)
+
+    The scaler is fit on the training months only and validation always
+    covers the last ``validation_months`` targets, so losses are comparable
+    across lookback windows. ``checkpoint`` holds the last epoch (training
+    resumes from it); ``best_checkpoint`` is only overwritten by an epoch
+    beating ``best_val_loss``, the trial's best so far.
+    """
+    import tensorflow as tf
+    from tensorflow.keras.models import load_model
+    from models.lstm_model import LSTMForecaster, custom_mae
+
+    started = time.perf_counter()
+    tf.keras.utils.set_random_seed(seed + trial_id)
+
+    forecaster = LSTMForecaster(**config)
+    scaled = _fit_scaler(forecaster, data, validation_months)
+    X, y = forecaster.create_sequences(scaled, forecaster.lookback_window)
+    X_train, y_train = X[:-validation_months], y[:-validation_months]
+    X_val, y_val = X[-validation_months:], y[-validation_months:]
+
+    if start_epoch > 0 and Path(checkpoint).exists():
+        # Resume with the optimizer state saved at the previous rung
+        model = load_model(checkpoint, custom_objects={"mae": custom_mae})
+    else:
+        model = forecaster.build_model()
+
+    history = model.fit(
+        X_train, y_train,
+        initial_epoch=start_epoch,
+        epochs=end_epoch,
+        batch_size=batch_size,
+        validation_data=(X_val, y_val),
+        callbacks=[tf.keras.callbacks.ModelCheckpoint(
+            best_checkpoint, monitor='val_loss', save_best_only=True,
+            initial_value_threshold=best_val_loss
+        )],
+        verbose=0
+    )
+    model.save(checkpoint)
+
+    return {
+        'trial_id': trial_id,
+        'val_losses': [float(v) for v in history.history['val_loss']],
+        'seconds': time.perf_counter() - started
+    }
+
+
+class SuccessiveHalvingSearch:
+    """Successive-halving search over LSTMForecaster hyperparameters
+
+    Rung ``k`` trains the surviving trials up to ``min_epochs * eta**k``
+    epochs; after each rung the best ``1/eta`` (by best validation loss so
+    far) survive, until ``max_epochs`` is reached or one trial remains.
+    """
+
+    def __init__(self, search_space: Optional[Dict[str, List]] = None, n_trials: int = 27,
+                 min_epochs: int = 3, max_epochs: int = 27, eta: int = 3, workers: Optional[int] = None,
+                 threads_per_worker: int = 1, validation_months: int = 12, batch_size: int = 32,
+                 seed: int = 42):
+        """
+        Args:
+            search_space: Values per constructor argument; defaults to DEFAULT_SEARCH_SPACE
+            n_trials: Configurations sampled (without replacement) from the grid
+            min_epochs: Epochs trained by every trial in the first rung
+            max_epochs: Epochs trained by trials reaching the last rung
+            eta: Reduction factor between rungs
+            workers: Worker processes; defaults to CPU count / threads_per_worker
+            threads_per_worker: TensorFlow/BLAS threads per worker
+            validation_months: Most recent targets held out for validation
+            batch_size: Training batch size
+            seed: Seed for sampling configurations and model initialization
+        """
+        self.search_space = search_space or DEFAULT_SEARCH_SPACE
+        self.n_trials = n_trials
+        self.min_epochs = min_epochs
+        self.max_epochs = max_epochs
+        self.eta = eta
+        self.threads_per_worker = threads_per_worker
+        self.workers = workers or max(1, (os.cpu_count() or 1) // threads_per_worker)
+        self.validation_months = validation_months
+        self.batch_size = batch_size
+        self.seed = seed
+
+    def sample_configs(self) -> List[Dict]:
+        names = list(self.search_space)
+        grid = list(itertools.product(*(self.search_space[n] for n in names)))
+        rng = np.random.default_rng(self.seed)
+        picks = rng.choice(len(grid), size=min(self.n_trials, len(grid)), replace=False)
+        return [
+            {name: (value.item() if hasattr(value, 'item') else value) for name, value in zip(names, grid[i])}
+            for i in sorted(picks)
+        ]
+
+    def rung_epochs(self) -> List[int]:
+        epochs, budget = [], self.min_epochs
+        while budget < self.max_epochs:
+            epochs.append(budget)
+            budget *= self.eta
+        epochs.append(self.max_epochs)
+        return epochs
+
+    def run(self, data: pd.DataFrame, out_dir) -> Dict:
+        """
+        Run the search and write results plus the best artifact
+
+        Args:
+            data: Revenue history (Date, Revenue) as used by LSTMForecaster.fit
+            out_dir: Registry directory for checkpoints, results and the best model
+
+        Returns:
+            Results dict (also written to ``results.json``)
+        """
+        out_dir = Path(out_dir)
+        checkpoints = out_dir / 'checkpoints'
+        checkpoints.mkdir(parents=True, exist_ok=True)
+
+        configs = self.sample_configs()
+        trials = {
+            i: {'trial_id': i, 'config': config, 'epochs': 0, 'val_losses': [], 'seconds': 0.0,
+                'checkpoint': str(checkpoints / f'trial_{i}.keras'),
+                'best_checkpoint': str(checkpoints / f'trial_{i}_best.keras'), 'stopped_at_rung': None}
+            for i, config in enumerate(configs)
+        }
+        survivors = list(trials)
+        started = time.perf_counter()
+        rungs = self.rung_epochs()
+
+        # Spawned workers start without the parent's state, so thread caps apply before TF loads
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                 initializer=_init_worker, initargs=(self.threads_per_worker,)) as pool:
+            for rung, epochs in enumerate(rungs):
+                futures = [
+                    pool.submit(
+                        _train_trial, i, trials[i]['config'], data, trials[i]['checkpoint'],
+                        trials[i]['best_checkpoint'], min(trials[i]['val_losses'], default=None),
+                        trials[i]['epochs'], epochs, self.validation_months, self.batch_size, self.seed
+                    )
+                    for i in survivors
+                ]
+                for future in futures:
+                    result = future.result()
+                    trial = trials[result['trial_id']]
+                    trial['val_losses'].extend(result['val_losses'])
+                    trial['seconds'] += result['seconds']
+                    trial['epochs'] = epochs
+
+                survivors.sort(key=lambda i: min(trials[i]['val_losses']))
+                print(f"✅ Rung {rung}: {len(survivors)} trial(s) at {epochs} epochs, "
+                      f"best val_loss {min(trials[survivors[0]]['val_losses']):.5f}")
+
+                if rung == len(rungs) - 1:
+                    break
+                keep = max(1, math.floor(len(survivors) / self.eta))
+                for i in survivors[keep:]:
+                    trials[i]['stopped_at_rung'] = rung
+                survivors = survivors[:keep]
+
+        best = trials[survivors[0]]
+        best_loss = min(best['val_losses'])
+        self._write_best(best, best_loss, data, self.validation_months, out_dir)
+
+        results = {
+            'created_at': datetime.utcnow().isoformat(),
+            'search_space': self.search_space,
+            'rung_epochs': rungs,
+            'eta': self.eta,
+            'workers': self.workers,
+            'threads_per_worker': self.threads_per_worker,
+            'seconds': round(time.perf_counter() - started, 2),
+            'epochs_trained': sum(t['epochs'] for t in trials.values()),
+            'best': {'trial_id': best['trial_id'], 'config': best['config'], 'val_loss': best_loss},
+            'trials': [
+                {
+                    'trial_id': t['trial_id'],
+                    'config': t['config'],
+                    'epochs': t['epochs'],
+                    'best_val_loss': min(t['val_losses']),
+                    'stopped_at_rung': t['stopped_at_rung'],
+                    'seconds': round(t['seconds'], 2)
+                }
+                for t in trials.values()
+            ]
+        }
+        with open(out_dir / 'results.json', 'w') as f:
+            json.dump(results, f, indent=2)
+        return results
+
+    @staticmethod
+    def _write_best(trial: Dict, val_loss: float, data: pd.DataFrame, validation_months: int, out_dir: Path):
+        """Save the best trial's best epoch (scored ``val_loss``) in the layout served from backend/model/"""
+        from tensorflow.keras.models import load_model
+        from models.lstm_model import LSTMForecaster, custom_mae
+
+        forecaster = LSTMForecaster(**trial['config'])
+        _fit_scaler(forecaster, data, validation_months)
+        forecaster.model = load_model(trial['best_checkpoint'], custom_objects={"mae": custom_mae})
+        forecaster.is_fitted = True
+        forecaster.reference_val_loss = val_loss
+        forecaster.save_model(
+            str(out_dir / 'lstm_model.h5'),
+            str(out_dir / 'scaler.pkl'),
+            str(out_dir / 'lstm_metadata.json')
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Successive-halving LSTM hyperparameter search')
+    parser.add_argument('--data', default='data/fred_series.csv', help='CSV with Date, Revenue columns')
+    parser.add_argument('--out', help='registry directory (default: output/registry/lstm_<timestamp>)')
+    parser.add_argument('--trials', type=int, default=27)
+    parser.add_argument('--min-epochs', type=int, default=3)
+    parser.add_argument('--max-epochs', type=int, default=27)
+    parser.add_argument('--eta', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--threads-per-worker', type=int, default=1)
+    parser.add_argument('--validation-months', type=int, default=12)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    out = args.out or f'output/registry/lstm_{datetime.now().strftime("%Y%m%d_%H%M%S")}'
+    data = pd.read_csv(args.data)[['Date', 'Revenue']]
+
+    search = SuccessiveHalvingSearch(
+        n_trials=args.trials,
+        min_epochs=args.min_epochs,
+        max_epochs=args.max_epochs,
+        eta=args.eta,
+        workers=args.workers,
+        threads_per_worker=args.threads_per_worker,
+        validation_months=args.validation_months,
+        seed=args.seed
+    )
+    results = search.run(data, out)
+    print(f"✅ Best config {results['best']['config']} (val_loss {results['best']['val_loss']:.5f}) "
+          f"in {results['seconds']}s; artifacts in {out}")
+
+
+if __name__ == '__main__':
+    main()
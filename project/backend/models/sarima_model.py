@@ -1,5 +1,12 @@
+import argparse
+import json
+import os
 import numpy as np
 import pandas as pd
+import threading
+from functools import lru_cache
+from statistics import NormalDist
+from scipy.linalg import solve_discrete_lyapunov
 from statsmodels.tsa.statespace.sarimax import SARIMAX
 from statsmodels.tsa.seasonal import seasonal_decompose
 from statsmodels.stats.diagnostic import acorr_ljungbox
@@ -7,21 +14,362 @@ from sklearn.metrics import mean_squared_error, mean_absolute_error
 import warnings
 warnings.filterwarnings('ignore')
 
+# Version of the slim .npz artifact layout written by SARIMAForecastCache.save
+ARTIFACT_VERSION = 1
+
+# In-sample one-step predictions kept in an artifact for backtests
+ARTIFACT_RECENT_MONTHS = 36
+
+_ARTIFACT_ARRAYS = ('design', 'obs_intercept', 'obs_cov', 'transition', 'state_intercept',
+                    'state_cov_full', 'state', 'state_cov')
+
+@lru_cache(maxsize=32)
+def z_multiplier(alpha):
+    """Two-sided normal critical value for a (1 - alpha) interval"""
+    return NormalDist().inv_cdf(1 - alpha / 2)
+
+
+def _time_invariant(matrix):
+    """Drop the time axis of a state-space matrix, or return None if it varies over time"""
+    matrix = np.asarray(matrix, dtype=float)
+    return matrix[..., 0] if matrix.shape[-1] == 1 else None
+
+
+class SARIMAForecastCache:
+    """Precomputed SARIMA forecast mean and variance paths
+
+    Holds the Kalman filter's predicted state moments after the last
+    observation together with the (time-invariant) state-space matrices, and
+    rolls them forward once to a maximum horizon. Forecasts for any horizon up
+    to that maximum and any confidence level are then array slices plus a z
+    multiplier; longer horizons extend the cached paths with the same NumPy
+    recursion. No statsmodels call is made on the request path.
+
+    With exogenous regressors the observation intercept is ``x_t' beta``; the
+    state recursion does not involve it, so the cached paths hold the state
+    part and each forecast adds the regression term for its exog path.
+    """
+
+    def __init__(self, design, obs_intercept, obs_cov, transition, state_intercept, state_cov_full,
+                 state, state_cov, last_date=None, max_horizon=120, exog_params=None, exog_names=None,
+                 recent_actual=None, recent_fitted=None, model_info=None):
+        """
+        Args:
+            design: Observation matrix Z (k_endog x k_states)
+            obs_intercept: Observation intercept d (k_endog)
+            obs_cov: Observation noise covariance H (k_endog x k_endog)
+            transition: Transition matrix T (k_states x k_states)
+            state_intercept: State intercept c (k_states)
+            state_cov_full: State noise covariance R Q R' (k_states x k_states)
+            state: Predicted state a(n+1|n) after the last observation
+            state_cov: Predicted state covariance P(n+1|n)
+            last_date: Date of the last observation
+            max_horizon: Steps to precompute
+            exog_params: Regression coefficients of the exogenous regressors, if any
+            exog_names: Regressor names, in coefficient order
+            recent_actual: Last observations (for backtests without the full results)
+            recent_fitted: One-step in-sample predictions of those observations
+            model_info: Order, seasonal order and named parameters, for reporting
+        """
+        self.design = np.asarray(design, dtype=float)
+        self.obs_intercept = np.asarray(obs_intercept, dtype=float)
+        self.obs_cov = np.asarray(obs_cov, dtype=float)
+        self.transition = np.asarray(transition, dtype=float)
+        self.state_intercept = np.asarray(state_intercept, dtype=float)
+        self.state_cov_full = np.asarray(state_cov_full, dtype=float)
+        self.state = np.asarray(state, dtype=float)
+        self.state_cov = np.asarray(state_cov, dtype=float)
+        self.last_date = pd.Timestamp(last_date) if last_date is not None else None
+        self.exog_params = np.asarray(exog_params, dtype=float) if exog_params is not None else None
+        self.exog_names = list(exog_names) if exog_names is not None else []
+        self.recent_actual = np.asarray(recent_actual, dtype=float) if recent_actual is not None else None
+        self.recent_fitted = np.asarray(recent_fitted, dtype=float) if recent_fitted is not None else None
+        self.model_info = model_info or {}
+
+        self.mean = np.empty(0)
+        self.variance = np.empty(0)
+        self._extend_lock = threading.Lock()
+        self._next_state = self.state.copy()
+        self._next_state_cov = self.state_cov.copy()
+        self._extend(max_horizon)
+
+    @classmethod
+    def from_results(cls, results, max_horizon=120):
+        """
+        Build the cache from fitted SARIMAX results
+
+        Args:
+            results: statsmodels SARIMAXResults (or any MLEResults with an ssm)
+            max_horizon: Steps to precompute
+
+        Raises:
+            ValueError: If the state-space system is time-varying (other than
+                through exogenous regressors)
+        """
+        # Filter results hold the system matrices at the fitted parameters,
+        # each with a trailing time axis of length 1 when time-invariant
+        filter_results = results.filter_results
+        model = results.model
+        k_exog = getattr(model, 'k_exog', 0) if getattr(model, 'mle_regression', False) else 0
+        matrices = {
+            name: _time_invariant(getattr(filter_results, name))
+            for name in ('design', 'obs_intercept', 'obs_cov', 'transition',
+                         'state_intercept', 'selection', 'state_cov')
+        }
+        exog_params = None
+        if k_exog:
+            # Regression term enters through the observation intercept only
+            matrices['obs_intercept'] = np.zeros(filter_results.design.shape[0])
+            exog_params = np.asarray(results.params)[model.k_trend:model.k_trend + k_exog]
+        if any(m is None for m in matrices.values()):
+            raise ValueError("Time-varying state-space systems cannot be cached")
+
+        selection = matrices['selection']
+        dates = getattr(results.data, 'dates', None)
+
+        return cls(
+            design=matrices['design'],
+            obs_intercept=matrices['obs_intercept'],
+            obs_cov=matrices['obs_cov'],
+            transition=matrices['transition'],
+            state_intercept=matrices['state_intercept'],
+            state_cov_full=selection @ matrices['state_cov'] @ selection.T,
+            state=filter_results.predicted_state[:, -1],
+            state_cov=filter_results.predicted_state_cov[:, :, -1],
+            last_date=dates[-1] if dates is not None else None,
+            max_horizon=max_horizon,
+            exog_params=exog_params,
+            exog_names=model.exog_names if k_exog else None,
+            recent_actual=np.asarray(model.endog, dtype=float).ravel()[-ARTIFACT_RECENT_MONTHS:],
+            recent_fitted=np.asarray(results.fittedvalues, dtype=float)[-ARTIFACT_RECENT_MONTHS:],
+            model_info={
+                'order': list(getattr(model, 'order', ())),
+                'seasonal_order': list(getattr(model, 'seasonal_order', ())),
+                'params': dict(zip(model.param_names, np.asarray(results.params, dtype=float).tolist()))
+            }
+        )
+
+    def save(self, filepath):
+        """
+        Write a slim artifact: system matrices, the predicted state and its
+        covariance after the last observation, and a little metadata
+
+        Unlike a pickled results object it holds no training data, residual
+        series or filter output, so it is a few kilobytes and loads without
+        unpickling any statsmodels objects.
+
+        Args:
+            filepath: Destination ``.npz`` file
+        """
+        arrays = {name: getattr(self, name) for name in _ARTIFACT_ARRAYS}
+        if self.exog_params is not None:
+            arrays['exog_params'] = self.exog_params
+        if self.recent_actual is not None:
+            arrays['recent_actual'] = self.recent_actual
+            arrays['recent_fitted'] = self.recent_fitted
+        meta = {
+            'version': ARTIFACT_VERSION,
+            'last_date': self.last_date.strftime('%Y-%m-%d') if self.last_date is not None else None,
+            'exog_names': self.exog_names,
+            'model_info': self.model_info
+        }
+        with open(filepath, 'wb') as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), **arrays)
+
+    @classmethod
+    def load(cls, filepath, max_horizon=120):
+        """
+        Rebuild a forecast cache from a slim artifact
+
+        Args:
+            filepath: ``.npz`` file written by :meth:`save`
+            max_horizon: Steps to precompute
+
+        Raises:
+            ValueError: If the artifact was written by a newer layout version
+        """
+        with np.load(filepath, allow_pickle=False) as artifact:
+            meta = json.loads(str(artifact['meta']))
+            if meta.get('version', 0) > ARTIFACT_VERSION:
+                raise ValueError(f"Unsupported SARIMA artifact version {meta['version']}")
+            arrays = {name: artifact[name] for name in artifact.files if name != 'meta'}
+
+        return cls(
+            **{name: arrays[name] for name in _ARTIFACT_ARRAYS},
+            last_date=meta.get('last_date'),
+            max_horizon=max_horizon,
+            exog_params=arrays.get('exog_params'),
+            exog_names=meta.get('exog_names'),
+            recent_actual=arrays.get('recent_actual'),
+            recent_fitted=arrays.get('recent_fitted'),
+            model_info=meta.get('model_info')
+        )
+
+    @property
+    def max_horizon(self):
+        return len(self.mean)
+
+    def _extend(self, steps):
+        """Roll the predicted state moments forward by `steps` and append to the paths"""
+        if steps <= 0:
+            return
+
+        Z, T = self.design, self.transition
+        a, P = self._next_state, self._next_state_cov
+        mean = np.empty(steps)
+        variance = np.empty(steps)
+
+        for h in range(steps):
+            mean[h] = (self.obs_intercept + Z @ a)[0]
+            variance[h] = (Z @ P @ Z.T + self.obs_cov)[0, 0]
+            a = self.state_intercept + T @ a
+            P = T @ P @ T.T + self.state_cov_full
+
+        self._next_state, self._next_state_cov = a, P
+        self.mean = np.concatenate([self.mean, mean])
+        self.variance = np.concatenate([self.variance, variance])
+
+    def forecast(self, steps=12, alpha=0.05, exog=None):
+        """
+        Forecast mean and confidence bounds
+
+        Args:
+            steps: Forecast horizon
+            alpha: Significance level (0.05 gives a 95% interval)
+            exog: Regressor values (steps x regressors), required when the
+                model has exogenous regressors
+
+        Returns:
+            Tuple of (mean, lower, upper) arrays of length `steps`
+        """
+        if steps > self.max_horizon:
+            with self._extend_lock:
+                self._extend(steps - self.max_horizon)
+
+        mean = self.mean[:steps]
+        if self.exog_params is not None:
+            if exog is None:
+                raise ValueError("Exogenous regressor values are required for this model")
+            mean = mean + np.asarray(exog, dtype=float).reshape(steps, -1) @ self.exog_params
+        half_width = z_multiplier(alpha) * np.sqrt(self.variance[:steps])
+        return mean, mean - half_width, mean + half_width
+
+    def _initial_state_cov(self, diffuse_scale):
+        """
+        Initial state covariance for filtering a new series
+
+        SARIMA states are the differencing states followed by a stationary
+        ARMA block that does not depend on them. As in statsmodels, the
+        differencing states get an approximate diffuse variance and the ARMA
+        block its stationary covariance; unlike statsmodels' fixed 1e6, the
+        diffuse variance is ``diffuse_scale`` times the noise scale, so the
+        gains are the same for series of any size.
+        """
+        T, Q = self.transition, self.state_cov_full
+        k_states = T.shape[0]
+        k_diffuse = next(
+            (k for k in range(k_states + 1)
+             if not np.any(T[k:, :k]) and (k == k_states or np.abs(np.linalg.eigvals(T[k:, k:])).max() < 1)),
+            k_states
+        )
+
+        P = np.zeros((k_states, k_states))
+        P[:k_diffuse, :k_diffuse] = np.eye(k_diffuse) * diffuse_scale * max(np.abs(np.diag(Q)).max(),
+                                                                             self.obs_cov[0, 0])
+        if k_diffuse < k_states:
+            P[k_diffuse:, k_diffuse:] = solve_discrete_lyapunov(T[k_diffuse:, k_diffuse:], Q[k_diffuse:, k_diffuse:])
+        return P, k_diffuse
+
+    def forecast_many(self, values, steps=12, diffuse_scale=1e6):
+        """
+        Forecast many series with the fitted SARIMA parameters in one pass
+
+        The Kalman gain and state covariance recursions do not depend on the
+        observations, so they are computed once and shared; only the state
+        means are tracked per series, as one (series x states) matrix. The
+        gains are invariant to the scale of the data, so series of any size
+        can be filtered with the fitted system.
+
+        Args:
+            values: 2-D array (series x months) of complete histories
+            steps: Forecast horizon
+            diffuse_scale: Variance of the differencing states relative to the noise
+
+        Returns:
+            Tuple of (mean, residual_var): forecasts (series x steps) and each
+            series' one-step-ahead innovation variance after the diffuse burn-in
+        """
+        if self.exog_params is not None:
+            raise ValueError("Batch forecasts are not supported with exogenous regressors")
+
+        Y = np.asarray(values, dtype=float)
+        Z, T = self.design[0], self.transition
+        d, H = self.obs_intercept[0], self.obs_cov[0, 0]
+        n_series, n_obs = Y.shape
+
+        P, burn_in = self._initial_state_cov(diffuse_scale)
+        burn_in = min(burn_in, n_obs - 1)
+        a = np.zeros((n_series, T.shape[0]))
+        sq_innovations = np.zeros(n_series)
+
+        for t in range(n_obs):
+            F = Z @ P @ Z + H
+            gain = T @ P @ Z / F
+            innovation = Y[:, t] - (d + a @ Z)
+            if t >= burn_in:
+                sq_innovations += innovation ** 2
+            a = self.state_intercept + a @ T.T + np.outer(innovation, gain)
+            P = T @ P @ T.T + self.state_cov_full - np.outer(gain, gain) * F
+
+        mean = np.empty((n_series, steps))
+        for h in range(steps):
+            mean[:, h] = d + a @ Z
+            a = self.state_intercept + a @ T.T
+
+        return mean, sq_innovations / max(n_obs - burn_in, 1)
+
+    def forecast_dates(self, steps, last_date=None):
+        """Monthly dates following the last observation"""
+        last_date = pd.Timestamp(last_date) if last_date is not None else self.last_date
+        return pd.date_range(start=last_date + pd.DateOffset(months=1), periods=steps, freq='MS')
+
+
 class SARIMAForecaster:
-    def __init__(self, order=(1, 1, 1), seasonal_order=(1, 1, 1, 12)):
+    def __init__(self, order=(1, 1, 1), seasonal_order=(1, 1, 1, 12), max_horizon=120):
         """
         Initialize SARIMA model
         
         Args:
             order: (p, d, q) parameters for ARIMA
             seasonal_order: (P, D, Q, s) parameters for seasonal component
+            max_horizon: Horizon precomputed by the forecast cache
         """
         self.order = order
         self.seasonal_order = seasonal_order
+        self.max_horizon = max_horizon
         self.model = None
         self.fitted_model = None
+        self.forecast_cache = None
         self.is_fitted = False
     
+    @staticmethod
+    def align_exog(exog, index):
+        """
+        Exogenous regressors for the months of a series
+
+        Args:
+            exog: Month-start indexed DataFrame (e.g. from services.exog_features.align_monthly)
+            index: Dates of the series
+
+        Raises:
+            ValueError: If a regressor is missing for any of the months
+        """
+        aligned = exog.reindex(index)
+        if aligned.isna().any().any():
+            missing = aligned.index[aligned.isna().any(axis=1)]
+            raise ValueError(f"Exogenous features missing for {len(missing)} month(s) from {missing[0]:%Y-%m}")
+        return aligned
+    
     def prepare_data(self, data):
         """Prepare time series data for modeling"""
         if isinstance(data, pd.DataFrame):
@@ -34,14 +382,22 @@ class SARIMAForecaster:
         
         return data['revenue']
     
-    def fit(self, data):
-        """Fit SARIMA model to training data"""
+    def fit(self, data, exog=None):
+        """
+        Fit SARIMA model to training data
+        
+        Args:
+            data: Revenue history (DataFrame of date, revenue)
+            exog: Optional month-start indexed regressors (SARIMAX); the
+                same aligned matrix can be passed to every fit and backtest
+        """
         try:
             ts_data = self.prepare_data(data)
             
             # Initialize and fit SARIMA model
             self.model = SARIMAX(
                 ts_data,
+                exog=self.align_exog(exog, ts_data.index) if exog is not None else None,
                 order=self.order,
                 seasonal_order=self.seasonal_order,
                 enforce_stationarity=False,
@@ -49,6 +405,7 @@ class SARIMAForecaster:
             )
             
             self.fitted_model = self.model.fit(disp=False)
+            self._build_forecast_cache()
             self.is_fitted = True
             
             return self.fitted_model
@@ -57,18 +414,42 @@ class SARIMAForecaster:
             print(f"Error fitting SARIMA model: {e}")
             raise
     
-    def forecast(self, steps=12):
-        """Generate forecasts for specified number of steps"""
+    def _build_forecast_cache(self):
+        """Precompute forecast paths; time-varying systems fall back to statsmodels"""
+        try:
+            self.forecast_cache = SARIMAForecastCache.from_results(self.fitted_model, self.max_horizon)
+        except ValueError:
+            self.forecast_cache = None
+    
+    def forecast(self, steps=12, alpha=0.05, exog=None):
+        """
+        Generate forecasts for specified number of steps
+        
+        Args:
+            steps: Forecast horizon
+            alpha: Significance level
+            exog: Future regressor values (steps x regressors) for a SARIMAX fit
+                (e.g. from services.exog_features.future_exog)
+        """
         if not self.is_fitted:
             raise ValueError("Model must be fitted before forecasting")
         
         try:
-            # Generate forecast
-            forecast_result = self.fitted_model.forecast(steps=steps)
-            confidence_int = self.fitted_model.get_forecast(steps=steps).conf_int()
+            if self.forecast_cache is not None:
+                # Mean and confidence bounds from the cached state-space paths
+                mean, lower, upper = self.forecast_cache.forecast(steps, alpha, exog)
+            else:
+                # Single prediction pass for both mean and intervals
+                prediction = self.fitted_model.get_forecast(steps=steps, exog=exog)
+                confidence_int = prediction.conf_int(alpha=alpha)
+                mean = prediction.predicted_mean.values
+                lower = confidence_int.iloc[:, 0].values
+                upper = confidence_int.iloc[:, 1].values
             
-            # Create forecast dates
-            last_date = self.fitted_model.data.dates[-1]
+            if self.fitted_model is not None:
+                last_date = self.fitted_model.data.dates[-1]
+            else:
+                last_date = self.forecast_cache.last_date
             forecast_dates = pd.date_range(
                 start=last_date + pd.DateOffset(months=1),
                 periods=steps,
@@ -78,9 +459,9 @@ class SARIMAForecaster:
             # Create forecast DataFrame
             forecasts = pd.DataFrame({
                 'date': forecast_dates,
-                'forecasted_revenue': forecast_result.values,
-                'lower_bound': confidence_int.iloc[:, 0].values,
-                'upper_bound': confidence_int.iloc[:, 1].values
+                'forecasted_revenue': mean,
+                'lower_bound': lower,
+                'upper_bound': upper
             })
             
             # Add scenario projections
@@ -94,10 +475,12 @@ class SARIMAForecaster:
             print(f"Error generating forecasts: {e}")
             raise
     
-    def evaluate(self, test_data):
-        """Evaluate model performance on test data"""
+    def evaluate(self, test_data, exog=None):
+        """Evaluate model performance on test data (exog: regressors, for a SARIMAX fit)"""
         if not self.is_fitted:
             raise ValueError("Model must be fitted before evaluation")
+        if self.fitted_model is None:
+            raise ValueError("Evaluation needs the full model, not a slim artifact")
         
         try:
             ts_test = self.prepare_data(test_data)
@@ -106,7 +489,13 @@ class SARIMAForecaster:
             start_date = ts_test.index[0]
             end_date = ts_test.index[-1]
             
-            predictions = self.fitted_model.predict(start=start_date, end=end_date)
+            # Regressors for the test months beyond the training sample
+            test_exog = None
+            if exog is not None:
+                out_of_sample = ts_test.index[ts_test.index > self.fitted_model.data.dates[-1]]
+                test_exog = self.align_exog(exog, out_of_sample) if len(out_of_sample) else None
+            
+            predictions = self.fitted_model.predict(start=start_date, end=end_date, exog=test_exog)
             
             # Calculate metrics
             mse = mean_squared_error(ts_test, predictions)
@@ -133,6 +522,8 @@ class SARIMAForecaster:
         """Perform model diagnostics"""
         if not self.is_fitted:
             raise ValueError("Model must be fitted before running diagnostics")
+        if self.fitted_model is None:
+            raise ValueError("Diagnostics need the full model, not a slim artifact")
         
         try:
             # Residual analysis
@@ -159,12 +550,17 @@ class SARIMAForecaster:
             raise
     
     def save_model(self, filepath):
-        """Save trained model to file"""
+        """Save trained model to file (a ``.npz`` path writes the slim forecast-only artifact)"""
         if not self.is_fitted:
             raise ValueError("Model must be fitted before saving")
         
         try:
-            self.fitted_model.save(filepath)
+            if str(filepath).endswith('.npz'):
+                if self.forecast_cache is None:
+                    raise ValueError("Time-varying state-space systems have no slim artifact")
+                self.forecast_cache.save(filepath)
+            else:
+                self.fitted_model.save(filepath)
             print(f"Model saved to {filepath}")
             
         except Exception as e:
@@ -172,13 +568,47 @@ class SARIMAForecaster:
             raise
     
     def load_model(self, filepath):
-        """Load trained model from file"""
+        """
+        Load trained model from file
+        
+        A slim ``.npz`` artifact loads only the forecast cache: forecasts work,
+        while evaluate and diagnostics need the full results file.
+        """
         try:
-            from statsmodels.tsa.statespace.sarimax import SARIMAXResults
-            self.fitted_model = SARIMAXResults.load(filepath)
+            if str(filepath).endswith('.npz'):
+                self.fitted_model = None
+                self.forecast_cache = SARIMAForecastCache.load(filepath, self.max_horizon)
+            else:
+                from statsmodels.tsa.statespace.sarimax import SARIMAXResults
+                self.fitted_model = SARIMAXResults.load(filepath)
+                self._build_forecast_cache()
             self.is_fitted = True
             print(f"Model loaded from {filepath}")
             
         except Exception as e:
             print(f"Error loading model: {e}")
-            raise
\ No newline at end of file
+            raise
+
+
+def convert_artifact(source, destination):
+    """
+    Convert a pickled SARIMAX results file to a slim ``.npz`` artifact
+
+    Returns:
+        Tuple of (source size, artifact size) in bytes
+    """
+    import joblib
+
+    results = joblib.load(source)
+    SARIMAForecastCache.from_results(results).save(destination)
+    return os.path.getsize(source), os.path.getsize(destination)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert a pickled SARIMA model to the slim artifact format')
+    parser.add_argument('source', help='pickled SARIMAX results (e.g. model/sarima_model.pkl)')
+    parser.add_argument('destination', help='artifact to write (e.g. model/sarima_model.npz)')
+    args = parser.parse_args()
+
+    source_size, artifact_size = convert_artifact(args.source, args.destination)
+    print(f"✅ {args.destination}: {artifact_size / 1024:.1f} KB (pickle: {source_size / 1024:.1f} KB)")
\ No newline at end of file
@@ -0,0 +1,402 @@
+import asyncio
+import functools
+import inspect
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import AsyncIterable, Dict, Iterable, Optional
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted to its lane"""
+
+    def __init__(self, lane: str, status_code: int, reason: str, retry_after: int = 1):
+        super().__init__(reason)
+        self.lane = lane
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionLane:
+    """Concurrency limit with a bounded wait queue for one class of endpoints
+
+    Up to ``max_concurrent`` requests run at once. Further requests wait in a
+    queue of at most ``max_queue`` entries for up to ``max_wait`` seconds.
+    A full queue is rejected immediately with 429; a request that waits too
+    long is rejected with 503.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, max_wait: float):
+        """
+        Args:
+            name: Lane name used in metrics and error responses
+            max_concurrent: Requests allowed to run at the same time
+            max_queue: Requests allowed to wait for a slot
+            max_wait: Seconds a queued request waits before being rejected
+        """
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+
+        self._cond = threading.Condition()
+        self._active = 0
+        self._queued = 0
+        self._admitted = 0
+        self._rejected_queue_full = 0
+        self._rejected_timeout = 0
+        self._max_queued = 0
+        self._wait_times = deque(maxlen=1000)
+
+    def acquire(self):
+        """
+        Wait for a slot in this lane
+
+        Raises:
+            AdmissionRejected: If the queue is full (429) or the wait timed out (503)
+        """
+        start = time.monotonic()
+        with self._cond:
+            if self._active < self.max_concurrent and self._queued == 0:
+                self._active += 1
+                self._admitted += 1
+                self._wait_times.append(0.0)
+                return
+
+            if self._queued >= self.max_queue:
+                self._rejected_queue_full += 1
+                raise AdmissionRejected(self.name, 429, f'{self.name} queue is full',
+                                        retry_after=max(1, math.ceil(self.max_wait)))
+
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+            deadline = start + self.max_wait
+            try:
+                while self._active >= self.max_concurrent:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._rejected_timeout += 1
+                        raise AdmissionRejected(self.name, 503, f'{self.name} capacity exhausted',
+                                                retry_after=max(1, math.ceil(self.max_wait)))
+                    self._cond.wait(remaining)
+                self._active += 1
+                self._admitted += 1
+                self._wait_times.append(time.monotonic() - start)
+            finally:
+                self._queued -= 1
+
+    def release(self):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify()
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return self._snapshot()
+
+    def _snapshot(self) -> Dict:
+        waits = sorted(self._wait_times)
+        return {
+            'max_concurrent': self.max_concurrent,
+            'max_queue': self.max_queue,
+            'max_wait_ms': round(self.max_wait * 1000),
+            'active': self._active,
+            'queue_depth': self._queued,
+            'max_queue_depth': self._max_queued,
+            'admitted': self._admitted,
+            'rejected_queue_full': self._rejected_queue_full,
+            'rejected_timeout': self._rejected_timeout,
+            'wait_ms_avg': round(1000 * sum(waits) / len(waits), 2) if waits else 0.0,
+            'wait_ms_p95': round(1000 * waits[int(0.95 * (len(waits) - 1))], 2) if waits else 0.0,
+            'wait_ms_max': round(1000 * waits[-1], 2) if waits else 0.0
+        }
+
+
+class AsyncAdmissionLane(AdmissionLane):
+    """:class:`AdmissionLane` for async views on a single event loop
+
+    Same limits and counters, but queued requests wait on an
+    ``asyncio.Condition`` instead of blocking a thread.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, max_wait: float):
+        super().__init__(name, max_concurrent, max_queue, max_wait)
+        self._cond = asyncio.Condition()
+
+    async def acquire(self):
+        """
+        Wait for a slot in this lane
+
+        Raises:
+            AdmissionRejected: If the queue is full (429) or the wait timed out (503)
+        """
+        start = time.monotonic()
+        if self._active < self.max_concurrent and self._queued == 0:
+            self._active += 1
+            self._admitted += 1
+            self._wait_times.append(0.0)
+            return
+
+        if self._queued >= self.max_queue:
+            self._rejected_queue_full += 1
+            raise AdmissionRejected(self.name, 429, f'{self.name} queue is full',
+                                    retry_after=max(1, math.ceil(self.max_wait)))
+
+        self._queued += 1
+        self._max_queued = max(self._max_queued, self._queued)
+        try:
+            async with self._cond:
+                await asyncio.wait_for(
+                    self._cond.wait_for(lambda: self._active < self.max_concurrent),
+                    self.max_wait
+                )
+                self._active += 1
+                self._admitted += 1
+                self._wait_times.append(time.monotonic() - start)
+        except asyncio.TimeoutError:
+            self._rejected_timeout += 1
+            raise AdmissionRejected(self.name, 503, f'{self.name} capacity exhausted',
+                                    retry_after=max(1, math.ceil(self.max_wait)))
+        finally:
+            self._queued -= 1
+
+    async def release(self):
+        async with self._cond:
+            self._active -= 1
+            self._cond.notify()
+
+    def stats(self) -> Dict:
+        # Counters are only touched from the event loop, so no lock is needed
+        return self._snapshot()
+
+
+# Default limits per endpoint class: (max_concurrent, max_queue, max_wait_seconds).
+# The light lane is reserved for cheap endpoints so expensive work can never
+# take its capacity.
+DEFAULT_LANES = {
+    'forecast': (4, 16, 10.0),
+    'export': (4, 8, 5.0),
+    'upload': (2, 4, 10.0),
+    'light': (32, 64, 2.0)
+}
+
+# Lane that must stay reachable when the expensive lanes are full
+LIGHT_LANE = 'light'
+
+# Server threads kept out of the expensive lanes on a fixed-size thread pool
+LIGHT_RESERVED_THREADS = int(os.getenv('ADMISSION_LIGHT_RESERVED_THREADS', 2))
+
+
+def _apportion(weights: Dict[str, int], budget: int) -> Dict[str, int]:
+    """Split ``budget`` in proportion to ``weights`` so the shares sum to it exactly
+
+    Largest-remainder rounding: each name gets the floor of its share and
+    the leftover units go to the largest fractional parts (ties in order).
+    """
+    total = sum(weights.values())
+    if total <= 0:
+        return {name: 0 for name in weights}
+    shares = {name: budget * w // total for name, w in weights.items()}
+    leftover = budget - sum(shares.values())
+    by_remainder = sorted(weights, key=lambda name: -(budget * weights[name] % total))
+    for name in by_remainder[:leftover]:
+        shares[name] += 1
+    return shares
+
+
+def fit_to_threads(lanes: Dict[str, tuple], threads: int,
+                   reserved: int = LIGHT_RESERVED_THREADS) -> Dict[str, tuple]:
+    """
+    Shrink the expensive lanes to a fixed pool of server threads
+
+    On a threaded server a queued request holds a server thread while it
+    waits, just like a running one. The running plus queued slots of all
+    lanes but the light one are therefore kept within ``threads - reserved``,
+    so ``reserved`` threads are always left for health checks and other
+    light requests. Concurrency is kept first and split in proportion to
+    the configured limits so the lanes sum to exactly the budget; queues
+    share what is left the same way. With fewer budget threads than lanes a
+    lane can get no slot at all and rejects every request with 429.
+
+    Args:
+        lanes: Mapping of lane name to (max_concurrent, max_queue, max_wait_seconds)
+        threads: Server threads per process (e.g. gunicorn ``threads``)
+        reserved: Threads left for the light lane
+
+    Returns:
+        Lane limits with the same keys
+    """
+    budget = max(threads - reserved, 0)
+    heavy = [name for name in lanes if name != LIGHT_LANE]
+    concurrency = {name: lanes[name][0] for name in heavy}
+    queues = {name: lanes[name][1] for name in heavy}
+
+    total = sum(concurrency.values())
+    if total > budget:
+        concurrency = _apportion(concurrency, budget)
+    left = budget - sum(concurrency.values())
+    if sum(queues.values()) > left:
+        queues = _apportion(queues, left)
+
+    fitted = dict(lanes)
+    for name in heavy:
+        fitted[name] = (concurrency[name], queues[name], lanes[name][2])
+    return fitted
+
+
+class AdmissionController:
+    """Per-endpoint-class admission control for the Flask and ASGI apps
+
+    Each endpoint class gets its own lane, so a burst of expensive forecasts
+    queues (or is rejected) in its lane while health checks and metrics keep
+    their reserved capacity. Limits can be overridden with
+    ``ADMISSION_<LANE>_CONCURRENCY``, ``ADMISSION_<LANE>_QUEUE`` and
+    ``ADMISSION_<LANE>_WAIT_MS``. On a fixed-size thread pool the expensive
+    lanes are then shrunk to fit it (see :func:`fit_to_threads`).
+    """
+
+    def __init__(self, lanes: Optional[Dict[str, tuple]] = None, lane_class=AdmissionLane,
+                 server_threads: Optional[int] = None):
+        """
+        Args:
+            lanes: Mapping of lane name to (max_concurrent, max_queue, max_wait_seconds)
+            lane_class: AdmissionLane for threaded servers, AsyncAdmissionLane for ASGI
+            server_threads: Threads serving requests in this process; defaults to
+                ``GROWTHIQ_THREADS`` (set by gunicorn.conf.py). None means a
+                thread per request (Flask dev server) and no fitting; async
+                lanes wait without a thread and are never fitted.
+        """
+        if server_threads is None and os.environ.get('GROWTHIQ_THREADS'):
+            server_threads = int(os.environ['GROWTHIQ_THREADS'])
+
+        limits = {}
+        for name, (concurrency, queue, wait) in (lanes or DEFAULT_LANES).items():
+            prefix = f'ADMISSION_{name.upper()}'
+            limits[name] = (
+                int(os.environ.get(f'{prefix}_CONCURRENCY', concurrency)),
+                int(os.environ.get(f'{prefix}_QUEUE', queue)),
+                float(os.environ.get(f'{prefix}_WAIT_MS', wait * 1000)) / 1000
+            )
+
+        self.server_threads = None
+        if server_threads and not issubclass(lane_class, AsyncAdmissionLane):
+            self.server_threads = server_threads
+            fitted = fit_to_threads(limits, server_threads)
+            if fitted != limits:
+                print(f"⚠️ Admission lanes shrunk to {server_threads} server threads: " + ', '.join(
+                    f'{name} {c}+{q}' for name, (c, q, _) in fitted.items() if name != LIGHT_LANE
+                ))
+            limits = fitted
+
+        self.lanes = {
+            name: lane_class(name, max_concurrent=concurrency, max_queue=queue, max_wait=wait)
+            for name, (concurrency, queue, wait) in limits.items()
+        }
+
+    def limit(self, lane_name: str):
+        """Decorator admitting a Flask view (or async Quart view) through the named lane"""
+        lane = self.lanes[lane_name]
+
+        def decorator(view):
+            if inspect.iscoroutinefunction(view):
+                @functools.wraps(view)
+                async def wrapped_async(*args, **kwargs):
+                    try:
+                        await lane.acquire()
+                    except AdmissionRejected as e:
+                        return _rejection(e)
+                    try:
+                        return await view(*args, **kwargs)
+                    finally:
+                        await lane.release()
+                return wrapped_async
+
+            @functools.wraps(view)
+            def wrapped(*args, **kwargs):
+                try:
+                    lane.acquire()
+                except AdmissionRejected as e:
+                    return _rejection(e)
+                try:
+                    return view(*args, **kwargs)
+                finally:
+                    lane.release()
+            return wrapped
+
+        return decorator
+
+    def admit_stream(self, lane_name: str, chunks: Iterable):
+        """
+        Admit a streaming response through the named lane
+
+        Unlike :meth:`limit`, the slot is held until the stream is exhausted
+        or closed by the server (e.g. on client disconnect), not just until
+        the view returns.
+
+        Returns:
+            Iterable to use as the response body, or an error response tuple
+            if the request was rejected
+        """
+        lane = self.lanes[lane_name]
+        try:
+            lane.acquire()
+        except AdmissionRejected as e:
+            return _rejection(e)
+        return _LaneStream(lane, chunks)
+
+    async def admit_stream_async(self, lane_name: str, chunks: AsyncIterable):
+        """:meth:`admit_stream` for async lanes and async iterables"""
+        lane = self.lanes[lane_name]
+        try:
+            await lane.acquire()
+        except AdmissionRejected as e:
+            return _rejection(e)
+        return _release_after(lane, chunks)
+
+    def stats(self) -> Dict:
+        return {name: lane.stats() for name, lane in self.lanes.items()}
+
+
+class _LaneStream:
+    """Response iterable that releases its lane slot once, when exhausted or closed"""
+
+    def __init__(self, lane: AdmissionLane, chunks: Iterable):
+        self._lane = lane
+        self._chunks = iter(chunks)
+        self._released = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._chunks)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+        try:
+            if hasattr(self._chunks, 'close'):
+                self._chunks.close()
+        finally:
+            self._lane.release()
+
+
+async def _release_after(lane: AsyncAdmissionLane, chunks: AsyncIterable):
+    try:
+        async for chunk in chunks:
+            yield chunk
+    finally:
+        await lane.release()
+
+
+def _rejection(e: AdmissionRejected):
+    """Error response tuple; both Flask and Quart serialize the dict as JSON"""
+    return {'error': e.reason, 'lane': e.lane}, e.status_code, {'Retry-After': str(e.retry_after)}
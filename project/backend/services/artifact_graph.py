@@ -0,0 +1,493 @@
+"""Dependency-tracked incremental rebuild of derived artifacts
+
+Derived files (revenue statistics, model metrics, materialized forecasts,
+scenario projections, CSV exports and plots) form a graph over a few
+sources: the revenue data and the loaded model versions. Every artifact
+records in a JSON manifest the content hashes of its inputs and of its own
+output. A run hashes the sources, walks the graph in topological order and
+rebuilds only artifacts whose input hashes differ from the manifest (or
+whose output was changed or removed on disk); independent artifacts are
+built in parallel. An artifact rebuilt to identical output does not
+invalidate its dependents.
+
+Processes sharing a manifest (gunicorn workers) run one at a time under a
+file lock and re-read the manifest and each artifact's output first, so
+what one worker built is picked up, not rebuilt, by the others.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from datetime import datetime
+from graphlib import TopologicalSorter
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from services.fingerprint import file_digest
+from services.forecast_store import FORECAST_COLUMNS, export_frame
+
+try:
+    from matplotlib.figure import Figure
+except ImportError:
+    Figure = None
+
+try:
+    import fcntl
+except ImportError:
+    # Not on Windows: runs are then only serialized within a process
+    fcntl = None
+
+# Scenario columns of scenario_inputs.csv and their multiplier on the base forecast
+SCENARIO_MULTIPLIERS = {
+    'Growth_5%': 1.05,
+    'Growth_10%': 1.10,
+    'Decline_5%': 0.95,
+    'Decline_10%': 0.90
+}
+
+# Months of history drawn before the forecast in forecast plots
+PLOT_HISTORY_MONTHS = 36
+
+# Column added to model_metrics.csv: one-step RMSE of each loaded model over
+# the last 12 months. The training-time (held-out) RMSE of data/model_metrics.csv
+# is kept as it is; the backtest months are in SARIMA's training sample.
+BACKTEST_COLUMN = 'Backtest_RMSE_12m'
+
+
+class Artifact:
+    """A derived artifact: its inputs, how to build it and what it produces"""
+
+    def __init__(self, name: str, inputs: Iterable[str], build: Callable[[], Optional[bool]],
+                 outputs: Optional[Callable[[], List[Path]]] = None,
+                 fingerprint: Optional[Callable[[], Optional[str]]] = None,
+                 reload: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            name: Artifact name (unique across artifacts and sources)
+            inputs: Names of the sources and artifacts it is built from
+            build: Builds the artifact; returning False means it was skipped
+                (e.g. an optional dependency is missing) and nothing was recorded
+            outputs: Files it writes (resolved at each run); their digests are its output hash
+            fingerprint: Output hash for artifacts that are not files
+            reload: Reads the current output into memory before it is checked
+                (it may have been built by another process)
+        """
+        self.name = name
+        self.inputs = list(inputs)
+        self.build = build
+        self.outputs = outputs
+        self.fingerprint = fingerprint
+        self.reload = reload
+
+    def output_hash(self) -> Optional[str]:
+        """Content hash of the current output (None if any output file is missing)"""
+        if self.fingerprint is not None:
+            return self.fingerprint()
+        if self.outputs is None:
+            return None
+
+        digest = hashlib.sha256()
+        for path in self.outputs():
+            file_hash = file_digest(path)
+            if file_hash is None:
+                return None
+            digest.update(f'{Path(path).name}:{file_hash}'.encode())
+        return digest.hexdigest()
+
+
+class ArtifactGraph:
+    """Incremental, parallel rebuild of artifacts whose inputs changed"""
+
+    def __init__(self, manifest_path=None, max_workers: int = 2):
+        """
+        Args:
+            manifest_path: JSON manifest of built artifacts; memory-only if None
+            max_workers: Artifacts built concurrently
+        """
+        self.manifest_path = Path(manifest_path) if manifest_path else None
+        self.max_workers = max_workers
+        self.sources: Dict[str, Callable[[], Optional[str]]] = {}
+        self.artifacts: Dict[str, Artifact] = {}
+        self.manifest: Dict[str, Dict] = {}
+        self.last_results: Dict[str, str] = {}
+        self.last_errors: Dict[str, str] = {}
+        self.last_run_seconds = None
+        self._lock = threading.Lock()
+        self._load_manifest()
+
+    def _load_manifest(self):
+        if self.manifest_path is not None and self.manifest_path.exists():
+            try:
+                with open(self.manifest_path) as f:
+                    self.manifest = json.load(f)
+            except Exception as e:
+                print(f"⚠️ Could not read artifact manifest: {e}")
+
+    @contextmanager
+    def _process_lock(self):
+        """Exclusive lock on ``<manifest>.lock``, held by one process's run at a time"""
+        if self.manifest_path is None or fcntl is None:
+            yield
+            return
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.manifest_path.with_suffix('.lock'), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def add_source(self, name: str, digest: Callable[[], Optional[str]]):
+        """Register a source input, identified by the content hash ``digest()`` returns"""
+        self.sources[name] = digest
+
+    def add(self, artifact: Artifact):
+        unknown = [name for name in artifact.inputs if name not in self.sources and name not in self.artifacts]
+        if unknown:
+            raise ValueError(f"Unknown inputs of {artifact.name}: {', '.join(unknown)}")
+        self.artifacts[artifact.name] = artifact
+
+    def _is_fresh(self, artifact: Artifact, inputs: Dict[str, Optional[str]], output: Optional[str]) -> bool:
+        recorded = self.manifest.get(artifact.name)
+        return (recorded is not None and output is not None
+                and recorded['inputs'] == inputs and recorded['output'] == output)
+
+    def run(self, reason: str = 'manual') -> List[str]:
+        """
+        Rebuild every artifact whose inputs or output changed
+
+        An artifact whose build fails is left as it was, and its dependents
+        are not built in this run. Runs of processes sharing the manifest
+        are serialized, and each starts from the manifest on disk.
+
+        Returns:
+            Names of the artifacts rebuilt, in completion order
+        """
+        with self._lock, self._process_lock():
+            self._load_manifest()
+            started = time.perf_counter()
+            sorter = TopologicalSorter({
+                name: [i for i in artifact.inputs if i in self.artifacts]
+                for name, artifact in self.artifacts.items()
+            })
+            sorter.prepare()
+
+            hashes = {name: digest() for name, digest in self.sources.items()}
+            results, errors, rebuilt = {}, {}, []
+            manifest = dict(self.manifest)
+            now = datetime.utcnow().isoformat()
+
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='artifact') as pool:
+                running = {}
+                while sorter.is_active():
+                    for name in sorter.get_ready():
+                        artifact = self.artifacts[name]
+                        if any(results.get(i) in ('failed', 'blocked') for i in artifact.inputs):
+                            results[name] = 'blocked'
+                            sorter.done(name)
+                            continue
+
+                        inputs = {i: hashes.get(i) for i in artifact.inputs}
+                        if artifact.reload is not None:
+                            artifact.reload()
+                        output = artifact.output_hash()
+                        if self._is_fresh(artifact, inputs, output):
+                            hashes[name] = output
+                            results[name] = 'fresh'
+                            sorter.done(name)
+                            continue
+
+                        running[pool.submit(self._timed_build, artifact)] = (name, inputs)
+
+                    if not running:
+                        continue
+
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        name, inputs = running.pop(future)
+                        artifact = self.artifacts[name]
+                        try:
+                            built, seconds = future.result()
+                        except Exception as e:
+                            results[name] = 'failed'
+                            errors[name] = str(e)
+                            print(f"⚠️ Artifact {name} failed: {e}")
+                        else:
+                            hashes[name] = artifact.output_hash()
+                            if built is False:
+                                results[name] = 'skipped'
+                            else:
+                                results[name] = 'rebuilt'
+                                rebuilt.append(name)
+                                manifest[name] = {
+                                    'inputs': inputs,
+                                    'output': hashes[name],
+                                    'built_at': now,
+                                    'seconds': round(seconds, 3),
+                                    'reason': reason
+                                }
+                        sorter.done(name)
+
+            self.manifest = manifest
+            self.last_results = results
+            self.last_errors = errors
+            self.last_run_seconds = time.perf_counter() - started
+            if rebuilt:
+                self._save()
+            return rebuilt
+
+    @staticmethod
+    def _timed_build(artifact: Artifact):
+        started = time.perf_counter()
+        built = artifact.build()
+        return built, time.perf_counter() - started
+
+    def _save(self):
+        if self.manifest_path is None:
+            return
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def status(self) -> Dict:
+        return {
+            'artifacts': {
+                name: {
+                    'inputs': artifact.inputs,
+                    'last_result': self.last_results.get(name),
+                    'built_at': self.manifest.get(name, {}).get('built_at'),
+                    'error': self.last_errors.get(name)
+                }
+                for name, artifact in self.artifacts.items()
+            },
+            'last_run_seconds': round(self.last_run_seconds, 3) if self.last_run_seconds is not None else None
+        }
+
+
+def _write_csv(df: pd.DataFrame, path: Path, **kwargs):
+    """Write a CSV atomically, so readers never see a partial file"""
+    tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+    df.to_csv(tmp_path, **kwargs)
+    os.replace(tmp_path, path)
+
+
+def _model_column(metrics: pd.DataFrame) -> Optional[str]:
+    return next((c for c in ('Model', 'model_type') if c in metrics.columns), None)
+
+
+def with_backtest_metrics(metrics: Optional[pd.DataFrame], errors: Dict[str, float]) -> pd.DataFrame:
+    """
+    Model metrics with a BACKTEST_COLUMN value per model
+
+    Args:
+        metrics: Metrics from data/model_metrics.csv (``Model`` or ``model_type``
+            column), or None
+        errors: Backtest RMSE by model type
+
+    Returns:
+        The metrics with their columns unchanged plus BACKTEST_COLUMN; models
+        missing from them get a row of their own
+    """
+    if metrics is None or _model_column(metrics) is None:
+        metrics = pd.DataFrame({'Model': pd.Series(dtype=object)})
+    name_column = _model_column(metrics)
+    metrics = metrics.copy()
+    for model_type, error in errors.items():
+        rows = metrics[name_column].astype(str).str.lower() == model_type
+        if not rows.any():
+            name = model_type.upper() if name_column == 'Model' else model_type
+            metrics = pd.concat([metrics, pd.DataFrame({name_column: [name]})], ignore_index=True)
+            rows = metrics[name_column].astype(str).str.lower() == model_type
+        metrics.loc[rows, BACKTEST_COLUMN] = error
+    return metrics
+
+
+def held_out_rmse(metrics: Optional[pd.DataFrame], model_type: str) -> Optional[float]:
+    """Training-time RMSE of a model from model_metrics.csv (``RMSE`` or ``rmse`` column)"""
+    if metrics is None or _model_column(metrics) is None:
+        return None
+    column = next((c for c in ('RMSE', 'rmse') if c in metrics.columns), None)
+    if column is None:
+        return None
+    rows = metrics[metrics[_model_column(metrics)].astype(str).str.lower() == model_type]
+    values = pd.to_numeric(rows[column], errors='coerce').dropna()
+    return float(values.iloc[0]) if len(values) else None
+
+
+def dashboard_artifacts(loader, precomputer, manifest_path=None, max_workers: int = 2) -> ArtifactGraph:
+    """
+    Artifact graph of the dashboard's derived files
+
+    Sources are the loaded revenue data, model versions and the shipped
+    data/model_metrics.csv (so artifacts always match what the API serves).
+    Files are only read from the loader's ``data_path``; everything is
+    written under its ``output_path``, resolved at each run, so the
+    checkout's data files are never rewritten.
+
+    Args:
+        loader: ModelDataLoader
+        precomputer: ForecastPrecomputer filling the materialized store
+        manifest_path: Manifest file (defaults to output/artifact_manifest.json)
+        max_workers: Artifacts built concurrently
+    """
+    graph = ArtifactGraph(manifest_path or loader.output_path / 'artifact_manifest.json', max_workers)
+    store = precomputer.store
+    scenario_horizon = precomputer.horizons[0]
+
+    def loaded_models() -> List[str]:
+        return [m for m in precomputer.models if loader.model_versions.get(m) not in (None, 'mock')]
+
+    def forecasts(model_type: str) -> Optional[List[Dict]]:
+        entry = store.get(model_type, scenario_horizon, loader.forecast_hash(model_type, scenario_horizon),
+                          count=False)
+        return entry['forecasts'] if entry else None
+
+    graph.add_source('revenue_data', lambda: loader.data_fingerprint)
+    graph.add_source('metrics_data', lambda: file_digest(loader.data_path / 'model_metrics.csv'))
+    for model_type in precomputer.models:
+        graph.add_source(f'{model_type}_model', lambda m=model_type: loader.model_versions.get(m))
+    graph.add_source('sarima_exog', lambda: loader.exog_features.fingerprint
+                     if loader.sarima_exog_names() and loader.exog_features is not None else None)
+
+    # Summary statistics of the revenue history
+    def build_revenue_stats():
+        if loader.fred_data is None:
+            return False
+        data = loader.fred_data.assign(Date=pd.to_datetime(loader.fred_data['Date']))
+        _write_csv(data.describe(), loader.output_path / 'revenue_stats.csv')
+
+    graph.add(Artifact('revenue_stats', ['revenue_data'], build_revenue_stats,
+                       outputs=lambda: [loader.output_path / 'revenue_stats.csv']))
+
+    # Materialized standard-horizon forecasts (the precompute store)
+    def forecasts_fingerprint():
+        digest = hashlib.sha256()
+        for model_type in precomputer.models:
+            for periods in precomputer.horizons:
+                digest.update(f'{model_type}:{periods}:{store.content_hash(model_type, periods)}'.encode())
+        return digest.hexdigest()
+
+    graph.add(Artifact('materialized_forecasts',
+                       ['revenue_data', 'sarima_exog'] + [f'{m}_model' for m in precomputer.models],
+                       precomputer.materialize, fingerprint=forecasts_fingerprint, reload=store.reload))
+
+    def shipped_metrics() -> Optional[pd.DataFrame]:
+        path = loader.data_path / 'model_metrics.csv'
+        return pd.read_csv(path) if path.exists() else None
+
+    def reload_into(attribute: str, name: str):
+        def reload():
+            path = loader.output_path / name
+            if path.exists():
+                setattr(loader, attribute, pd.read_csv(path))
+        return reload
+
+    # Shipped model metrics plus the backtest RMSE of each loaded model
+    def build_model_metrics():
+        errors = loader.backtest_errors()
+        errors = {m: errors[m] for m in loaded_models() if errors.get(m) is not None}
+        if not errors:
+            return False
+        metrics = with_backtest_metrics(shipped_metrics(), errors)
+        _write_csv(metrics, loader.output_path / 'model_metrics.csv', index=False)
+        loader.model_metrics = metrics
+
+    graph.add(Artifact('model_metrics',
+                       ['revenue_data', 'metrics_data'] + [f'{m}_model' for m in precomputer.models],
+                       build_model_metrics, outputs=lambda: [loader.output_path / 'model_metrics.csv'],
+                       reload=reload_into('model_metrics', 'model_metrics.csv')))
+
+    # Growth/decline projections of the most accurate model's forecast: by
+    # held-out RMSE where the shipped metrics have one, else by backtest RMSE
+    def build_scenario_inputs():
+        errors, metrics = loader.backtest_errors(), shipped_metrics()
+
+        def rank(model_type):
+            held_out = held_out_rmse(metrics, model_type)
+            if held_out is not None:
+                return 0, held_out
+            return 1, errors.get(model_type) if errors.get(model_type) is not None else float('inf')
+
+        ranked = sorted(loaded_models(), key=rank)
+        base = forecasts(ranked[0]) if ranked else None
+        if not base:
+            return False
+        scenarios = pd.DataFrame({
+            'Date': [f['date'] for f in base],
+            'Forecasted_Revenue': [f['forecasted_revenue'] for f in base]
+        })
+        for column, multiplier in SCENARIO_MULTIPLIERS.items():
+            scenarios[column] = (scenarios['Forecasted_Revenue'] * multiplier).round(2)
+        _write_csv(scenarios, loader.output_path / 'scenario_inputs.csv', index=False)
+        loader.scenario_inputs = scenarios
+
+    graph.add(Artifact('scenario_inputs', ['materialized_forecasts', 'model_metrics'], build_scenario_inputs,
+                       outputs=lambda: [loader.output_path / 'scenario_inputs.csv'],
+                       reload=reload_into('scenario_inputs', 'scenario_inputs.csv')))
+
+    # Forecast CSV exports (same layout as /api/export/forecast)
+    def export_paths():
+        return [loader.output_path / f'forecast_{m}.csv' for m in loaded_models()]
+
+    def build_forecast_exports():
+        written = 0
+        for model_type in loaded_models():
+            records = forecasts(model_type)
+            if records:
+                frame = export_frame([f['date'] for f in records],
+                                     {column: [f[column] for f in records] for column in FORECAST_COLUMNS})
+                _write_csv(frame, loader.output_path / f'forecast_{model_type}.csv', index=False)
+                written += 1
+        if not written:
+            return False
+
+    graph.add(Artifact('forecast_exports', ['materialized_forecasts'], build_forecast_exports,
+                       outputs=export_paths))
+
+    # Plots (optional: needs matplotlib)
+    def build_revenue_trend_plot():
+        if Figure is None or loader.fred_data is None:
+            return False
+        fig = Figure(figsize=(10, 4))
+        ax = fig.subplots()
+        ax.plot(pd.to_datetime(loader.fred_data['Date']), loader.fred_data['Revenue'])
+        ax.set_title('Monthly Revenue')
+        ax.set_ylabel('Revenue')
+        fig.savefig(loader.output_path / 'revenue_trend.png', dpi=100, bbox_inches='tight')
+
+    graph.add(Artifact('revenue_trend_plot', ['revenue_data'], build_revenue_trend_plot,
+                       outputs=lambda: [loader.output_path / 'revenue_trend.png']))
+
+    def build_forecast_plots():
+        if Figure is None or loader.fred_data is None:
+            return False
+        history = loader.fred_data.tail(PLOT_HISTORY_MONTHS)
+        written = 0
+        for model_type in loaded_models():
+            records = forecasts(model_type)
+            if not records:
+                continue
+            fig = Figure(figsize=(10, 4))
+            ax = fig.subplots()
+            ax.plot(pd.to_datetime(history['Date']), history['Revenue'], label='Actual')
+            ax.plot(pd.to_datetime([f['date'] for f in records]), [f['forecasted_revenue'] for f in records],
+                    label=f'{model_type.upper()} forecast')
+            ax.set_title(f'{model_type.upper()} Forecast')
+            ax.set_ylabel('Revenue')
+            ax.legend()
+            fig.savefig(loader.output_path / f'{model_type}_forecast.png', dpi=100, bbox_inches='tight')
+            written += 1
+        if not written:
+            return False
+
+    graph.add(Artifact('forecast_plots', ['revenue_data', 'materialized_forecasts'], build_forecast_plots,
+                       outputs=lambda: [loader.output_path / f'{m}_forecast.png' for m in loaded_models()]))
+
+    return graph
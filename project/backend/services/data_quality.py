@@ -0,0 +1,366 @@
+"""Ingest-time data-quality screening of monthly revenue series
+
+Every upload (and ``fred_series.csv`` at startup) is checked in one
+vectorized pass over all rows and series:
+
+- unparseable dates and missing or non-positive values
+- duplicate months within a series
+- dates off the month-start (MS) frequency, and gaps of missing months
+- outliers: robust z-score of each value against a centered rolling median
+  (log scale, scaled by the series' median absolute deviation)
+- level shifts: the mean of the following 12 months against the mean of the
+  preceding 12 months, so a full seasonal cycle is on either side
+
+Rows are never dropped or changed; each gets a bitmask of quality flags,
+stored alongside the upload so training can exclude or review them.
+
+Example:
+    python -m services.data_quality data/fred_series.csv --out output/quality/fred_series_flags.csv
+"""
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Rolling median window (months, centered) and robust z above which a value is an outlier
+QUALITY_WINDOW = int(os.getenv('QUALITY_WINDOW', 13))
+QUALITY_Z_THRESHOLD = float(os.getenv('QUALITY_Z_THRESHOLD', 5.0))
+# Smallest relative deviation (outlier) or level change (shift) ever flagged,
+# so very smooth series are not flagged for immaterial wiggles
+QUALITY_MIN_DEVIATION = float(os.getenv('QUALITY_MIN_DEVIATION', 0.05))
+# Change of the 12-month level beyond the series' trend, in standard errors, flagged as a shift
+QUALITY_SHIFT_THRESHOLD = float(os.getenv('QUALITY_SHIFT_THRESHOLD', 6.0))
+
+# Months compared before and after each candidate level shift
+SHIFT_WINDOW = 12
+
+# Flag bits, in report order
+FLAGS = {
+    'invalid_date': 1,
+    'missing_value': 2,
+    'non_positive': 4,
+    'duplicate': 8,
+    'off_frequency': 16,
+    'gap': 32,
+    'outlier': 64,
+    'level_shift': 128
+}
+
+# Column names accepted for each role, in order of preference
+DATE_COLUMNS = ('Date', 'date', 'DATE', 'ds')
+VALUE_COLUMNS = ('Revenue', 'revenue', 'value', 'Value', 'y')
+SERIES_COLUMNS = ('series_id', 'series', 'unique_id')
+
+# Rows per block of the rolling median network (keeps its lanes in cache)
+_BLOCK_ROWS = 1 << 15
+
+# Consistency constant turning a median absolute deviation into a standard deviation
+_MAD_SCALE = 1.4826
+
+
+def detect_columns(columns) -> Dict[str, Optional[str]]:
+    """Date, value and (optional) series ID columns of an uploaded frame"""
+    def first(candidates):
+        return next((c for c in candidates if c in columns), None)
+
+    return {'date': first(DATE_COLUMNS), 'value': first(VALUE_COLUMNS), 'series': first(SERIES_COLUMNS)}
+
+
+def _rolling_median(values: np.ndarray, starts: np.ndarray, ends: np.ndarray, half: int) -> np.ndarray:
+    """
+    Centered rolling median of ``2 * half + 1`` rows, windows clamped to each row's series
+
+    Interior rows run through an odd-even transposition sorting network over
+    shifted slices (elementwise min/max, no per-row selection); the few rows
+    within ``half`` of a series boundary are recomputed on clamped windows.
+
+    Args:
+        values: Flat float32 values sorted by series and date
+        starts, ends: Row range [start, end) of each row's series
+        half: Rows on either side of the center
+    """
+    width = 2 * half + 1
+    n = len(values)
+    if not n:
+        return values.copy()
+    padded = np.pad(values, half, mode='edge')
+    medians = np.empty(n, dtype=values.dtype)
+
+    for lo in range(0, n, _BLOCK_ROWS):
+        hi = min(lo + _BLOCK_ROWS, n)
+        lanes = [padded[lo + k:hi + k].copy() for k in range(width)]
+        spare = np.empty(hi - lo, dtype=values.dtype)
+        for round_ in range(width):
+            for k in range(round_ % 2, width - 1, 2):
+                low, high = lanes[k], lanes[k + 1]
+                np.minimum(low, high, out=spare)
+                np.maximum(low, high, out=high)
+                lanes[k], spare = spare, low
+        medians[lo:hi] = lanes[half]
+
+    position = np.arange(n)
+    edge = np.flatnonzero((position - starts < half) | (ends - 1 - position < half))
+    if len(edge):
+        window = edge[:, None] + np.arange(-half, half + 1)
+        np.clip(window, starts[edge, None], ends[edge, None] - 1, out=window)
+        medians[edge] = np.median(values[window], axis=1)
+    return medians
+
+
+def _group_medians(values: np.ndarray, groups: np.ndarray, n_groups: int) -> np.ndarray:
+    """Median of ``values`` per group code (NaN for empty groups)"""
+    medians = pd.Series(values).groupby(groups).median()
+    out = np.full(n_groups, np.nan)
+    out[medians.index.to_numpy()] = medians.to_numpy()
+    return out
+
+
+class QualityReport:
+    """Per-row quality flags of one screened frame, aligned with its rows"""
+
+    def __init__(self, frame: pd.DataFrame, flags: np.ndarray, zscores: np.ndarray,
+                 missing_before: np.ndarray, columns: Dict[str, Optional[str]],
+                 date_range: Tuple[Optional[str], Optional[str]], elapsed: float):
+        self.frame = frame
+        self.flags = flags
+        self.zscores = zscores
+        self.missing_before = missing_before
+        self.columns = columns
+        self.date_range = date_range
+        self.elapsed = elapsed
+
+    @property
+    def flagged(self) -> np.ndarray:
+        return self.flags != 0
+
+    def summary(self) -> Dict:
+        """Counts per flag and overall, for API responses and the uploads collection"""
+        series_column = self.columns['series']
+        flagged = self.flagged
+        return {
+            'rows': len(self.flags),
+            'series': int(self.frame[series_column].nunique()) if series_column else 1,
+            'flagged_rows': int(np.count_nonzero(flagged)),
+            'flagged_series': int(self.frame.loc[flagged, series_column].nunique()) if series_column
+            else int(flagged.any()),
+            'counts': {name: int(np.count_nonzero(self.flags & bit)) for name, bit in FLAGS.items()},
+            'missing_months': int(self.missing_before.sum()),
+            'first_date': self.date_range[0],
+            'last_date': self.date_range[1],
+            'columns': self.columns,
+            'elapsed_ms': round(self.elapsed * 1000, 1)
+        }
+
+    def flagged_frame(self) -> pd.DataFrame:
+        """Flagged rows with their source row number, flag names and robust z-score"""
+        rows = np.flatnonzero(self.flagged)
+        bits = self.flags[rows]
+        names = np.full(len(rows), '', dtype=object)
+        for name, bit in FLAGS.items():
+            hit = (bits & bit) != 0
+            names[hit] = names[hit] + np.where(names[hit] == '', name, '|' + name).astype(object)
+
+        out = {'row': rows}
+        for role in ('series', 'date', 'value'):
+            if self.columns[role]:
+                out[self.columns[role]] = self.frame[self.columns[role]].to_numpy()[rows]
+        out.update({
+            'flags': names,
+            'flag_bits': bits,
+            'robust_z': np.round(self.zscores[rows], 2),
+            'missing_months_before': self.missing_before[rows]
+        })
+        return pd.DataFrame(out)
+
+    def save(self, filepath):
+        """Write the flagged rows as CSV"""
+        filepath = Path(filepath)
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        self.flagged_frame().to_csv(filepath, index=False)
+
+
+def screen(df: pd.DataFrame, date_column: Optional[str] = None, value_column: Optional[str] = None,
+           series_column: Optional[str] = None, window: int = QUALITY_WINDOW,
+           z_threshold: float = QUALITY_Z_THRESHOLD,
+           shift_threshold: float = QUALITY_SHIFT_THRESHOLD,
+           min_deviation: float = QUALITY_MIN_DEVIATION) -> QualityReport:
+    """
+    Screen a frame of monthly series for data-quality issues
+
+    Args:
+        df: Single series (date, value) or long layout (series ID, date, value)
+        date_column, value_column, series_column: Column names; detected when None
+        window: Centered rolling median window for outliers (months)
+        z_threshold: Robust z-score above which a value is an outlier
+        shift_threshold: Change of the 12-month level beyond trend, in standard errors, flagged as a shift
+        min_deviation: Smallest relative deviation or level change flagged (0.05 = 5%)
+
+    Returns:
+        QualityReport aligned with the rows of ``df``
+
+    Raises:
+        ValueError: If no date or value column can be found
+    """
+    started = time.perf_counter()
+    detected = detect_columns(df.columns)
+    columns = {
+        'date': date_column or detected['date'],
+        'value': value_column or detected['value'],
+        'series': series_column or detected['series']
+    }
+    if columns['date'] is None or columns['value'] is None:
+        raise ValueError(f"Expected a date column ({', '.join(DATE_COLUMNS)}) "
+                         f"and a value column ({', '.join(VALUE_COLUMNS)})")
+
+    n = len(df)
+    flags = np.zeros(n, dtype=np.uint8)
+    zscores = np.full(n, np.nan)
+    missing_before = np.zeros(n, dtype=np.int64)
+
+    dates = pd.to_datetime(df[columns['date']], errors='coerce').to_numpy(dtype='datetime64[ns]')
+    values = pd.to_numeric(df[columns['value']], errors='coerce').to_numpy(dtype=np.float64)
+    if columns['series']:
+        codes, ids = pd.factorize(df[columns['series']], use_na_sentinel=False)
+    else:
+        codes, ids = np.zeros(n, dtype=np.int64), [None]
+
+    valid_date = ~np.isnat(dates)
+    months = dates.astype('datetime64[M]')
+    flags[~valid_date] |= FLAGS['invalid_date']
+    flags[np.isnan(values)] |= FLAGS['missing_value']
+    flags[values <= 0] |= FLAGS['non_positive']
+    flags[valid_date & (months.astype('datetime64[ns]') != dates)] |= FLAGS['off_frequency']
+
+    # Sort usable rows by series and month (skipped if already in that order,
+    # as exported files usually are); all further checks work on this order
+    usable = np.flatnonzero(valid_date & ~np.isnan(values))
+    month_index = months[usable].astype(np.int64)
+    usable_codes = codes[usable]
+    code_step = np.diff(usable_codes)
+    if (code_step >= 0).all() and (np.diff(month_index)[code_step == 0] >= 0).all():
+        order = usable
+    else:
+        order = usable[np.lexsort((month_index, usable_codes))]
+    c = codes[order]
+    m = months[order].astype(np.int64)
+    v = values[order]
+
+    same_series = c[1:] == c[:-1]
+    step = m[1:] - m[:-1]
+
+    duplicate = np.zeros(len(order), dtype=bool)
+    repeated = same_series & (step == 0)
+    duplicate[1:] |= repeated
+    duplicate[:-1] |= repeated
+    flags[order[duplicate]] |= FLAGS['duplicate']
+
+    gap = same_series & (step > 1)
+    flags[order[1:][gap]] |= FLAGS['gap']
+    missing_before[order[1:][gap]] = step[gap] - 1
+
+    # Row range [start, end) of each row's series
+    bounds = np.concatenate([[0], np.flatnonzero(~same_series) + 1, [len(order)]])
+    length = np.repeat(np.diff(bounds), np.diff(bounds))
+    starts = np.repeat(bounds[:-1], np.diff(bounds))
+    ends = starts + length
+    position = np.arange(len(order))
+
+    # Outliers: log residual from a centered rolling median, scaled by the series' MAD
+    log_v = np.log(np.maximum(v, np.finfo(np.float32).tiny)).astype(np.float32)
+    half = window // 2
+    residual = (log_v - _rolling_median(log_v, starts, ends, half)).astype(np.float64)
+    mad = _group_medians(np.abs(residual), c, len(ids))[c] * _MAD_SCALE
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = np.where(mad > 0, residual / mad, np.where(residual == 0, 0.0, np.inf * np.sign(residual)))
+    z[length < window] = 0.0
+    zscores[order] = z
+    material = np.log1p(min_deviation)
+    flags[order[(np.abs(z) > z_threshold) & (np.abs(residual) > material)]] |= FLAGS['outlier']
+
+    # Level shifts: mean of the next 12 months against the previous 12, which
+    # is the mean year-over-year change over the next 12 months. It is
+    # compared with the series' typical year-over-year change (trend) in
+    # standard errors, so seasonality and growth cancel. Outliers are first
+    # clipped to the outlier threshold so a single bad month cannot move a
+    # mean. Only the largest change within 12 months either side is flagged.
+    clipped = log_v - residual + np.clip(residual, -z_threshold * mad, z_threshold * mad)
+    totals = np.concatenate([[0.0], np.cumsum(np.nan_to_num(clipped))])
+    yearly = np.full(len(order), np.nan)
+    has_year = position - SHIFT_WINDOW >= starts
+    yearly[has_year] = clipped[has_year] - clipped[position[has_year] - SHIFT_WINDOW]
+    trend = _group_medians(yearly, c, len(ids))
+    spread = _group_medians(np.abs(yearly - trend[c]), c, len(ids))[c] * _MAD_SCALE
+    standard_error = spread / np.sqrt(SHIFT_WINDOW)
+
+    inner = np.flatnonzero(has_year & (position + SHIFT_WINDOW <= ends))
+    change = (totals[inner + SHIFT_WINDOW] - 2 * totals[inner] + totals[inner - SHIFT_WINDOW]) / SHIFT_WINDOW
+    excess = np.abs(change - trend[c[inner]])
+    shift = np.zeros(len(order))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shift[inner] = np.where(excess > material,
+                                np.nan_to_num(excess / standard_error[inner], nan=0.0, posinf=0.0), 0.0)
+
+    # Rows within 12 of a series boundary score 0, so the window maximum
+    # never reaches into a neighbouring series
+    candidates = np.flatnonzero(shift > shift_threshold)
+    nearby = np.clip(candidates[:, None] + np.arange(-SHIFT_WINDOW, SHIFT_WINDOW + 1), 0, len(order) - 1)
+    peak = candidates[shift[candidates] == shift[nearby].max(axis=1, initial=0.0)]
+    flags[order[peak]] |= FLAGS['level_shift']
+
+    date_range = (None, None)
+    if valid_date.any():
+        first, last = dates[valid_date].min(), dates[valid_date].max()
+        date_range = (str(np.datetime_as_string(first, unit='D')), str(np.datetime_as_string(last, unit='D')))
+    return QualityReport(df, flags, zscores, missing_before, columns, date_range, time.perf_counter() - started)
+
+
+def screen_upload(df: pd.DataFrame, flags_path) -> Dict:
+    """
+    Screen an uploaded or loaded frame and store its flagged rows
+
+    Args:
+        df: Frame as read from the CSV
+        flags_path: CSV file for the flagged rows (written only if any)
+
+    Returns:
+        Summary (see :meth:`QualityReport.summary`) with ``flags_path`` when
+        rows were flagged, or ``{'skipped': reason}`` without date and value columns
+    """
+    try:
+        report = screen(df)
+    except ValueError as e:
+        return {'skipped': str(e)}
+
+    summary = report.summary()
+    if summary['flagged_rows']:
+        report.save(flags_path)
+        summary['flags_path'] = str(flags_path)
+        flagged = ', '.join(f"{count} {name}" for name, count in summary['counts'].items() if count)
+        print(f"⚠️ Data quality: {summary['flagged_rows']} of {summary['rows']} rows flagged ({flagged})")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Screen a CSV of monthly series for data-quality issues')
+    parser.add_argument('csv', help='CSV in fred_series.csv or long (series_id, Date, Revenue) layout')
+    parser.add_argument('--out', help='write the flagged rows to this CSV')
+    parser.add_argument('--window', type=int, default=QUALITY_WINDOW)
+    parser.add_argument('--z-threshold', type=float, default=QUALITY_Z_THRESHOLD)
+    parser.add_argument('--shift-threshold', type=float, default=QUALITY_SHIFT_THRESHOLD)
+    parser.add_argument('--min-deviation', type=float, default=QUALITY_MIN_DEVIATION)
+    args = parser.parse_args()
+
+    report = screen(pd.read_csv(args.csv), window=args.window, z_threshold=args.z_threshold,
+                    shift_threshold=args.shift_threshold, min_deviation=args.min_deviation)
+    if args.out:
+        report.save(args.out)
+    print(json.dumps(report.summary(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
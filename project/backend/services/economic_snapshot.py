@@ -0,0 +1,289 @@
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from services.fred_service import FREDDataService, RECESSION_INDICATORS, recession_risk_score
+
+# Background refresh interval; snapshots older than the stale threshold
+# trigger an immediate refresh (and are still served meanwhile)
+ECONOMIC_REFRESH_SECONDS = float(os.getenv('ECONOMIC_REFRESH_SECONDS', 6 * 3600))
+ECONOMIC_STALE_SECONDS = float(os.getenv('ECONOMIC_STALE_SECONDS', 2 * ECONOMIC_REFRESH_SECONDS))
+
+# Observations refetched before each series' last known date, so FRED
+# revisions of recent values are picked up
+REVISION_OVERLAP_DAYS = 120
+
+
+class EconomicSnapshotService:
+    """In-memory economic indicators and recession risk, refreshed in the background
+
+    Requests are served from memory and never wait on FRED. A daemon thread
+    refreshes on a schedule, or sooner when a request finds the snapshot
+    stale (stale-while-revalidate). Each refresh fetches only the tail of
+    every series, from its last known date minus a revision overlap; the
+    recession risk score is recomputed only from the earliest date whose
+    inputs changed.
+    """
+
+    def __init__(self, fred_service: FREDDataService, refresh_seconds: float = ECONOMIC_REFRESH_SECONDS,
+                 stale_seconds: float = ECONOMIC_STALE_SECONDS, history_years: int = 5,
+                 on_change: Optional[Callable[[Dict[str, pd.Series]], None]] = None):
+        """
+        Args:
+            fred_service: FRED client wrapper (its ``fred`` client may be a fake in tests)
+            refresh_seconds: Interval between scheduled refreshes
+            stale_seconds: Snapshot age at which a request triggers a refresh
+            history_years: History kept per series (and of recession scores)
+            on_change: Called with :meth:`observations` after a refresh that changed any series
+        """
+        self.fred_service = fred_service
+        self.on_change = on_change
+        self.refresh_seconds = refresh_seconds
+        self.stale_seconds = stale_seconds
+        self.history_years = history_years
+
+        # Dashboard indicators plus the recession score inputs, by FRED code
+        self.codes = list(dict.fromkeys(
+            list(fred_service.indicators.values()) + list(RECESSION_INDICATORS.values())
+        ))
+
+        # Replaced wholesale on refresh, so readers never see a partial update
+        self._series: Dict[str, pd.Series] = {}
+        self._indicators: Dict[str, Dict] = {}
+        self._recession = pd.DataFrame()
+
+        self.refreshed_at = None
+        self.last_reason = None
+        self.last_changed = []
+        self.last_missing = []
+        self.last_error = None
+        self._refreshing = threading.Event()
+        self._refresh_lock = threading.Lock()
+        self._pending_reason = 'startup'
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_env(cls, **kwargs) -> Optional['EconomicSnapshotService']:
+        """Service backed by the FRED API, or None if FRED_API_KEY or fredapi is missing"""
+        try:
+            return cls(FREDDataService(), **kwargs)
+        except (ValueError, ImportError) as e:
+            print(f"⚠️ Economic snapshot disabled: {e}")
+            return None
+
+    def observations(self) -> Dict[str, pd.Series]:
+        """Stored observations of the dashboard indicators, by indicator name"""
+        series = self._series
+        return {name: series[code] for name, code in self.fred_service.indicators.items() if code in series}
+
+    @property
+    def loaded(self) -> bool:
+        return self.refreshed_at is not None
+
+    def age_seconds(self) -> Optional[float]:
+        if self.refreshed_at is None:
+            return None
+        return (datetime.utcnow() - self.refreshed_at).total_seconds()
+
+    def is_stale(self) -> bool:
+        age = self.age_seconds()
+        return age is None or age >= self.stale_seconds
+
+    def _fetch_tail(self, code: str, existing: Optional[pd.Series]) -> Optional[pd.Series]:
+        """Observations from the revision overlap onwards (full history for a new series)"""
+        if existing is not None and len(existing):
+            start = existing.index[-1] - timedelta(days=REVISION_OVERLAP_DAYS)
+        else:
+            start = datetime.now() - timedelta(days=365 * self.history_years)
+
+        df = self.fred_service.fetch_indicator(code, start.strftime('%Y-%m-%d'))
+        if df.empty:
+            return None
+        return pd.Series(df['value'].to_numpy(dtype=float), index=pd.DatetimeIndex(df['date']), name=code)
+
+    @staticmethod
+    def _merge(existing: Optional[pd.Series], tail: pd.Series):
+        """
+        Splice a fetched tail onto the stored series
+
+        Returns:
+            Tuple of (merged series, earliest date whose value changed or None)
+        """
+        if existing is None or not len(existing):
+            return tail, tail.index[0]
+
+        merged = pd.concat([existing[existing.index < tail.index[0]], tail])
+        overlap = existing[existing.index >= tail.index[0]]
+        aligned = tail.reindex(overlap.index.union(tail.index))
+        previous = overlap.reindex(aligned.index)
+        changed = aligned.index[~((aligned == previous) | (aligned.isna() & previous.isna()))]
+        return merged, (changed[0] if len(changed) else None)
+
+    def _rescore(self, series: Dict[str, pd.Series], changed_from: pd.Timestamp) -> pd.DataFrame:
+        """
+        Recession scores, recomputed from ``changed_from`` onwards
+
+        Each observation date of any input is scored with the last known
+        (as-of) value of every input; earlier scores are kept as they are.
+        """
+        components = {
+            name: series[code] for name, code in RECESSION_INDICATORS.items() if code in series
+        }
+        if not components:
+            return pd.DataFrame()
+
+        dates = pd.DatetimeIndex(sorted(set().union(*(s.index for s in components.values()))))
+        dates = dates[dates >= changed_from]
+
+        # As-of lookup: index of the latest observation at or before each date
+        fresh = pd.DataFrame({
+            name: values.reindex(dates, method='ffill') for name, values in components.items()
+        }, index=dates)
+        fresh['recession_risk_score'] = recession_risk_score(fresh)
+
+        kept = self._recession[self._recession.index < changed_from] if not self._recession.empty else None
+        scores = pd.concat([kept, fresh]) if kept is not None else fresh
+
+        cutoff = pd.Timestamp(datetime.now() - timedelta(days=365 * self.history_years))
+        return scores[scores.index >= cutoff]
+
+    def refresh(self, reason: str = 'manual') -> List[str]:
+        """
+        Fetch new observations and update indicators and recession scores
+
+        A series whose fetch fails keeps its previous observations.
+
+        Returns:
+            FRED codes whose observations changed
+        """
+        with self._refresh_lock:
+            self._refreshing.set()
+            try:
+                series = dict(self._series)
+                changed = {}
+                missing = []
+
+                for code in self.codes:
+                    tail = self._fetch_tail(code, series.get(code))
+                    if tail is None:
+                        missing.append(code)
+                        continue
+                    series[code], changed_from = self._merge(series.get(code), tail)
+                    if changed_from is not None:
+                        changed[code] = changed_from
+
+                indicators = {
+                    name: self.fred_service.summarize_indicator(
+                        series[code].iloc[-2:].rename_axis('date').reset_index(name='value')
+                    )
+                    for name, code in self.fred_service.indicators.items() if code in series
+                }
+
+                recession_changes = [changed[code] for code in RECESSION_INDICATORS.values() if code in changed]
+                recession = self._rescore(series, min(recession_changes)) if recession_changes else self._recession
+
+                self._series, self._indicators, self._recession = series, indicators, recession
+                self.refreshed_at = datetime.utcnow()
+                self.last_reason = reason
+                self.last_changed = list(changed)
+                self.last_missing = missing
+                self.last_error = None
+                if changed:
+                    print(f"✅ Economic snapshot refreshed: {len(changed)} series changed ({reason})")
+                if missing:
+                    print(f"⚠️ Economic snapshot: no data for {', '.join(missing)}")
+            finally:
+                self._refreshing.clear()
+
+        if changed and self.on_change is not None:
+            self.on_change(self.observations())
+        return list(changed)
+
+    def snapshot(self) -> Dict:
+        """
+        Current indicators and recession risk, served from memory
+
+        A stale snapshot is returned as is and a background refresh is triggered.
+        """
+        stale = self.is_stale()
+        if stale and not self._refreshing.is_set():
+            self.trigger('stale')
+
+        recession = self._recession
+        latest = None
+        if not recession.empty:
+            row = recession.iloc[-1]
+            latest = {
+                'date': recession.index[-1].strftime('%Y-%m-%d'),
+                'score': float(row['recession_risk_score']),
+                'components': {name: float(row[name]) for name in RECESSION_INDICATORS if name in row}
+            }
+
+        return {
+            'indicators': self._indicators,
+            'recession': latest,
+            'refreshed_at': self.refreshed_at.isoformat() if self.refreshed_at else None,
+            'age_seconds': self.age_seconds(),
+            'stale': stale,
+            'refreshing': self._refreshing.is_set()
+        }
+
+    def recession_history(self, days: int = 365) -> List[Dict]:
+        """Recession risk scores (and their inputs) over the last ``days`` days"""
+        recession = self._recession
+        if recession.empty:
+            return []
+
+        cutoff = recession.index[-1] - timedelta(days=days)
+        window = recession[recession.index >= cutoff]
+        records = window.reset_index(names='date')
+        records['date'] = records['date'].dt.strftime('%Y-%m-%d')
+        return records.astype(object).where(records.notna(), None).to_dict('records')
+
+    def trigger(self, reason: str):
+        """Request a refresh (returns immediately)"""
+        self._pending_reason = reason
+        self._wake.set()
+
+    def _loop(self):
+        self._wake.set()
+        while not self._stop.is_set():
+            self._wake.wait(timeout=self.refresh_seconds)
+            if self._stop.is_set():
+                break
+            reason = self._pending_reason if self._wake.is_set() else 'schedule'
+            self._wake.clear()
+            try:
+                self.refresh(reason)
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"⚠️ Economic snapshot refresh failed: {e}")
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='economic-snapshot', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def status(self) -> Dict:
+        return {
+            'running': self._thread is not None and self._thread.is_alive(),
+            'series': len(self._series),
+            'refreshed_at': self.refreshed_at.isoformat() if self.refreshed_at else None,
+            'age_seconds': self.age_seconds(),
+            'stale': self.is_stale(),
+            'refreshing': self._refreshing.is_set(),
+            'last_reason': self.last_reason,
+            'last_changed': self.last_changed,
+            'last_missing': self.last_missing,
+            'last_error': self.last_error
+        }
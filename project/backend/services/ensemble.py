@@ -0,0 +1,61 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from services.forecast_store import FORECAST_COLUMNS
+
+
+def inverse_error_weights(errors: Dict[str, Optional[float]]) -> Dict[str, float]:
+    """
+    Ensemble weights proportional to 1 / error^2
+
+    Models without a usable error (None, NaN or non-positive) get zero weight;
+    if no model has a usable error, all models are weighted equally.
+
+    Args:
+        errors: Backtest RMSE per model
+
+    Returns:
+        Weights per model summing to 1
+    """
+    usable = {m: e for m, e in errors.items() if e is not None and np.isfinite(e) and e > 0}
+    if not usable:
+        return {m: 1.0 / len(errors) for m in errors} if errors else {}
+
+    inverse = {m: 1.0 / (e ** 2) for m, e in usable.items()}
+    total = sum(inverse.values())
+    return {m: inverse.get(m, 0.0) / total for m in errors}
+
+
+def ensemble_forecast(forecasts: Dict[str, List[Dict]], weights: Dict[str, float]) -> List[Dict]:
+    """
+    Weighted average of aligned forecast records
+
+    Records are combined position by position (month 1 with month 1, ...);
+    dates are taken from the first model.
+
+    Args:
+        forecasts: Forecast records per model, all with the same horizon
+        weights: Weight per model, as from :func:`inverse_error_weights`
+
+    Returns:
+        Ensemble forecast records in the same format as the inputs
+    """
+    models = [m for m in forecasts if forecasts[m] and weights.get(m, 0) > 0]
+    if not models:
+        return []
+
+    periods = min(len(forecasts[m]) for m in models)
+    w = np.array([weights[m] for m in models])[:, None]
+    w = w / w.sum()
+
+    combined = {}
+    for column in FORECAST_COLUMNS:
+        matrix = np.array([[f[column] for f in forecasts[m][:periods]] for m in models], dtype=float)
+        combined[column] = (w * matrix).sum(axis=0).round().tolist()
+
+    dates = [f['date'] for f in forecasts[models[0]][:periods]]
+    return [
+        {'date': date, **{column: combined[column][i] for column in FORECAST_COLUMNS}}
+        for i, date in enumerate(dates)
+    ]
@@ -0,0 +1,202 @@
+"""Monthly exogenous regressors for SARIMAX from FRED indicators
+
+FRED series come at mixed frequencies (daily rates, weekly claims, monthly
+unemployment, quarterly GDP). They are aligned once to a month-start index
+spanning the FRED observations: daily and weekly values are averaged per
+month, and slower series are carried forward to the months they cover. Fits
+reindex the matrix to the revenue series' months, and forecast months that
+already have observations use them. The aligned matrix is cached under a digest of the raw observations, so fits, backtests
+and forecast requests reuse it until FRED data actually changes.
+
+Future regressor paths (for months without observations yet) come from
+scenario assumptions: an annual change per feature, in the feature's own
+units, starting from its last observed value.
+"""
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from services.fingerprint import frame_digest
+
+# FREDDataService indicator names used as SARIMAX regressors
+SARIMAX_EXOG_FEATURES = [
+    name for name in os.getenv(
+        'SARIMAX_EXOG_FEATURES', 'unemployment,federal_funds_rate,consumer_confidence'
+    ).split(',') if name
+]
+
+# Annual change per feature under each scenario; features without an entry
+# are held at their last observed value
+EXOG_SCENARIOS = {
+    'base': {},
+    'optimistic': {'unemployment': -0.5, 'consumer_confidence': 5.0},
+    'pessimistic': {'unemployment': 1.5, 'consumer_confidence': -10.0, 'federal_funds_rate': -1.0}
+}
+
+# Aligned matrices kept per observation digest
+_MAX_CACHED = 4
+
+
+def observations_digest(observations: Dict[str, pd.Series]) -> str:
+    """Content hash of raw observations (names, dates and values)"""
+    digest = hashlib.sha256()
+    for name in sorted(observations):
+        series = observations[name]
+        digest.update(name.encode())
+        digest.update(series.index.to_numpy(dtype='datetime64[ns]').tobytes())
+        digest.update(np.asarray(series, dtype=float).tobytes())
+    return digest.hexdigest()
+
+
+def align_monthly(observations: Dict[str, pd.Series], features: List[str]) -> pd.DataFrame:
+    """
+    Align mixed-frequency observations to a month-start index
+
+    Args:
+        observations: Date-indexed series by feature name
+        features: Features to include, in column order
+
+    Returns:
+        DataFrame indexed by month start, one column per feature, from the
+        first to the last month with any observation; each feature is
+        carried forward after its last observation and is NaN before its first
+    """
+    monthly = {
+        name: observations[name].sort_index().resample('MS').mean()
+        for name in features if name in observations and len(observations[name])
+    }
+    if not monthly:
+        return pd.DataFrame(columns=features, dtype=float)
+
+    aligned = pd.DataFrame(monthly).reindex(columns=features)
+    return aligned.ffill()
+
+
+def scenario_assumptions(scenario_rows: Optional[pd.DataFrame] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Exog scenarios, overridden by rows of ``data/exog_scenarios.csv``
+
+    Args:
+        scenario_rows: Frame with a ``scenario`` column and one column per
+            feature holding its annual change (blank = hold flat)
+    """
+    scenarios = {name: dict(changes) for name, changes in EXOG_SCENARIOS.items()}
+    if scenario_rows is not None:
+        for row in scenario_rows.to_dict('records'):
+            name = row.pop('scenario')
+            scenarios[name] = {k: float(v) for k, v in row.items() if pd.notna(v)}
+    return scenarios
+
+
+def future_exog(aligned: pd.DataFrame, dates: pd.DatetimeIndex, changes: Dict[str, float]) -> np.ndarray:
+    """
+    Regressor values for forecast months
+
+    Months with observations use them; later months extrapolate from each
+    feature's last value by its annual change.
+
+    Args:
+        aligned: Matrix from :func:`align_monthly`
+        dates: Forecast month starts
+        changes: Annual change per feature (missing features are held flat)
+
+    Returns:
+        Array (len(dates) x features)
+    """
+    if aligned.empty:
+        raise ValueError("No exogenous feature observations available")
+
+    values = aligned.reindex(dates).to_numpy(dtype=float, copy=True)
+    last_date = aligned.index[-1]
+    months_ahead = ((dates.year - last_date.year) * 12 + (dates.month - last_date.month)).to_numpy()
+
+    last = aligned.iloc[-1].to_numpy(dtype=float)
+    rate = np.array([changes.get(name, 0.0) for name in aligned.columns]) / 12
+    extrapolated = last + np.outer(np.maximum(months_ahead, 0), rate)
+
+    beyond = months_ahead > 0
+    values[beyond] = extrapolated[beyond]
+    if np.isnan(values).any():
+        raise ValueError("Exogenous features missing for forecast months")
+    return values
+
+
+class ExogFeatureCache:
+    """Aligned exog matrices keyed by a digest of the raw observations
+
+    The most recent matrix is also written to a CSV file, so a restarted
+    process (or the serving process, after offline training) has regressors
+    without contacting FRED.
+    """
+
+    def __init__(self, path=None, features: Optional[List[str]] = None):
+        """
+        Args:
+            path: CSV file for the latest aligned matrix; memory-only if None
+            features: Feature columns (defaults to SARIMAX_EXOG_FEATURES)
+        """
+        self.path = Path(path) if path else None
+        self.features = list(features or SARIMAX_EXOG_FEATURES)
+        self._matrices: Dict[str, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+        self.current = None
+        self.fingerprint = None
+        self.hits = 0
+        self.misses = 0
+
+        if self.path is not None and self.path.exists():
+            try:
+                stored = pd.read_csv(self.path, index_col='date', parse_dates=['date'],
+                                     float_precision='round_trip')
+                self._set_current(stored.asfreq('MS'))
+                print(f"✅ Loaded exog features ({len(stored)} months)")
+            except Exception as e:
+                print(f"⚠️ Could not read exog features: {e}")
+
+    def _set_current(self, aligned: pd.DataFrame):
+        self.current = aligned
+        self.fingerprint = frame_digest(aligned.rename_axis('date').reset_index())
+
+    def matrix(self, observations: Dict[str, pd.Series]) -> pd.DataFrame:
+        """
+        Aligned matrix for the observations, computed once per distinct data
+
+        The matrix also becomes the current one; a newly computed matrix is
+        written to the CSV file.
+        """
+        key = observations_digest({name: observations[name] for name in self.features if name in observations})
+        aligned = self._matrices.get(key)
+        if aligned is not None:
+            self.hits += 1
+            if aligned is not self.current:
+                self._set_current(aligned)
+            return aligned
+
+        self.misses += 1
+        aligned = align_monthly(observations, self.features)
+        with self._lock:
+            if len(self._matrices) >= _MAX_CACHED:
+                self._matrices.pop(next(iter(self._matrices)))
+            self._matrices[key] = aligned
+            self._set_current(aligned)
+            if self.path is not None:
+                tmp_path = self.path.with_suffix(f'.{os.getpid()}.tmp')
+                aligned.rename_axis('date').to_csv(tmp_path)
+                os.replace(tmp_path, self.path)
+        return aligned
+
+    def stats(self) -> Dict:
+        return {
+            'features': self.features,
+            'months': len(self.current) if self.current is not None else 0,
+            'last_month': self.current.index[-1].strftime('%Y-%m-%d')
+            if self.current is not None and len(self.current) else None,
+            'fingerprint': self.fingerprint[:16] if self.fingerprint else None,
+            'hits': self.hits,
+            'misses': self.misses
+        }
@@ -0,0 +1,57 @@
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+# Chunk size used when hashing model artifacts from disk
+_READ_CHUNK = 1 << 20
+
+
+def file_digest(path) -> Optional[str]:
+    """
+    Content hash of a file on disk
+
+    Args:
+        path: File path
+
+    Returns:
+        Hex SHA-256 digest, or None if the file does not exist
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_READ_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def frame_digest(df: Optional[pd.DataFrame]) -> Optional[str]:
+    """
+    Content hash of a DataFrame's values and column names
+
+    Uses pandas' vectorized row hashing, so cost is linear in the frame size
+    without per-row Python work.
+    """
+    if df is None:
+        return None
+
+    digest = hashlib.sha256()
+    digest.update('|'.join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def run_hash(model_type: str, model_version: Optional[str], data_fingerprint: Optional[str],
+             periods: int) -> str:
+    """
+    Content hash identifying a forecast run
+
+    Two requests with the same model version, input data and horizon produce
+    the same forecast, so they share a hash.
+    """
+    key = f'{model_type}|{model_version or "none"}|{data_fingerprint or "none"}|{periods}'
+    return hashlib.sha256(key.encode()).hexdigest()
@@ -0,0 +1,515 @@
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    from pymongo import ASCENDING, DESCENDING, ReturnDocument
+    from pymongo.errors import DuplicateKeyError
+except ImportError:
+    ASCENDING, DESCENDING = 1, -1
+    ReturnDocument = None
+    DuplicateKeyError = Exception
+
+# Value columns stored per run, one array entry per forecast month
+FORECAST_COLUMNS = ['forecasted_revenue', 'growth_5', 'growth_10', 'decline_5']
+
+# Projection used when only run metadata is needed (no value arrays)
+RUN_SUMMARY_FIELDS = {'model_type': 1, 'periods': 1, 'created_at': 1}
+
+# Materialized-forecast hits are recorded in batches: flush interval, and the
+# most hits kept while the database is unreachable
+ACCESS_FLUSH_SECONDS = float(os.getenv('FORECAST_ACCESS_FLUSH_SECONDS', 5))
+ACCESS_MAX_PENDING = int(os.getenv('FORECAST_ACCESS_MAX_PENDING', 10000))
+
+# CSV export column names for each stored forecast column
+EXPORT_COLUMNS = {
+    'forecasted_revenue': 'Forecasted_Revenue',
+    'growth_5': 'Growth_5%',
+    'growth_10': 'Growth_10%',
+    'decline_5': 'Decline_5%'
+}
+
+
+class ForecastStore:
+    """Run-centric MongoDB storage for generated forecasts
+
+    Each forecast run is stored as a single document in ``forecasts`` keyed by
+    its run ID, with the forecast months held as columnar arrays. Runs are
+    deduplicated by a content hash (model version, input data fingerprint and
+    horizon): identical forecasts are stored once and later requests only add
+    a lightweight access entry to ``forecast_runs``. Both collections are
+    indexed on ``(model_type, created_at)`` so the latest run for a model is a
+    single indexed point read regardless of collection size.
+    """
+
+    def __init__(self, db):
+        """
+        Initialize forecast store
+
+        Args:
+            db: pymongo Database holding the forecast collections
+        """
+        self.db = db
+        self.forecasts = db['forecasts']
+        self.forecast_runs = db['forecast_runs']
+
+    def ensure_indexes(self):
+        """Create the compound indexes used by run lookups"""
+        self.forecasts.create_index(
+            [('model_type', ASCENDING), ('created_at', DESCENDING)],
+            name='model_type_created_at'
+        )
+        self.forecasts.create_index(
+            [('content_hash', ASCENDING)],
+            name='content_hash',
+            unique=True
+        )
+        self.forecast_runs.create_index(
+            [('model_type', ASCENDING), ('created_at', DESCENDING)],
+            name='model_type_created_at'
+        )
+        self.forecast_runs.create_index([('run_id', ASCENDING)], name='run_id')
+
+    @staticmethod
+    def build_run_document(run_id: str, content_hash: str, model_type: str, periods: int,
+                           forecasts: List[Dict], created_at: datetime) -> Dict:
+        """
+        Convert forecast records into a columnar run document
+
+        Args:
+            run_id: Unique run identifier, used as the document ``_id``
+            content_hash: Hash identifying the forecast content
+            model_type: Model that produced the forecast
+            periods: Forecast horizon in months
+            forecasts: Forecast records as returned by ``generate_forecast``
+            created_at: Run timestamp
+
+        Returns:
+            Document with one array per forecast column
+        """
+        document = {
+            '_id': run_id,
+            'content_hash': content_hash,
+            'model_type': model_type,
+            'periods': periods,
+            'created_at': created_at,
+            'dates': [datetime.strptime(f['date'], '%Y-%m-%d') for f in forecasts],
+        }
+        for column in FORECAST_COLUMNS:
+            document[column] = [float(f[column]) for f in forecasts]
+        return document
+
+    def save_run(self, model_type: str, periods: int, forecasts: List[Dict], content_hash: str,
+                 user_id: str = 'anonymous') -> Tuple[str, bool]:
+        """
+        Persist a forecast run, reusing an existing run with the same content
+
+        Args:
+            model_type: Model that produced the forecast
+            periods: Forecast horizon in months
+            forecasts: Forecast records as returned by ``generate_forecast``
+            content_hash: Hash of model version, input data fingerprint and horizon
+            user_id: Requesting user
+
+        Returns:
+            Tuple of (run ID, whether a new run document was stored)
+        """
+        now = datetime.utcnow()
+        new_run_id = uuid.uuid4().hex
+        update = self._run_update(new_run_id, content_hash, model_type, periods, forecasts, now)
+
+        try:
+            run = self.forecasts.find_one_and_update(
+                {'content_hash': content_hash},
+                update,
+                projection={'_id': 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # A concurrent request inserted the same content first
+            run = self.forecasts.find_one_and_update(
+                {'content_hash': content_hash},
+                {'$set': update['$set'], '$inc': update['$inc']},
+                projection={'_id': 1},
+                return_document=ReturnDocument.AFTER
+            )
+
+        run_id = run['_id']
+        created = run_id == new_run_id
+
+        self.forecast_runs.insert_one(
+            self._access_entry(run_id, content_hash, model_type, periods, user_id, created, now)
+        )
+        return run_id, created
+
+    def record_accesses(self, hits: List[Dict]) -> int:
+        """
+        Record a batch of materialized-forecast hits (see :class:`ForecastAccessLog`)
+
+        Each distinct run gets one upsert that renews its TTL and adds its hit
+        count (storing the run again if it already expired); all access
+        entries go in one insert.
+
+        Args:
+            hits: Entries queued by ``ForecastAccessLog.record``
+
+        Returns:
+            Number of hits recorded
+        """
+        entries = []
+        for content_hash, group in _group_hits(hits).items():
+            first = group[0]
+            update = self._run_update(first['run_id'] or uuid.uuid4().hex, content_hash, first['model_type'],
+                                      first['periods'], first['forecasts'], group[-1]['at'], len(group))
+            try:
+                run = self.forecasts.find_one_and_update(
+                    {'content_hash': content_hash}, update, projection={'_id': 1},
+                    upsert=True, return_document=ReturnDocument.AFTER
+                )
+            except DuplicateKeyError:
+                run = self.forecasts.find_one_and_update(
+                    {'content_hash': content_hash}, {'$set': update['$set'], '$inc': update['$inc']},
+                    projection={'_id': 1}, return_document=ReturnDocument.AFTER
+                )
+            entries.extend(_hit_entries(run['_id'], content_hash, group))
+        if entries:
+            self.forecast_runs.insert_many(entries, ordered=False)
+        return len(entries)
+
+    @classmethod
+    def _run_update(cls, run_id: str, content_hash: str, model_type: str, periods: int,
+                    forecasts: List[Dict], now: datetime, accesses: int = 1) -> Dict:
+        """Single upsert: inserts the run on first sight, otherwise only bumps its access bookkeeping"""
+        return {
+            '$setOnInsert': cls.build_run_document(
+                run_id, content_hash, model_type, periods, forecasts, now
+            ),
+            '$set': {'last_accessed_at': now},
+            '$inc': {'access_count': accesses}
+        }
+
+    @staticmethod
+    def _access_entry(run_id: str, content_hash: str, model_type: str, periods: int,
+                      user_id: str, created: bool, now: datetime) -> Dict:
+        return {
+            'run_id': run_id,
+            'content_hash': content_hash,
+            'model_type': model_type,
+            'periods': periods,
+            'user_id': user_id,
+            'reused': not created,
+            'created_at': now
+        }
+
+    def latest_run(self, model_type: str, include_values: bool = True) -> Optional[Dict]:
+        """
+        Fetch the most recent run for a model
+
+        Args:
+            model_type: Model to look up
+            include_values: Whether to return the forecast arrays or only metadata
+
+        Returns:
+            Run document, or None if the model has no stored runs
+        """
+        projection = None if include_values else RUN_SUMMARY_FIELDS
+        return self.forecasts.find_one(
+            {'model_type': model_type},
+            projection,
+            sort=[('created_at', DESCENDING)]
+        )
+
+    def get_run(self, run_id: str) -> Optional[Dict]:
+        """Fetch a single run by its run ID"""
+        return self.forecasts.find_one({'_id': run_id})
+
+    def list_runs(self, model_type: str, limit: int = 20) -> List[Dict]:
+        """
+        List recent runs for a model without their forecast arrays
+
+        Args:
+            model_type: Model to look up
+            limit: Maximum number of runs to return
+
+        Returns:
+            Run summaries, newest first
+        """
+        cursor = self.forecasts.find(
+            {'model_type': model_type},
+            RUN_SUMMARY_FIELDS
+        ).sort('created_at', DESCENDING).limit(limit)
+
+        return [self.run_summary(run) for run in cursor]
+
+    @staticmethod
+    def run_summary(run: Dict) -> Dict:
+        """JSON-serializable summary of a run document fetched with RUN_SUMMARY_FIELDS"""
+        return {
+            'run_id': run['_id'],
+            'model_type': run['model_type'],
+            'periods': run['periods'],
+            'created_at': run['created_at'].isoformat()
+        }
+
+    @staticmethod
+    def to_records(run: Dict) -> List[Dict]:
+        """Convert a columnar run document back into forecast records"""
+        dates = [d.strftime('%Y-%m-%d') for d in run['dates']]
+        records = []
+        for i, date in enumerate(dates):
+            record = {'date': date}
+            for column in FORECAST_COLUMNS:
+                record[column] = run[column][i]
+            records.append(record)
+        return records
+
+
+class AsyncForecastStore:
+    """:class:`ForecastStore` counterpart for the async (Motor) driver
+
+    Used by the ASGI app. Documents, indexes and deduplication behave exactly
+    as in the synchronous store; only the I/O is awaited.
+    """
+
+    def __init__(self, db):
+        """
+        Args:
+            db: Motor database holding the forecast collections
+        """
+        self.db = db
+        self.forecasts = db['forecasts']
+        self.forecast_runs = db['forecast_runs']
+
+    async def ensure_indexes(self):
+        await self.forecasts.create_index(
+            [('model_type', ASCENDING), ('created_at', DESCENDING)],
+            name='model_type_created_at'
+        )
+        await self.forecasts.create_index(
+            [('content_hash', ASCENDING)],
+            name='content_hash',
+            unique=True
+        )
+        await self.forecast_runs.create_index(
+            [('model_type', ASCENDING), ('created_at', DESCENDING)],
+            name='model_type_created_at'
+        )
+        await self.forecast_runs.create_index([('run_id', ASCENDING)], name='run_id')
+
+    async def save_run(self, model_type: str, periods: int, forecasts: List[Dict], content_hash: str,
+                       user_id: str = 'anonymous') -> Tuple[str, bool]:
+        """Async :meth:`ForecastStore.save_run`"""
+        now = datetime.utcnow()
+        new_run_id = uuid.uuid4().hex
+        update = ForecastStore._run_update(new_run_id, content_hash, model_type, periods, forecasts, now)
+
+        try:
+            run = await self.forecasts.find_one_and_update(
+                {'content_hash': content_hash},
+                update,
+                projection={'_id': 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            run = await self.forecasts.find_one_and_update(
+                {'content_hash': content_hash},
+                {'$set': update['$set'], '$inc': update['$inc']},
+                projection={'_id': 1},
+                return_document=ReturnDocument.AFTER
+            )
+
+        run_id = run['_id']
+        created = run_id == new_run_id
+
+        await self.forecast_runs.insert_one(
+            ForecastStore._access_entry(run_id, content_hash, model_type, periods, user_id, created, now)
+        )
+        return run_id, created
+
+    async def record_accesses(self, hits: List[Dict]) -> int:
+        """Async :meth:`ForecastStore.record_accesses`"""
+        entries = []
+        for content_hash, group in _group_hits(hits).items():
+            first = group[0]
+            update = ForecastStore._run_update(first['run_id'] or uuid.uuid4().hex, content_hash, first['model_type'],
+                                               first['periods'], first['forecasts'], group[-1]['at'], len(group))
+            try:
+                run = await self.forecasts.find_one_and_update(
+                    {'content_hash': content_hash}, update, projection={'_id': 1},
+                    upsert=True, return_document=ReturnDocument.AFTER
+                )
+            except DuplicateKeyError:
+                run = await self.forecasts.find_one_and_update(
+                    {'content_hash': content_hash}, {'$set': update['$set'], '$inc': update['$inc']},
+                    projection={'_id': 1}, return_document=ReturnDocument.AFTER
+                )
+            entries.extend(_hit_entries(run['_id'], content_hash, group))
+        if entries:
+            await self.forecast_runs.insert_many(entries, ordered=False)
+        return len(entries)
+
+    async def latest_run(self, model_type: str, include_values: bool = True) -> Optional[Dict]:
+        projection = None if include_values else RUN_SUMMARY_FIELDS
+        return await self.forecasts.find_one(
+            {'model_type': model_type},
+            projection,
+            sort=[('created_at', DESCENDING)]
+        )
+
+    async def get_run(self, run_id: str) -> Optional[Dict]:
+        return await self.forecasts.find_one({'_id': run_id})
+
+    async def list_runs(self, model_type: str, limit: int = 20) -> List[Dict]:
+        cursor = self.forecasts.find(
+            {'model_type': model_type},
+            RUN_SUMMARY_FIELDS
+        ).sort('created_at', DESCENDING).limit(limit)
+
+        return [ForecastStore.run_summary(run) async for run in cursor]
+
+
+def _group_hits(hits: List[Dict]) -> Dict[str, List[Dict]]:
+    """Queued hits per content hash, in arrival order"""
+    groups = {}
+    for hit in hits:
+        groups.setdefault(hit['content_hash'], []).append(hit)
+    return groups
+
+
+def _hit_entries(run_id: str, content_hash: str, hits: List[Dict]) -> List[Dict]:
+    """``forecast_runs`` access entries for hits served from a stored run"""
+    return [
+        ForecastStore._access_entry(run_id, content_hash, hit['model_type'], hit['periods'],
+                                    hit['user_id'], False, hit['at'])
+        for hit in hits
+    ]
+
+
+class ForecastAccessLog:
+    """Daemon thread that records materialized-forecast hits in batches
+
+    Serving a materialized forecast must not wait on the database, so each
+    hit is only queued in memory. Every ``interval`` seconds the queue is
+    handed to ``flush`` (typically ``store.record_accesses`` through the
+    circuit breaker). A failed flush keeps its hits for the next attempt; at
+    most ``max_pending`` hits are kept and further ones are dropped (counted
+    in :meth:`status`).
+    """
+
+    def __init__(self, flush: Callable[[List[Dict]], int], interval: float = ACCESS_FLUSH_SECONDS,
+                 max_pending: int = ACCESS_MAX_PENDING):
+        """
+        Args:
+            flush: Callable writing a batch of hits, returning how many it recorded
+            interval: Seconds between flushes
+            max_pending: Most hits kept in memory
+        """
+        self.flush_batch = flush
+        self.interval = interval
+        self.max_pending = max_pending
+        self.recorded = 0
+        self.dropped = 0
+        self.last_flush_at = None
+        self.last_error = None
+        self._pending = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def record(self, model_type: str, periods: int, forecasts: List[Dict], content_hash: str,
+               run_id: Optional[str], user_id: str = 'anonymous'):
+        """
+        Queue one hit of a materialized forecast
+
+        Args:
+            model_type: Model of the served forecast
+            periods: Forecast horizon in months
+            forecasts: Served records (stored again if the run expired meanwhile)
+            content_hash: Hash the forecast was materialized under
+            run_id: Run stored at materialization time (None if it was not stored)
+            user_id: Requesting user
+        """
+        hit = {
+            'model_type': model_type, 'periods': periods, 'forecasts': forecasts,
+            'content_hash': content_hash, 'run_id': run_id, 'user_id': user_id,
+            'at': datetime.utcnow()
+        }
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+            else:
+                self._pending.append(hit)
+
+    def flush(self) -> int:
+        """Write the queued hits now; returns how many were recorded"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            try:
+                recorded = self.flush_batch(batch)
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"⚠️ Forecast access flush failed: {e}")
+                with self._lock:
+                    keep = max(self.max_pending - len(self._pending), 0)
+                    self.dropped += max(len(batch) - keep, 0)
+                    self._pending[:0] = batch[-keep:] if keep else []
+                return 0
+            self.recorded += recorded
+            self.last_flush_at = datetime.utcnow()
+            self.last_error = None
+            return recorded
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='forecast-access-log', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the thread and write what is still queued"""
+        self._stop.set()
+        self.flush()
+
+    def status(self) -> Dict:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            'running': self._thread is not None and self._thread.is_alive(),
+            'pending': pending,
+            'recorded': self.recorded,
+            'dropped': self.dropped,
+            'last_flush_at': self.last_flush_at.isoformat() if self.last_flush_at else None,
+            'last_error': self.last_error,
+            'interval_seconds': self.interval
+        }
+
+
+def export_frame(dates: List[str], columns: Dict):
+    """
+    Build the CSV export DataFrame
+
+    Args:
+        dates: Date strings, one per forecast month
+        columns: Mapping (or run document) holding a value list per forecast column
+
+    Returns:
+        DataFrame with a Date column and one column per EXPORT_COLUMNS entry
+    """
+    import pandas as pd
+
+    frame = {'Date': dates}
+    for column, export_name in EXPORT_COLUMNS.items():
+        frame[export_name] = columns[column]
+    return pd.DataFrame(frame)
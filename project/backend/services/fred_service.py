@@ -1,25 +1,72 @@
 import pandas as pd
 import numpy as np
-from fredapi import Fred
+try:
+    from fredapi import Fred
+except ImportError:
+    Fred = None
 from datetime import datetime, timedelta
 import os
 from typing import Dict, List, Optional
 
+# Series behind the recession risk score
+RECESSION_INDICATORS = {
+    'recession_prob': 'RECPROUSM156N',  # US Recession Probabilities
+    'yield_curve': 'T10Y2Y',  # 10-Year Treasury Constant Maturity Minus 2-Year Treasury Constant Maturity
+    'unemployment_rate': 'UNRATE',  # Unemployment Rate
+    'initial_claims': 'ICSA',  # Initial Claims
+}
+
+
+def recession_risk_score(data: pd.DataFrame) -> np.ndarray:
+    """
+    Recession risk score (0-100) per row of recession indicator values
+
+    Args:
+        data: Frame with any of the RECESSION_INDICATORS columns
+
+    Returns:
+        Array of scores, one per row
+    """
+    score = np.zeros(len(data))
+
+    # Add points for various risk factors
+    if 'recession_prob' in data.columns:
+        score = score + data['recession_prob'].to_numpy(dtype=float) * 0.4
+
+    if 'yield_curve' in data.columns:
+        score = score + np.where(data['yield_curve'] < 0, 30, 0)
+
+    if 'unemployment_rate' in data.columns:
+        score = score + np.where(data['unemployment_rate'] > 5, 20, 0)
+
+    if 'initial_claims' in data.columns:
+        score = score + np.where(data['initial_claims'] > 400000, 10, 0)
+
+    # Cap the score at 100
+    return np.minimum(score, 100)
+
+
 class FREDDataService:
     """Service for fetching and processing economic data from FRED API"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, fred_client=None):
         """
         Initialize FRED API service
         
         Args:
             api_key: FRED API key. If None, will look for FRED_API_KEY environment variable
+            fred_client: Client with fredapi's ``get_series`` (e.g. a fake in tests);
+                a fredapi ``Fred`` client is created if None
         """
         self.api_key = api_key or os.environ.get('FRED_API_KEY')
-        if not self.api_key:
-            raise ValueError("FRED API key is required. Set FRED_API_KEY environment variable.")
-        
-        self.fred = Fred(api_key=self.api_key)
+        if fred_client is not None:
+            self.fred = fred_client
+        else:
+            if not self.api_key:
+                raise ValueError("FRED API key is required. Set FRED_API_KEY environment variable.")
+            if Fred is None:
+                raise ImportError("fredapi is required for the FRED API client")
+            self.fred = Fred(api_key=self.api_key)
         
         # Economic indicators relevant for revenue forecasting
         self.indicators = {
@@ -112,6 +159,25 @@ class FREDDataService:
             print(f"Error fetching multiple indicators: {e}")
             return pd.DataFrame()
     
+    def fetch_observations(self, names: List[str], start_date: str = None, end_date: str = None) -> Dict[str, pd.Series]:
+        """
+        Fetch indicators by name as date-indexed series (e.g. SARIMAX regressors)
+        
+        Args:
+            names: Keys of ``self.indicators``
+            start_date: Start date in 'YYYY-MM-DD' format
+            end_date: End date in 'YYYY-MM-DD' format
+            
+        Returns:
+            Dictionary of indicator name -> observations at the series' own frequency
+        """
+        observations = {}
+        for name in names:
+            df = self.fetch_indicator(self.indicators[name], start_date, end_date)
+            if not df.empty:
+                observations[name] = pd.Series(df['value'].to_numpy(dtype=float), index=pd.DatetimeIndex(df['date']))
+        return observations
+    
     def get_economic_dashboard_data(self) -> Dict:
         """
         Get key economic indicators for dashboard display
@@ -129,16 +195,7 @@ class FREDDataService:
             for name, code in self.indicators.items():
                 df = self.fetch_indicator(code, start_date, end_date)
                 if not df.empty:
-                    latest_value = df.iloc[-1]['value']
-                    previous_value = df.iloc[-2]['value'] if len(df) > 1 else latest_value
-                    
-                    dashboard_data[name] = {
-                        'current': latest_value,
-                        'previous': previous_value,
-                        'change': latest_value - previous_value,
-                        'change_percent': ((latest_value - previous_value) / previous_value * 100) if previous_value != 0 else 0,
-                        'last_updated': df.iloc[-1]['date'].strftime('%Y-%m-%d')
-                    }
+                    dashboard_data[name] = self.summarize_indicator(df)
             
             return dashboard_data
             
@@ -146,6 +203,28 @@ class FREDDataService:
             print(f"Error getting dashboard data: {e}")
             return {}
     
+    @staticmethod
+    def summarize_indicator(df: pd.DataFrame) -> Dict:
+        """
+        Dashboard entry for one indicator
+        
+        Args:
+            df: Observations (date, value) sorted by date, as from :meth:`fetch_indicator`
+            
+        Returns:
+            Dictionary with current and previous values and the change between them
+        """
+        latest_value = df.iloc[-1]['value']
+        previous_value = df.iloc[-2]['value'] if len(df) > 1 else latest_value
+        
+        return {
+            'current': latest_value,
+            'previous': previous_value,
+            'change': latest_value - previous_value,
+            'change_percent': ((latest_value - previous_value) / previous_value * 100) if previous_value != 0 else 0,
+            'last_updated': df.iloc[-1]['date'].strftime('%Y-%m-%d')
+        }
+    
     def create_economic_features(self, start_date: str = None, end_date: str = None) -> pd.DataFrame:
         """
         Create feature matrix from economic indicators for ML models
@@ -199,13 +278,7 @@ class FREDDataService:
             DataFrame with recession indicators
         """
         try:
-            # Fetch recession probability indicators
-            recession_indicators = {
-                'recession_prob': 'RECPROUSM156N',  # US Recession Probabilities
-                'yield_curve': 'T10Y2Y',  # 10-Year Treasury Constant Maturity Minus 2-Year Treasury Constant Maturity
-                'unemployment_rate': 'UNRATE',  # Unemployment Rate
-                'initial_claims': 'ICSA',  # Initial Claims
-            }
+            recession_indicators = RECESSION_INDICATORS
             
             data = self.fetch_multiple_indicators(
                 list(recession_indicators.values()),
@@ -218,23 +291,7 @@ class FREDDataService:
                 data = data.rename(columns=column_mapping)
                 
                 # Calculate recession risk score
-                data['recession_risk_score'] = 0
-                
-                # Add points for various risk factors
-                if 'recession_prob' in data.columns:
-                    data['recession_risk_score'] += data['recession_prob'] * 0.4
-                
-                if 'yield_curve' in data.columns:
-                    data['recession_risk_score'] += np.where(data['yield_curve'] < 0, 30, 0)
-                
-                if 'unemployment_rate' in data.columns:
-                    data['recession_risk_score'] += np.where(data['unemployment_rate'] > 5, 20, 0)
-                
-                if 'initial_claims' in data.columns:
-                    data['recession_risk_score'] += np.where(data['initial_claims'] > 400000, 10, 0)
-                
-                # Cap the score at 100
-                data['recession_risk_score'] = np.minimum(data['recession_risk_score'], 100)
+                data['recession_risk_score'] = recession_risk_score(data)
             
             return data
             
@@ -0,0 +1,338 @@
+"""Hierarchical forecasting with coherent reconciliation
+
+Revenue is forecast for every node of a hierarchy (company -> region ->
+business unit, or any number of levels). Base forecasts for all nodes are
+computed in one batch by the LSTM or SARIMA model and then reconciled so
+every aggregate equals the sum of its children:
+
+* ``bottom_up``: leaf forecasts summed up the hierarchy
+* ``wls_struct``: weighted least squares, each node weighted by the number
+  of leaves below it
+* ``mint_diag``: MinT with a diagonal covariance, each node weighted by the
+  variance of its base model's one-step errors
+
+The summing matrix ``S`` (nodes x leaves) is sparse and the WLS normal
+equations ``S' W^-1 S b = S' W^-1 y`` are solved with a Jacobi-preconditioned
+conjugate gradient, vectorized over the forecast horizon. ``S' W^-1 S`` is
+never formed, so tens of thousands of leaves reconcile in seconds.
+"""
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+RECONCILIATION_METHODS = ('bottom_up', 'wls_struct', 'mint_diag')
+
+# Level columns of data/revenue_hierarchy.csv, top to bottom (leaves last)
+HIERARCHY_LEVELS = [level for level in os.getenv('HIERARCHY_LEVELS', 'region,business_unit').split(',') if level]
+
+# Levels of the demo hierarchy served when no hierarchy data is loaded
+MOCK_LEVELS = ['region', 'business_unit']
+
+TOTAL_NODE = 'total'
+
+
+class Hierarchy:
+    """Nodes of a revenue hierarchy and its sparse summing matrix
+
+    Nodes are ordered top-down: the total, then each level's nodes sorted by
+    path, with the leaves as the last ``n_leaves`` rows. Node IDs are paths
+    such as ``total/EMEA/Retail``.
+    """
+
+    def __init__(self, leaf_paths: pd.DataFrame):
+        """
+        Args:
+            leaf_paths: One row per leaf with one column per level (top to bottom);
+                rows must be unique
+        """
+        self.levels = [TOTAL_NODE] + list(leaf_paths.columns)
+        paths = leaf_paths.astype(str).reset_index(drop=True)
+        if paths.duplicated().any():
+            raise ValueError("Hierarchy leaf paths must be unique")
+        n_leaves = len(paths)
+
+        node_ids, node_levels, rows = [TOTAL_NODE], [0], [np.zeros(n_leaves, dtype=np.int64)]
+        prefix = pd.Series(TOTAL_NODE, index=paths.index)
+        for depth, level in enumerate(paths.columns, start=1):
+            prefix = prefix + '/' + paths[level]
+            if depth == len(paths.columns):
+                # Leaves keep their input order, so the bottom block of S is the identity
+                codes, uniques = np.arange(n_leaves), prefix.to_numpy()
+            else:
+                codes, uniques = pd.factorize(prefix, sort=True)
+            rows.append(len(node_ids) + codes)
+            node_ids.extend(uniques)
+            node_levels.extend([depth] * len(uniques))
+
+        self.node_ids = np.asarray(node_ids, dtype=object)
+        self.node_levels = np.asarray(node_levels)
+        self.summing_matrix = sparse.csr_matrix(
+            (np.ones(n_leaves * len(rows)), (np.concatenate(rows), np.tile(np.arange(n_leaves), len(rows)))),
+            shape=(len(node_ids), n_leaves)
+        )
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, levels: Sequence[str] = None, date_column: str = 'Date',
+                   value_column: str = 'Revenue') -> Tuple['Hierarchy', pd.DatetimeIndex, np.ndarray]:
+        """
+        Build a hierarchy and leaf history from a long frame
+
+        Args:
+            df: One row per leaf and month, with the level columns
+            levels: Level columns, top to bottom; defaults to HIERARCHY_LEVELS
+
+        Returns:
+            Tuple of (hierarchy, month index, leaf values (leaves x months));
+            months a leaf has no row for are 0
+        """
+        levels = list(levels or HIERARCHY_LEVELS)
+        frame = df.assign(**{date_column: pd.to_datetime(df[date_column]).dt.to_period('M').dt.to_timestamp()})
+        wide = frame.pivot_table(index=levels, columns=date_column, values=value_column,
+                                 aggfunc='sum', fill_value=0.0)
+        wide = wide.reindex(columns=pd.date_range(wide.columns.min(), wide.columns.max(), freq='MS'),
+                            fill_value=0.0)
+
+        hierarchy = cls(wide.index.to_frame(index=False))
+        return hierarchy, wide.columns, wide.to_numpy(dtype=float)
+
+    @property
+    def n_nodes(self) -> int:
+        return self.summing_matrix.shape[0]
+
+    @property
+    def n_leaves(self) -> int:
+        return self.summing_matrix.shape[1]
+
+    def aggregate(self, leaf_values: np.ndarray) -> np.ndarray:
+        """Values of every node (nodes x columns) from leaf values (leaves x columns)"""
+        return np.asarray(self.summing_matrix @ leaf_values)
+
+    def leaf_counts(self) -> np.ndarray:
+        return np.asarray(self.summing_matrix.sum(axis=1)).ravel()
+
+
+def _batched_cg(matvec, B: np.ndarray, diagonal: np.ndarray, tol: float,
+                maxiter: int) -> Tuple[np.ndarray, int, float]:
+    """
+    Jacobi-preconditioned conjugate gradient for ``A X = B``, one system per column
+
+    All columns share the same matrix-vector products; step sizes are per column.
+
+    Returns:
+        Tuple of (solution, iterations run, worst relative residual over the columns)
+    """
+    X = B / diagonal[:, None]
+    R = B - matvec(X)
+    Z = R / diagonal[:, None]
+    P = Z.copy()
+    rz = np.einsum('ij,ij->j', R, Z)
+    scale = np.maximum(np.linalg.norm(B, axis=0), np.finfo(float).tiny)
+
+    for iteration in range(maxiter):
+        residual = float(np.max(np.linalg.norm(R, axis=0) / scale))
+        if residual <= tol:
+            return X, iteration, residual
+        AP = matvec(P)
+        pap = np.einsum('ij,ij->j', P, AP)
+        alpha = np.divide(rz, pap, out=np.zeros_like(rz), where=pap > 0)
+        X += alpha * P
+        R -= alpha * AP
+        Z = R / diagonal[:, None]
+        rz_next = np.einsum('ij,ij->j', R, Z)
+        beta = np.divide(rz_next, rz, out=np.zeros_like(rz), where=rz > 0)
+        P = Z + beta * P
+        rz = rz_next
+    return X, maxiter, float(np.max(np.linalg.norm(R, axis=0) / scale))
+
+
+def reconcile(hierarchy: Hierarchy, base: np.ndarray, method: str = 'mint_diag',
+              residual_var: Optional[np.ndarray] = None, tol: float = 1e-10,
+              maxiter: int = 500) -> Tuple[np.ndarray, Dict]:
+    """
+    Reconcile base forecasts so every level sums up
+
+    Args:
+        hierarchy: Hierarchy the forecasts are for
+        base: Base forecasts (nodes x horizon), in hierarchy node order
+        method: One of RECONCILIATION_METHODS
+        residual_var: Base model one-step error variance per node (``mint_diag``)
+        tol: Relative residual at which the solver stops
+        maxiter: Solver iteration limit
+
+    Returns:
+        Tuple of (coherent forecasts (nodes x horizon), solver info: iterations,
+        whether the tolerance was met and the final relative residual)
+
+    Raises:
+        ValueError: For an unknown method or missing ``residual_var``
+    """
+    S = hierarchy.summing_matrix
+    if method == 'bottom_up':
+        return hierarchy.aggregate(base[-hierarchy.n_leaves:]), {'iterations': 0, 'converged': True}
+
+    if method == 'wls_struct':
+        weights = hierarchy.leaf_counts()
+    elif method == 'mint_diag':
+        if residual_var is None:
+            raise ValueError("mint_diag reconciliation needs residual variances")
+        # Floor tiny variances so a perfectly fitted node cannot dominate
+        floor = max(float(np.median(residual_var)) * 1e-6, np.finfo(float).tiny)
+        weights = np.maximum(residual_var, floor)
+    else:
+        raise ValueError(f"Unknown reconciliation method: {method}")
+
+    w_inv = 1.0 / weights
+    St = S.T.tocsr()
+
+    def matvec(X):
+        return St @ (w_inv[:, None] * (S @ X))
+
+    # diag(S' W^-1 S) = S' W^-1 for a 0/1 summing matrix
+    diagonal = np.asarray(St @ w_inv).ravel()
+    leaves, iterations, residual = _batched_cg(matvec, St @ (w_inv[:, None] * base), diagonal, tol, maxiter)
+    converged = residual <= tol
+    if not converged:
+        # Still coherent (leaves are summed up), but not the exact WLS solution
+        print(f"⚠️ {method} reconciliation stopped after {iterations} iterations "
+              f"at relative residual {residual:.2e} (tolerance {tol:.0e})")
+    return hierarchy.aggregate(leaves), {'iterations': iterations, 'converged': converged,
+                                         'relative_residual': residual}
+
+
+def seasonal_naive_many(values: np.ndarray, steps: int, season: int = 12) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Seasonal naive forecasts for many series (fallback base model)
+
+    Returns:
+        Tuple of (mean (series x steps), residual_var per series)
+    """
+    season = min(season, values.shape[1])
+    last_season = values[:, -season:]
+    mean = np.tile(last_season, (1, -(-steps // season)))[:, :steps]
+    errors = values[:, season:] - values[:, :-season]
+    residual_var = errors.var(axis=1) if errors.shape[1] else np.ones(len(values))
+    return mean, residual_var
+
+
+def mock_hierarchy_frame(seed: int = 42) -> pd.DataFrame:
+    """Demo hierarchy (4 regions x 3 business units, MOCK_LEVELS) of seeded synthetic revenue"""
+    from services.synthetic_data import SyntheticRevenueGenerator
+
+    regions = ['AMER', 'APAC', 'EMEA', 'LATAM']
+    units = ['Enterprise', 'Retail', 'Services']
+    panel = SyntheticRevenueGenerator(seed=seed, break_probability=0.0).generate(
+        len(regions) * len(units), n_months=60, start='2019-01-01'
+    )
+    frame = panel.to_long_frame()
+    leaf = frame.pop('series_id').str.replace('series_', '').astype(int)
+    frame['region'] = (leaf // len(units)).map(dict(enumerate(regions)))
+    frame['business_unit'] = (leaf % len(units)).map(dict(enumerate(units)))
+    return frame
+
+
+class HierarchicalForecaster:
+    """Coherent forecasts for every node of the loader's revenue hierarchy
+
+    The hierarchy and node history are built once per loaded data frame
+    (data/revenue_hierarchy.csv, or a demo hierarchy when it is missing).
+    """
+
+    def __init__(self, loader):
+        """
+        Args:
+            loader: ModelDataLoader providing ``hierarchy_data`` and ``forecast_many``
+        """
+        self.loader = loader
+        self._frame = None
+        self._data = None
+        self._lock = threading.Lock()
+
+    def data(self) -> Tuple[Hierarchy, pd.DatetimeIndex, np.ndarray]:
+        """
+        Hierarchy, month index and history of every node (nodes x months)
+
+        Rebuilt when the loader's hierarchy frame is replaced (upload or reload).
+        """
+        frame = self.loader.hierarchy_data
+        with self._lock:
+            if self._data is None or self._frame is not frame:
+                if frame is None:
+                    hierarchy, dates, leaves = Hierarchy.from_frame(mock_hierarchy_frame(), MOCK_LEVELS)
+                else:
+                    hierarchy, dates, leaves = Hierarchy.from_frame(frame, HIERARCHY_LEVELS)
+                self._data = (hierarchy, dates, hierarchy.aggregate(leaves))
+                self._frame = frame
+            return self._data
+
+    def forecast(self, model_type: str = 'sarima', periods: int = 12, method: str = 'mint_diag',
+                 levels: Optional[List[str]] = None) -> Dict:
+        """
+        Reconciled forecasts for every node
+
+        Base forecasts come from ``loader.forecast_many`` for all nodes in
+        one batch; if the model is unavailable, seasonal naive forecasts are
+        used and reported as ``base_model``. Leaf forecasts are rounded before
+        aggregation, so every reported total is exactly the sum of its
+        children.
+
+        Args:
+            model_type: Base model ('lstm' or 'sarima')
+            periods: Forecast horizon in months
+            method: One of RECONCILIATION_METHODS
+            levels: Levels whose nodes are returned; all levels if None
+
+        Returns:
+            Dict with forecast dates and per-node base and reconciled forecasts
+        """
+        started = time.perf_counter()
+        hierarchy, dates, history = self.data()
+
+        base_model = model_type
+        base = self.loader.forecast_many(model_type, history, periods)
+        if base is None:
+            base_model = 'seasonal_naive'
+            base = seasonal_naive_many(history, periods)
+        mean, residual_var = base
+        base_seconds = time.perf_counter() - started
+
+        reconciled, info = reconcile(hierarchy, mean, method, residual_var)
+        coherent = hierarchy.aggregate(np.round(reconciled[-hierarchy.n_leaves:]))
+
+        if levels:
+            selected = np.isin(np.asarray(hierarchy.levels)[hierarchy.node_levels], levels)
+        else:
+            selected = np.ones(hierarchy.n_nodes, dtype=bool)
+        level_names = np.asarray(hierarchy.levels)[hierarchy.node_levels[selected]].tolist()
+        future_dates = pd.date_range(start=dates[-1] + pd.DateOffset(months=1), periods=periods, freq='MS')
+
+        return {
+            'model': model_type,
+            'base_model': base_model,
+            'method': method,
+            'periods': periods,
+            'levels': hierarchy.levels,
+            'dates': future_dates.strftime('%Y-%m-%d').tolist(),
+            'node_count': hierarchy.n_nodes,
+            'leaf_count': hierarchy.n_leaves,
+            'nodes': [
+                {'id': node_id, 'level': level, 'base': base_row, 'forecast': forecast_row}
+                for node_id, level, base_row, forecast_row in zip(
+                    hierarchy.node_ids[selected].tolist(),
+                    level_names,
+                    np.round(mean[selected]).tolist(),
+                    coherent[selected].tolist()
+                )
+            ],
+            'solver': {
+                **info,
+                'base_seconds': round(base_seconds, 3),
+                'seconds': round(time.perf_counter() - started, 3)
+            },
+            'generated_at': datetime.utcnow().isoformat()
+        }
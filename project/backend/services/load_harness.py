@@ -0,0 +1,443 @@
+"""End-to-end load test of the API with latency percentile reports
+
+Starts the Flask backend in this process with local stand-ins: an in-memory
+mongomock client for MongoDB and a seeded fake FRED client, so a run needs
+no network and is repeatable. Requests to ``/api/forecast``,
+``/api/historical``, ``/api/export/forecast`` and ``/api/upload`` are issued
+open-loop at a target rate per endpoint. Latency is measured from each
+request's scheduled start, so a slow server is not hidden by the load
+generator waiting on it (coordinated omission).
+
+The report (JSON) has throughput, p50/p95/p99 latency and error rates per
+endpoint. Compared against a baseline report, the run fails (exit code 1)
+when an endpoint's p99 or error rate regresses beyond the given limits.
+
+Example:
+    python -m services.load_harness --duration 60 --rate forecast=20 --rate upload=0.5 --out output/load_test.json
+    python -m services.load_harness --baseline output/load_test_baseline.json --max-p99-regression 0.2
+    python -m services.load_harness --target http://localhost:5000  # running server, no stand-ins
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+# Requests per second per endpoint when no --rate is given
+DEFAULT_RATES = {'forecast': 10.0, 'historical': 20.0, 'export': 2.0, 'upload': 0.5}
+
+# Forecast request parameters drawn per request: standard horizons are
+# served from the materialized store, the others are computed live
+FORECAST_MODELS = ('lstm', 'sarima')
+FORECAST_PERIODS = (12, 24, 36, 6, 60)
+
+
+class FakeFredClient:
+    """Seeded stand-in for fredapi's ``Fred`` client
+
+    Returns a deterministic monthly series per FRED code, optionally after a
+    delay that emulates the network round-trip.
+    """
+
+    def __init__(self, latency: float = 0.0, seed: int = 42):
+        self.latency = latency
+        self.seed = seed
+        self.calls = 0
+
+    def get_series(self, series_id: str, start=None, end=None, **kwargs) -> pd.Series:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        dates = pd.date_range(start or '2000-01-01', end or datetime.now(), freq='MS')
+        rng = np.random.default_rng([self.seed, zlib.crc32(series_id.encode())])
+        level = 10 ** rng.uniform(0, 3)
+        values = level * (1 + np.cumsum(rng.normal(0, 0.01, len(dates))))
+        return pd.Series(values, index=dates)
+
+
+def _upload_body(months: int, seed: int) -> Tuple[bytes, str]:
+    """Multipart form with a synthetic revenue CSV, as sent by the admin panel"""
+    from services.synthetic_data import SyntheticRevenueGenerator
+
+    panel = SyntheticRevenueGenerator(seed=seed).generate(n_series=1, n_months=months)
+    csv = panel.to_fred_frame().to_csv(index=False).encode()
+    boundary = uuid.uuid4().hex
+    body = (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="load_test.csv"\r\n'
+        f'Content-Type: text/csv\r\n\r\n'
+    ).encode() + csv + f'\r\n--{boundary}--\r\n'.encode()
+    return body, f'multipart/form-data; boundary={boundary}'
+
+
+class TrafficMix:
+    """Request builders for each load-tested endpoint"""
+
+    def __init__(self, upload_months: int = 120, seed: int = 42):
+        self.upload_body, self.upload_type = _upload_body(upload_months, seed)
+
+    def build(self, endpoint: str, rng: np.random.Generator) -> Tuple[str, str, Optional[bytes], Dict]:
+        """
+        Returns:
+            Tuple of (method, path, body, headers) for one request
+        """
+        if endpoint == 'forecast':
+            model = FORECAST_MODELS[rng.integers(len(FORECAST_MODELS))]
+            periods = FORECAST_PERIODS[rng.integers(len(FORECAST_PERIODS))]
+            return 'GET', f'/api/forecast?model={model}&periods={periods}', None, {}
+        if endpoint == 'historical':
+            return 'GET', '/api/historical', None, {}
+        if endpoint == 'export':
+            model = FORECAST_MODELS[rng.integers(len(FORECAST_MODELS))]
+            return 'GET', f'/api/export/forecast?model={model}', None, {}
+        if endpoint == 'upload':
+            return 'POST', '/api/upload', self.upload_body, {'Content-Type': self.upload_type}
+        raise ValueError(f"Unknown endpoint: {endpoint}")
+
+
+def _send(base_url: str, method: str, path: str, body: Optional[bytes], headers: Dict,
+          timeout: float) -> Tuple[int, int]:
+    """Issue one request; returns (status, response bytes), status 0 on a connection error"""
+    request = urllib.request.Request(base_url + path, data=body, headers=headers, method=method)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, len(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, len(e.read())
+    except (urllib.error.URLError, OSError):
+        return 0, 0
+
+
+def run_load(base_url: str, rates: Dict[str, float], duration: float, warmup: float = 0.0,
+             concurrency: int = 64, arrivals: str = 'poisson', seed: int = 42, timeout: float = 30.0,
+             upload_months: int = 120) -> Dict:
+    """
+    Drive the traffic mix against a server and summarize the results
+
+    Args:
+        base_url: Server root, e.g. http://127.0.0.1:5000
+        rates: Target requests per second per endpoint
+        duration: Measured seconds
+        warmup: Seconds of load before measuring (results discarded)
+        concurrency: Maximum requests in flight
+        arrivals: 'poisson' (exponential gaps) or 'uniform' (fixed gaps)
+        seed: Seed of arrival times and request parameters
+        timeout: Per-request timeout in seconds
+        upload_months: Months in the uploaded CSV
+
+    Returns:
+        Report dictionary (see :func:`summarize`)
+    """
+    mix = TrafficMix(upload_months, seed)
+    samples: List[Tuple[str, float, float, int]] = []
+    samples_lock = threading.Lock()
+    start = time.perf_counter() + 0.5
+    measure_from = start + warmup
+    end = measure_from + duration
+
+    def issue(endpoint, scheduled, method, path, body, headers):
+        status, _ = _send(base_url, method, path, body, headers, timeout)
+        latency = time.perf_counter() - scheduled
+        if scheduled >= measure_from:
+            with samples_lock:
+                samples.append((endpoint, scheduled, latency, status))
+
+    def schedule(endpoint, rate, rng, pool):
+        # Open loop: arrivals follow the schedule whatever the server does
+        t = start
+        while True:
+            t += rng.exponential(1 / rate) if arrivals == 'poisson' else 1 / rate
+            if t >= end:
+                return
+            delay = t - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(issue, endpoint, t, *mix.build(endpoint, rng))
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='load') as pool:
+        schedulers = [
+            threading.Thread(target=schedule, name=f'schedule-{endpoint}',
+                             args=(endpoint, rate, np.random.default_rng([seed, i]), pool), daemon=True)
+            for i, (endpoint, rate) in enumerate(rates.items()) if rate > 0
+        ]
+        for thread in schedulers:
+            thread.start()
+        for thread in schedulers:
+            thread.join()
+    elapsed = max(time.perf_counter(), end) - measure_from
+
+    return summarize(samples, rates, duration, elapsed, {
+        'target': base_url,
+        'duration_s': duration,
+        'warmup_s': warmup,
+        'concurrency': concurrency,
+        'arrivals': arrivals,
+        'seed': seed
+    })
+
+
+def _latency_stats(latencies: np.ndarray) -> Dict:
+    if not len(latencies):
+        return {'p50': None, 'p95': None, 'p99': None, 'max': None, 'mean': None}
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    return {
+        'p50': round(float(p50), 2),
+        'p95': round(float(p95), 2),
+        'p99': round(float(p99), 2),
+        'max': round(float(latencies.max() * 1000), 2),
+        'mean': round(float(latencies.mean() * 1000), 2)
+    }
+
+
+def summarize(samples: List[Tuple[str, float, float, int]], rates: Dict[str, float], duration: float,
+              elapsed: float, config: Dict) -> Dict:
+    """
+    Per-endpoint throughput, latency percentiles and error rates
+
+    Args:
+        samples: (endpoint, scheduled time, latency seconds, HTTP status) per measured request
+        rates: Target requests per second per endpoint
+        duration: Measured (scheduled) seconds
+        elapsed: Seconds until the last measured request completed
+        config: Run settings copied into the report
+
+    Returns:
+        Report with ``endpoints`` and ``overall`` sections; latencies in ms.
+        Errors are statuses 5xx and connection failures (status 0); 429/503
+        admission rejections are counted separately as ``rejected``.
+    """
+    def section(rows, target_rps):
+        statuses = np.array([r[3] for r in rows], dtype=int)
+        latencies = np.array([r[2] for r in rows], dtype=float)
+        errors = int(np.count_nonzero((statuses == 0) | ((statuses >= 500) & (statuses != 503))))
+        rejected = int(np.count_nonzero((statuses == 429) | (statuses == 503)))
+        ok = (statuses >= 200) & (statuses < 400)
+        return {
+            'target_rps': target_rps,
+            'requests': len(rows),
+            'throughput_rps': round(int(np.count_nonzero(ok)) / elapsed, 2) if elapsed else 0.0,
+            'errors': errors,
+            'rejected': rejected,
+            'error_rate': round(errors / len(rows), 4) if rows else 0.0,
+            'status_counts': {str(s): int(c) for s, c in zip(*np.unique(statuses, return_counts=True))},
+            'latency_ms': _latency_stats(latencies),
+            'ok_latency_ms': _latency_stats(latencies[ok])
+        }
+
+    by_endpoint = {endpoint: [] for endpoint in rates if rates[endpoint] > 0}
+    for row in samples:
+        by_endpoint[row[0]].append(row)
+
+    return {
+        'generated_at': datetime.utcnow().isoformat(),
+        'config': {**config, 'rates': rates, 'elapsed_s': round(elapsed, 2)},
+        'endpoints': {endpoint: section(rows, rates[endpoint]) for endpoint, rows in by_endpoint.items()},
+        'overall': section(samples, sum(rates[e] for e in by_endpoint))
+    }
+
+
+def compare(report: Dict, baseline: Dict, max_p99_regression: float = 0.2,
+            max_error_rate: Optional[float] = None) -> List[str]:
+    """
+    Regressions of a report against a baseline report
+
+    Args:
+        report: Report of this run
+        baseline: Report of the reference run
+        max_p99_regression: Allowed relative p99 increase per endpoint (0.2 = +20%)
+        max_error_rate: Allowed absolute error rate per endpoint; defaults to
+            the baseline's rate plus one percentage point
+
+    Returns:
+        One message per regression (empty if none)
+    """
+    violations = []
+    for endpoint, current in report['endpoints'].items():
+        reference = baseline.get('endpoints', {}).get(endpoint)
+        if reference is None:
+            continue
+
+        p99, reference_p99 = current['latency_ms']['p99'], reference['latency_ms']['p99']
+        if p99 is not None and reference_p99 and p99 > reference_p99 * (1 + max_p99_regression):
+            violations.append(f"{endpoint}: p99 {p99} ms > {reference_p99} ms baseline "
+                              f"+{max_p99_regression:.0%}")
+
+        allowed = max_error_rate if max_error_rate is not None else reference['error_rate'] + 0.01
+        if current['error_rate'] > allowed:
+            violations.append(f"{endpoint}: error rate {current['error_rate']:.2%} > {allowed:.2%}")
+    return violations
+
+
+def _get_json(url: str, timeout: float = 10.0) -> Optional[Dict]:
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return json.loads(response.read())
+    except (urllib.error.URLError, OSError, ValueError):
+        return None
+
+
+def wait_until_ready(base_url: str, timeout: float = 120.0):
+    """Poll /api/health until the server answers"""
+    deadline = time.perf_counter() + timeout
+    while _get_json(f'{base_url}/api/health', timeout=5) is None:
+        if time.perf_counter() > deadline:
+            raise TimeoutError(f"{base_url} not ready after {timeout:.0f}s")
+        time.sleep(0.5)
+
+
+class EmbeddedServer:
+    """The Flask backend served in this process, with MongoDB and FRED stand-ins
+
+    The backend runs on a copy of data/ in a temporary directory, with a
+    temporary output/, so uploads, exports, quality flags and derived files
+    never touch the source tree.
+    """
+
+    def __init__(self, port: int = 0, fred_latency: float = 0.0, seed: int = 42):
+        """
+        Args:
+            port: Port to listen on (0 picks a free one)
+            fred_latency: Seconds each fake FRED call takes
+            seed: Seed of the fake FRED data
+        """
+        if mongomock is None:
+            raise ImportError("mongomock is required for the embedded server (pip install -r requirements-dev.txt, or pass --target)")
+
+        self.workdir = Path(tempfile.mkdtemp(prefix='growthiq_load_'))
+        backend_path = Path(__file__).resolve().parent.parent
+        shutil.copytree(backend_path / 'data', self.workdir / 'data')
+        (self.workdir / 'output').mkdir()
+
+        # Paths are read when the loader is built (at import, and again on a
+        # model publish), so they must be set before the app is imported
+        os.environ['GROWTHIQ_DATA_PATH'] = str(self.workdir / 'data')
+        os.environ['GROWTHIQ_OUTPUT_PATH'] = str(self.workdir / 'output')
+        os.environ.pop('PRECOMPUTE_STORE_PATH', None)
+        # Defer per-process setup (as gunicorn's post_fork does) so the
+        # stand-ins are in place before background threads start
+        os.environ['GROWTHIQ_PRELOAD'] = 'true'
+
+        import app as backend
+        from werkzeug.serving import make_server
+        from services.economic_snapshot import EconomicSnapshotService
+        from services.fred_service import FREDDataService
+
+        self.backend = backend
+        backend.economic_snapshot = EconomicSnapshotService(
+            FREDDataService(fred_client=FakeFredClient(fred_latency, seed)),
+            on_change=backend._on_economic_change
+        )
+        # No rollups: mongomock does not implement the $merge they write with
+        backend.init_worker(mongo_client=mongomock.MongoClient(), rollups=False)
+
+        self.server = make_server('127.0.0.1', port, backend.app, threaded=True)
+        self.base_url = f'http://127.0.0.1:{self.server.server_port}'
+        self._thread = threading.Thread(target=self.server.serve_forever, name='load-test-server', daemon=True)
+
+    def __enter__(self) -> 'EmbeddedServer':
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.backend.precompute_scheduler.stop()
+        self.backend.economic_snapshot.stop()
+        if self.backend.rollup_scheduler is not None:
+            self.backend.rollup_scheduler.stop()
+        if self.backend.access_log is not None:
+            self.backend.access_log.stop()
+
+
+def _parse_rates(values: Optional[List[str]]) -> Dict[str, float]:
+    if not values:
+        return dict(DEFAULT_RATES)
+    rates = {endpoint: 0.0 for endpoint in DEFAULT_RATES}
+    for value in values:
+        endpoint, _, rate = value.partition('=')
+        if endpoint not in DEFAULT_RATES:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint {endpoint!r}; use {', '.join(DEFAULT_RATES)}")
+        rates[endpoint] = float(rate)
+    return rates
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the API and report latency percentiles')
+    parser.add_argument('--target', help='base URL of a running server (default: embedded server with stand-ins)')
+    parser.add_argument('--port', type=int, default=0, help='embedded server port (default: any free port)')
+    parser.add_argument('--rate', action='append', metavar='ENDPOINT=RPS',
+                        help=f'target rate per endpoint, repeatable ({", ".join(DEFAULT_RATES)}); '
+                             f'endpoints not given are not exercised')
+    parser.add_argument('--duration', type=float, default=30, help='measured seconds')
+    parser.add_argument('--warmup', type=float, default=5, help='seconds of load before measuring')
+    parser.add_argument('--concurrency', type=int, default=64, help='maximum requests in flight')
+    parser.add_argument('--arrivals', choices=('poisson', 'uniform'), default='poisson')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--timeout', type=float, default=30, help='per-request timeout in seconds')
+    parser.add_argument('--upload-months', type=int, default=120, help='months in the uploaded CSV')
+    parser.add_argument('--fred-latency', type=float, default=0.0, help='seconds per fake FRED call')
+    parser.add_argument('--out', help='write the JSON report to this file')
+    parser.add_argument('--baseline', help='baseline report to compare against')
+    parser.add_argument('--max-p99-regression', type=float, default=0.2,
+                        help='allowed relative p99 increase over the baseline')
+    parser.add_argument('--max-error-rate', type=float, default=None,
+                        help='allowed error rate per endpoint (default: baseline + 1 point)')
+    args = parser.parse_args()
+
+    rates = _parse_rates(args.rate)
+    load_args = dict(rates=rates, duration=args.duration, warmup=args.warmup, concurrency=args.concurrency,
+                     arrivals=args.arrivals, seed=args.seed, timeout=args.timeout,
+                     upload_months=args.upload_months)
+
+    if args.target:
+        wait_until_ready(args.target)
+        report = run_load(args.target, **load_args)
+        report['server'] = _get_json(f'{args.target}/api/health')
+    else:
+        with EmbeddedServer(args.port, args.fred_latency, args.seed) as server:
+            wait_until_ready(server.base_url)
+            report = run_load(server.base_url, **load_args)
+            report['config']['target'] = 'embedded'
+            report['server'] = _get_json(f'{server.base_url}/api/health')
+
+    output = json.dumps(report, indent=2, default=str)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(output)
+    print(output)
+
+    for endpoint, section in report['endpoints'].items():
+        latency = section['latency_ms']
+        print(f"✅ {endpoint}: {section['throughput_rps']}/s, p50 {latency['p50']} ms, "
+              f"p95 {latency['p95']} ms, p99 {latency['p99']} ms, errors {section['error_rate']:.2%}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            violations = compare(report, json.load(f), args.max_p99_regression, args.max_error_rate)
+        for violation in violations:
+            print(f"❌ {violation}")
+        if violations:
+            sys.exit(1)
+        print("✅ No regressions against the baseline")
+
+
+if __name__ == '__main__':
+    main()
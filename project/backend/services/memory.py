@@ -0,0 +1,104 @@
+"""Per-process memory accounting from /proc (Linux)
+
+RSS alone double-counts pages that forked workers share with the master.
+PSS splits each shared page evenly across the processes mapping it, so the
+sum of PSS over the master and its workers is the real footprint of a pod.
+
+Example:
+    python -m services.memory <gunicorn master pid>
+"""
+import argparse
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# smaps_rollup fields reported, in kB
+_SMAPS_FIELDS = {
+    'Rss': 'rss_mb',
+    'Pss': 'pss_mb',
+    'Shared_Clean': 'shared_clean_mb',
+    'Shared_Dirty': 'shared_dirty_mb',
+    'Private_Clean': 'private_clean_mb',
+    'Private_Dirty': 'private_dirty_mb',
+    'Swap': 'swap_mb'
+}
+
+
+def process_memory(pid: Optional[int] = None) -> Dict:
+    """
+    Memory breakdown of one process
+
+    Args:
+        pid: Process ID; the current process if None
+
+    Returns:
+        Dict of RSS/PSS and shared/private sizes in MB, or ``{'available': False}``
+        where /proc is not readable
+    """
+    pid = pid or os.getpid()
+    report = {'pid': pid}
+    try:
+        # smaps_rollup (Linux 4.14+) is a single pre-summed record
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                name, _, rest = line.partition(':')
+                if name in _SMAPS_FIELDS:
+                    report[_SMAPS_FIELDS[name]] = round(int(rest.split()[0]) / 1024, 1)
+    except OSError:
+        try:
+            with open(f'/proc/{pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        report['rss_mb'] = round(int(line.split()[1]) / 1024, 1)
+        except OSError:
+            return {'pid': pid, 'available': False}
+
+    if 'shared_clean_mb' in report:
+        report['shared_mb'] = round(report['shared_clean_mb'] + report['shared_dirty_mb'], 1)
+        report['private_mb'] = round(report['private_clean_mb'] + report['private_dirty_mb'], 1)
+    report['available'] = True
+    return report
+
+
+def child_pids(pid: int) -> List[int]:
+    """Direct children of a process (e.g. a gunicorn master's workers)"""
+    children = []
+    for task in Path(f'/proc/{pid}/task').glob('*'):
+        try:
+            children.extend(int(c) for c in (task / 'children').read_text().split())
+        except OSError:
+            continue
+    return sorted(set(children))
+
+
+def worker_memory_report(master_pid: int) -> Dict:
+    """
+    Memory of a master process and all its workers
+
+    Returns:
+        Dict with per-process reports and the summed PSS (the pod's real usage)
+    """
+    processes = [process_memory(master_pid)] + [process_memory(p) for p in child_pids(master_pid)]
+    return {
+        'master': processes[0],
+        'workers': processes[1:],
+        'total_pss_mb': round(sum(p.get('pss_mb', 0.0) for p in processes), 1),
+        'total_rss_mb': round(sum(p.get('rss_mb', 0.0) for p in processes), 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report master and worker memory from /proc')
+    parser.add_argument('pid', type=int, help='master process ID')
+    args = parser.parse_args()
+
+    report = worker_memory_report(args.pid)
+    print(f"{'pid':>8} {'rss_mb':>9} {'pss_mb':>9} {'shared_mb':>10} {'private_mb':>11}")
+    for label, p in [('master', report['master'])] + [('worker', w) for w in report['workers']]:
+        print(f"{p['pid']:>8} {p.get('rss_mb', '-'):>9} {p.get('pss_mb', '-'):>9} "
+              f"{p.get('shared_mb', '-'):>10} {p.get('private_mb', '-'):>11}  {label}")
+    print(f"Total PSS {report['total_pss_mb']} MB (RSS sum {report['total_rss_mb']} MB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,832 @@
+from datetime import datetime
+from pathlib import Path
+import json
+import os
+import threading
+import uuid
+import pandas as pd
+import numpy as np
+try:
+    import pickle
+except ImportError:
+    pickle = None
+try:
+    import joblib
+except ImportError:
+    joblib = None
+from services.fingerprint import file_digest, frame_digest, run_hash
+from services.series_store import SeriesStore, DEFAULT_SERIES_ID
+from services.thread_budget import configure_tensorflow
+from services.exog_features import ExogFeatureCache, future_exog, scenario_assumptions
+from services.data_quality import screen_upload
+from models.sarima_model import SARIMAForecastCache
+
+# Supported forecast models
+MODEL_TYPES = ['lstm', 'sarima']
+
+# Horizon precomputed by the cached SARIMA forecast path
+SARIMA_MAX_HORIZON = int(os.getenv('SARIMA_MAX_HORIZON', 120))
+
+# Seed for mock data so demo responses (and their content hashes) are reproducible
+MOCK_DATA_SEED = int(os.getenv('MOCK_DATA_SEED', 42))
+
+# Sequences per LSTM predict call when forecasting many series at once
+LSTM_BATCH_SIZE = int(os.getenv('LSTM_BATCH_SIZE', 1024))
+
+# Serve the series store from memory-mapped files so forked workers share its pages
+SERIES_STORE_MMAP = os.getenv('SERIES_STORE_MMAP', 'false').lower() in ('1', 'true', 'yes')
+
+# Seconds between each worker's checks for models published by another worker
+PUBLISH_POLL_SECONDS = float(os.getenv('PUBLISH_POLL_SECONDS', 5))
+
+
+# Model and Data Loader Class
+class ModelDataLoader:
+    def __init__(self, defer_lstm=False):
+        """
+        Args:
+            defer_lstm: Skip loading the LSTM until :meth:`load_lstm` is called
+                (TensorFlow must not be initialized before a fork)
+        """
+        self.defer_lstm = defer_lstm
+        self.base_path = Path(__file__).resolve().parent.parent
+        self.model_path = self.base_path / 'model'
+        # Read at construction, so a reload after a model publish keeps them
+        self.data_path = Path(os.getenv('GROWTHIQ_DATA_PATH', self.base_path / 'data'))
+        self.output_path = Path(os.getenv('GROWTHIQ_OUTPUT_PATH', self.base_path / 'output'))
+
+        # Ensure directories exist
+        self.model_path.mkdir(exist_ok=True)
+        self.data_path.mkdir(exist_ok=True)
+        self.output_path.mkdir(exist_ok=True)
+
+        self.lstm_model = None
+        self.sarima_model = None
+        self.sarima_cache = None
+        self.sarima_file = None
+        self.scaler = None
+        self.fred_data = None
+        self.data_quality = None
+        self.hierarchy_data = None
+        self.series_store = None
+        self.model_metrics = None
+        self.scenario_inputs = None
+        self.exog_features = None
+        self.exog_scenarios = scenario_assumptions()
+        self.model_versions = {}
+        self.data_fingerprint = None
+        self._backtest_cache = {}
+        self._historical_columns = None
+
+        self._load_models_and_data()
+
+    def _load_models_and_data(self):
+        """Load pre-trained models and data files"""
+        try:
+            # Load LSTM model
+            if not self.defer_lstm:
+                self._load_lstm_model()
+
+            # Load SARIMA model: the slim artifact when present, else the pickled results
+            artifact_path = self.model_path / 'sarima_model.npz'
+            sarima_path = self.model_path / 'sarima_model.pkl'
+            if artifact_path.exists():
+                try:
+                    self.sarima_cache = SARIMAForecastCache.load(artifact_path, SARIMA_MAX_HORIZON)
+                    self.sarima_file = artifact_path
+                    print(f"✅ SARIMA artifact loaded ({SARIMA_MAX_HORIZON} steps cached)")
+                except Exception as e:
+                    print(f"❌ Failed to load SARIMA artifact: {e}")
+                    self.sarima_cache = None
+            if self.sarima_cache is None and sarima_path.exists():
+                try:
+                    # First attempt with joblib
+                    try:
+                        self.sarima_model = joblib.load(sarima_path)
+                        print("✅ SARIMA model loaded successfully (joblib)")
+                    except Exception as joblib_err:
+                        print(f"⚠️ joblib failed, trying pickle: {joblib_err}")
+                        # Fallback to pickle
+                        with open(sarima_path, 'rb') as f:
+                            self.sarima_model = pickle.load(f)
+                        print("✅ SARIMA model loaded successfully (pickle)")
+                    # Mean/variance paths computed once for all horizons
+                    try:
+                        self.sarima_cache = SARIMAForecastCache.from_results(self.sarima_model, SARIMA_MAX_HORIZON)
+                        print(f"✅ SARIMA forecast cache built ({SARIMA_MAX_HORIZON} steps)")
+                    except Exception as cache_err:
+                        print(f"⚠️ SARIMA forecast cache unavailable: {cache_err}")
+                    self.sarima_file = sarima_path
+                except Exception as e:
+                    print(f"❌ Failed to load SARIMA model: {e}")
+                    self.sarima_model = None
+            elif self.sarima_cache is None:
+                print("⚠️ SARIMA model file not found")
+
+            # Load Scaler
+            scaler_path = self.model_path / 'scaler.pkl'
+            if scaler_path.exists():
+                try:
+                    self.scaler = joblib.load(scaler_path)
+                    print("✅ Scaler loaded successfully")
+                except Exception as e:
+                    print(f"❌ Error loading scaler: {e}")
+                    self.scaler = None
+            else:
+                print("⚠️ Scaler file not found")
+
+            # Load additional data files
+            self._load_data_files()
+
+            # Content hashes used to identify identical forecast runs
+            self._compute_fingerprints()
+
+        except Exception as e:
+            print(f"❌ Unexpected error during model/data loading: {e}")
+    
+    def _load_lstm_model(self):
+        """Load the LSTM; TensorFlow is imported here so a preloading master never initializes it"""
+        lstm_path = self.model_path / 'lstm_model.h5'
+        if lstm_path.exists():
+            try:
+                import tensorflow as tf
+                from tensorflow.keras.models import load_model
+                from tensorflow.keras.losses import MeanSquaredError
+
+                configure_tensorflow(tf)
+                self.lstm_model = load_model(str(lstm_path), compile=False)
+                self.lstm_model.compile(loss=MeanSquaredError())
+                print("✅ LSTM model loaded and compiled successfully")
+            except Exception as e:
+                print(f"❌ Error loading LSTM model: {e}")
+                self.lstm_model = None
+        else:
+            print("⚠️ LSTM model file not found")
+
+    def _derived_path(self, name):
+        """A data file, or its copy rebuilt under output/ by services.artifact_graph if there is one"""
+        derived = self.output_path / name
+        return derived if derived.exists() else self.data_path / name
+
+    def load_lstm(self):
+        """Load a deferred LSTM model (e.g. in a worker after fork) and refresh fingerprints"""
+        self._load_lstm_model()
+        self.defer_lstm = False
+        self._compute_fingerprints()
+
+    def reload(self):
+        """Reload models and data files (e.g. after a model publish)
+
+        A fresh loader is built first and its state swapped in afterwards, so
+        requests keep using the old models until the new ones are ready.
+        """
+        fresh = ModelDataLoader(defer_lstm=self.defer_lstm)
+        self.__dict__.update(fresh.__dict__)
+
+    def _load_data_files(self):
+        """Load CSV data files"""
+        try:
+            # Load FRED series data
+            fred_path = self.data_path / 'fred_series.csv'
+            if fred_path.exists():
+                self.fred_data = pd.read_csv(fred_path)
+                self.data_quality = screen_upload(self.fred_data, self.output_path / 'quality' / 'fred_series_flags.csv')
+                # Pre-parsed dates and float32 values for request-path reads
+                self.series_store = SeriesStore.from_frame(self.fred_data)
+                if SERIES_STORE_MMAP:
+                    # One directory per data version, so files other workers
+                    # have mapped are never rewritten under them
+                    store_root = self.output_path / 'series_store'
+                    store_dir = self.series_store.publish(store_root, frame_digest(self.fred_data)[:16])
+                    self.series_store = SeriesStore.open(store_dir, mmap=True)
+                    SeriesStore.prune(store_root, keep=store_dir.name)
+                print("✅ FRED data loaded successfully")
+            
+            # Load revenue by hierarchy node (long layout: level columns, Date, Revenue)
+            hierarchy_path = self.data_path / 'revenue_hierarchy.csv'
+            if hierarchy_path.exists():
+                self.hierarchy_data = pd.read_csv(hierarchy_path)
+                print("✅ Hierarchy data loaded successfully")
+            
+            # Load model metrics (the copy rebuilt with backtest RMSE if there is one)
+            metrics_path = self._derived_path('model_metrics.csv')
+            if metrics_path.exists():
+                self.model_metrics = pd.read_csv(metrics_path)
+                print("✅ Model metrics loaded successfully")
+            
+            # Load scenario inputs (the rebuilt copy if there is one)
+            scenario_path = self._derived_path('scenario_inputs.csv')
+            if scenario_path.exists():
+                self.scenario_inputs = pd.read_csv(scenario_path)
+                print("✅ Scenario inputs loaded successfully")
+            
+            # SARIMAX regressors (aligned monthly FRED features) and their scenario paths
+            self.exog_features = ExogFeatureCache(self.output_path / 'exog_features.csv')
+            exog_scenario_path = self.data_path / 'exog_scenarios.csv'
+            if exog_scenario_path.exists():
+                self.exog_scenarios = scenario_assumptions(pd.read_csv(exog_scenario_path))
+                print("✅ Exog scenarios loaded successfully")
+                
+        except Exception as e:
+            print(f"Error loading data files: {e}")
+    
+    def _compute_fingerprints(self):
+        """Hash loaded model artifacts and input data"""
+        lstm_version = file_digest(self.model_path / 'lstm_model.h5') if self.lstm_model is not None else None
+        scaler_version = file_digest(self.model_path / 'scaler.pkl') if self.scaler is not None else None
+        sarima_version = file_digest(self.sarima_file) if self.sarima_loaded else None
+
+        self.model_versions = {
+            'lstm': f'{lstm_version[:16]}-{(scaler_version or "none")[:16]}' if lstm_version else 'mock',
+            'sarima': sarima_version[:16] if sarima_version else 'mock'
+        }
+        self.data_fingerprint = frame_digest(self.fred_data)
+
+    def forecast_hash(self, model_type, periods, scenario='base', model_version=None):
+        """
+        Content hash of the forecast a model would produce for a horizon (and exog scenario)
+
+        Args:
+            model_version: Version that produced the forecast; defaults to the
+                loaded model's ('mock' for a mock fallback forecast)
+        """
+        if model_version is None:
+            model_version = self.model_versions.get(model_type)
+        data_fingerprint = self.data_fingerprint
+        if model_version != 'mock' and model_type == 'sarima' and self.sarima_exog_names():
+            exog_fingerprint = self.exog_features.fingerprint if self.exog_features is not None else None
+            data_fingerprint = f'{data_fingerprint}|exog:{exog_fingerprint}|{scenario}'
+        return run_hash(model_type, model_version, data_fingerprint, periods)
+
+    @property
+    def sarima_loaded(self):
+        """Whether a SARIMA model is available (slim artifact or pickled results)"""
+        return self.sarima_cache is not None or self.sarima_model is not None
+
+    def sarima_exog_names(self):
+        """Exogenous regressors of the loaded SARIMA model (empty without any)"""
+        if self.sarima_cache is not None:
+            return self.sarima_cache.exog_names
+        model = getattr(self.sarima_model, 'model', None)
+        return list(model.exog_names) if getattr(model, 'k_exog', 0) else []
+
+    def update_exog(self, observations):
+        """
+        Realign SARIMAX regressors from new FRED observations
+
+        Args:
+            observations: Date-indexed series by FREDDataService indicator name
+
+        Returns:
+            True if the aligned matrix changed
+        """
+        if self.exog_features is None:
+            return False
+        previous = self.exog_features.fingerprint
+        self.exog_features.matrix(observations)
+        return self.exog_features.fingerprint != previous
+
+    def _sarima_exog(self, future_dates, scenario='base'):
+        """Future regressor values for a SARIMAX forecast, or None without regressors"""
+        names = self.sarima_exog_names()
+        if not names:
+            return None
+        if self.exog_features is None or self.exog_features.current is None:
+            raise ValueError("SARIMA model needs exogenous features, none are loaded")
+        if scenario not in self.exog_scenarios:
+            raise ValueError(f"Unknown exog scenario: {scenario}")
+        return future_exog(self.exog_features.current[names], future_dates, self.exog_scenarios[scenario])
+
+    def generate_forecast(self, model_type='lstm', periods=12, confidence=0.95, scenario='base'):
+        """Generate forecast using pre-trained models (scenario: exog path for a SARIMAX model)"""
+        return self.generate_forecast_with_version(model_type, periods, confidence, scenario)[0]
+
+    def generate_forecast_with_version(self, model_type='lstm', periods=12, confidence=0.95, scenario='base'):
+        """
+        Generate a forecast and report the model version that produced it
+
+        Returns:
+            Tuple of (forecast records, model version); the version is 'mock'
+            whenever mock data was returned, including after a model failure
+        """
+        try:
+            if model_type == 'lstm' and self.lstm_model is not None:
+                return self._format_forecast(self._lstm_forecast(periods)), self.model_versions.get('lstm')
+            elif model_type == 'sarima' and self.sarima_loaded:
+                forecast_df = self._sarima_forecast(periods, alpha=1 - confidence, scenario=scenario)
+                return self._format_forecast(forecast_df), self.model_versions.get('sarima')
+            else:
+                # Fallback to mock data if models not available
+                return self._generate_mock_forecast(model_type, periods), 'mock'
+                
+        except Exception as e:
+            print(f"Error generating forecast: {e}")
+            return self._generate_mock_forecast(model_type, periods), 'mock'
+
+    def iter_forecast(self, model_type='lstm', periods=12, confidence=0.95, block_size=1, state=None,
+                      scenario='base'):
+        """
+        Yield forecast records in blocks as they are computed
+
+        The LSTM forecast is produced step by step, so its first block is
+        available after ``block_size`` model steps. SARIMA and mock forecasts
+        are computed at once and then split. Concatenated blocks equal the
+        output of :meth:`generate_forecast`.
+
+        Args:
+            model_type: 'lstm' or 'sarima'
+            periods: Forecast horizon in months
+            confidence: Confidence level for SARIMA bounds
+            block_size: Months per yielded block
+            state: Optional dict whose ``model_version`` is set to the version
+                that produced the blocks ('mock' after a fallback)
+            scenario: Exog scenario path for a SARIMAX model
+
+        Yields:
+            Lists of forecast records
+        """
+        if state is None:
+            state = {}
+        emitted = False
+        try:
+            if model_type == 'lstm' and self.lstm_model is not None and self.scaler is not None \
+                    and self.series_store is not None:
+                state['model_version'] = self.model_versions.get('lstm')
+                for block in self._iter_lstm_forecast(periods, block_size):
+                    emitted = True
+                    yield self._format_forecast(block)
+                return
+            forecasts, state['model_version'] = self.generate_forecast_with_version(
+                model_type, periods, confidence, scenario
+            )
+        except Exception as e:
+            # Records already sent cannot be replaced with the fallback
+            if emitted:
+                raise
+            print(f"Error generating forecast: {e}")
+            forecasts = self._generate_mock_forecast(model_type, periods)
+            state['model_version'] = 'mock'
+
+        for start in range(0, len(forecasts), block_size):
+            yield forecasts[start:start + block_size]
+
+    def _lstm_forecast(self, periods):
+        """Generate LSTM forecast using pre-trained model"""
+        if self.lstm_model is None or self.scaler is None or self.series_store is None:
+            print("❌ Required components not loaded for LSTM forecast")
+            return None
+
+        try:
+            return pd.concat(list(self._iter_lstm_forecast(periods, periods)), ignore_index=True)
+        except Exception as e:
+            print(f"❌ LSTM forecast error: {e}")
+            return None
+
+    def _iter_lstm_forecast(self, periods, block_size):
+        """Run the LSTM step by step, yielding a forecast DataFrame every ``block_size`` steps"""
+        # Step 1: Get the last N steps of historical data (zero-copy view)
+        last_n = self.lstm_lookback()  # number of time steps used in training
+        dates, last_values = self.series_store.window(DEFAULT_SERIES_ID, last_n)
+
+        # Step 2: Scale data
+        scaled_values = self.scaler.transform(last_values.reshape(-1, 1))
+
+        last_date = pd.Timestamp(dates[-1])
+        future_dates = pd.date_range(start=last_date + pd.DateOffset(months=1), periods=periods, freq='MS')
+
+        # Step 3: Predict iteratively
+        block = []
+        input_seq = scaled_values.reshape(1, last_n, 1)
+        for step in range(periods):
+            next_pred = self.lstm_model.predict(input_seq, verbose=0)
+            block.append(next_pred[0, 0])
+            # Append prediction and slide window
+            input_seq = np.append(input_seq[:, 1:, :], [[[next_pred[0, 0]]]], axis=1)
+
+            if len(block) == block_size or step == periods - 1:
+                # Step 4: Inverse transform the completed block
+                values = self.scaler.inverse_transform(np.array(block).reshape(-1, 1)).flatten()
+                yield pd.DataFrame({
+                    'Date': future_dates[step + 1 - len(block):step + 1],
+                    'Forecast': values
+                })
+                block = []
+
+    def forecast_many(self, model_type, values, periods):
+        """
+        Forecast many series in one batch with a loaded model
+
+        Args:
+            model_type: 'lstm' or 'sarima'
+            values: 2-D array (series x months) of complete monthly histories
+            periods: Forecast horizon in months
+
+        Returns:
+            Tuple of (mean (series x periods), one-step error variance per series),
+            or None if the model is not loaded or fails
+        """
+        try:
+            if model_type == 'lstm' and self.lstm_model is not None and self.scaler is not None:
+                return self._lstm_forecast_many(values, periods)
+            if model_type == 'sarima' and self.sarima_cache is not None and self.sarima_cache.exog_params is None:
+                return self.sarima_cache.forecast_many(values, periods)
+        except Exception as e:
+            print(f"⚠️ Batch {model_type} forecast failed: {e}")
+        return None
+
+    def _lstm_forecast_many(self, values, periods, window=12):
+        """
+        Run the LSTM for all series at once, one batched predict per step
+
+        The scaler was fit on the revenue series, so each series is rescaled to
+        the revenue level (by the mean of its last window) before scaling and
+        back afterwards.
+        """
+        last_n = self.lstm_lookback()
+        Y = np.asarray(values, dtype=float)
+        n_series = len(Y)
+
+        if self.series_store is not None:
+            reference_level = float(np.mean(self.series_store.window(DEFAULT_SERIES_ID, last_n)[1]))
+        else:
+            reference_level = float(self.scaler.inverse_transform([[0.5]])[0, 0])
+        level = np.abs(Y[:, -last_n:]).mean(axis=1)
+        factor = np.divide(reference_level, level, out=np.ones_like(level), where=level > 0)[:, None]
+        scaled = self.scaler.transform((Y * factor).reshape(-1, 1)).reshape(Y.shape)
+
+        def unscale(predictions, shape):
+            return self.scaler.inverse_transform(predictions.reshape(-1, 1)).reshape(shape) / factor
+
+        # One-step errors over the last `window` months, in one batched predict
+        n_errors = min(window, Y.shape[1] - last_n)
+        residual_var = np.ones(n_series)
+        if n_errors > 0:
+            windows = np.lib.stride_tricks.sliding_window_view(scaled[:, :-1], last_n, axis=1)[:, -n_errors:]
+            predictions = self.lstm_model.predict(windows.reshape(-1, last_n, 1), batch_size=LSTM_BATCH_SIZE, verbose=0)
+            residual_var = np.mean((unscale(predictions, (n_series, n_errors)) - Y[:, -n_errors:]) ** 2, axis=1)
+
+        # Recursive forecast, all series advanced together
+        input_seq = scaled[:, -last_n:, np.newaxis]
+        steps = np.empty((n_series, periods))
+        for step in range(periods):
+            next_pred = self.lstm_model.predict(input_seq, batch_size=LSTM_BATCH_SIZE, verbose=0)[:, 0]
+            steps[:, step] = next_pred
+            input_seq = np.concatenate([input_seq[:, 1:, :], next_pred[:, np.newaxis, np.newaxis]], axis=1)
+
+        return unscale(steps, (n_series, periods)), residual_var
+
+    def lstm_lookback(self):
+        """Input window length of the loaded LSTM (searched models may not use 12)"""
+        shape = getattr(self.lstm_model, 'input_shape', None)
+        return shape[1] if shape and shape[1] else 12
+
+    def _sarima_forecast(self, periods, alpha=0.05, scenario='base'):
+        """Generate SARIMA forecast using pre-trained model"""
+        if not self.sarima_loaded or self.series_store is None:
+            print("❌ SARIMA model or data not loaded")
+            return None
+
+        try:
+            # Step 1: Generate future dates (and regressor values for a SARIMAX model)
+            last_date = pd.Timestamp(self.series_store.last_date(DEFAULT_SERIES_ID))
+            future_dates = pd.date_range(start=last_date + pd.DateOffset(months=1), periods=periods, freq='MS')
+            exog = self._sarima_exog(future_dates, scenario)
+
+            # Step 2: Forecast future periods with confidence bounds
+            if self.sarima_cache is not None:
+                forecast_values, lower, upper = self.sarima_cache.forecast(periods, alpha, exog)
+            else:
+                prediction = self.sarima_model.get_forecast(steps=periods, exog=exog)
+                confidence_int = prediction.conf_int(alpha=alpha)
+                forecast_values = np.asarray(prediction.predicted_mean)
+                lower = confidence_int.iloc[:, 0].to_numpy()
+                upper = confidence_int.iloc[:, 1].to_numpy()
+
+            # Step 3: Format result as DataFrame
+            forecast_df = pd.DataFrame({
+                'Date': future_dates,
+                'Forecast': forecast_values,
+                'Lower': lower,
+                'Upper': upper
+            })
+
+            return forecast_df
+
+        except Exception as e:
+            print(f"❌ SARIMA forecast error: {e}")
+            return None
+
+    def backtest_errors(self, window=12):
+        """One-step-ahead RMSE of each model over the most recent months
+
+        Cached per input data fingerprint, so it is computed once per dataset.
+        """
+        key = (self.data_fingerprint, self.model_versions.get('lstm'), self.model_versions.get('sarima'), window)
+        if key not in self._backtest_cache:
+            self._backtest_cache = {key: {
+                'lstm': self._lstm_backtest_error(window),
+                'sarima': self._sarima_backtest_error(window)
+            }}
+        return self._backtest_cache[key]
+
+    def _lstm_backtest_error(self, window):
+        """RMSE of one batched LSTM prediction over the last `window` months"""
+        if self.lstm_model is None or self.scaler is None or self.series_store is None:
+            return None
+
+        try:
+            last_n = self.lstm_lookback()  # number of time steps used in training
+            _, values = self.series_store.window(DEFAULT_SERIES_ID, window + last_n)
+            if len(values) < window + last_n:
+                return None
+
+            scaled = self.scaler.transform(values.reshape(-1, 1)).ravel()
+            windows = np.lib.stride_tricks.sliding_window_view(scaled[:-1], last_n)
+            predictions = self.lstm_model.predict(windows[..., np.newaxis], verbose=0)
+            predictions = self.scaler.inverse_transform(predictions.reshape(-1, 1)).ravel()
+
+            actual = values[last_n:].astype(float)
+            return float(np.sqrt(np.mean((predictions - actual) ** 2)))
+        except Exception as e:
+            print(f"⚠️ LSTM backtest failed: {e}")
+            return None
+
+    def _sarima_backtest_error(self, window):
+        """RMSE of SARIMA one-step-ahead in-sample predictions over the last `window` months"""
+        try:
+            if self.sarima_cache is not None and self.sarima_cache.recent_fitted is not None:
+                fitted = self.sarima_cache.recent_fitted[-window:]
+                actual = self.sarima_cache.recent_actual[-window:]
+            elif self.sarima_model is not None:
+                fitted = np.asarray(self.sarima_model.fittedvalues, dtype=float)[-window:]
+                actual = np.asarray(self.sarima_model.model.endog, dtype=float).ravel()[-window:]
+            else:
+                return None
+            return float(np.sqrt(np.mean((fitted - actual) ** 2)))
+        except Exception as e:
+            print(f"⚠️ SARIMA backtest failed: {e}")
+            return None
+
+    def _format_forecast(self, forecast_df):
+        """Convert a model forecast DataFrame into forecast records"""
+        if forecast_df is None:
+            return None
+
+        dates = forecast_df['Date'].dt.strftime('%Y-%m-%d')
+        values = forecast_df['Forecast'].to_numpy(dtype=float).tolist()
+
+        records = [
+            {
+                'date': date,
+                'forecasted_revenue': round(value),
+                'growth_5': round(value * 1.05),
+                'growth_10': round(value * 1.10),
+                'decline_5': round(value * 0.95),
+            }
+            for date, value in zip(dates, values)
+        ]
+
+        # Confidence bounds, when the model provides them
+        if 'Lower' in forecast_df.columns:
+            bounds = zip(forecast_df['Lower'].to_numpy(dtype=float).tolist(),
+                         forecast_df['Upper'].to_numpy(dtype=float).tolist())
+            for record, (lower, upper) in zip(records, bounds):
+                record['lower_bound'] = round(lower)
+                record['upper_bound'] = round(upper)
+
+        return records
+
+    def _generate_mock_forecast(self, model_type, periods):
+        """Generate mock forecast data for demonstration (seeded, reproducible)
+
+        Months follow the last month of the history, like model forecasts, so
+        the result depends only on the data (and so matches its content hash).
+        """
+        base_revenue = 1000000
+        rng = np.random.default_rng(MOCK_DATA_SEED)
+        i = np.arange(periods)
+        
+        # Different patterns for different models
+        if model_type == 'lstm':
+            trend = 0.02 * i
+            seasonal = np.sin((i * np.pi) / 6) * 0.08
+            noise = rng.normal(0, 0.015, size=periods)
+        else:  # sarima
+            trend = 0.015 * i
+            seasonal = np.sin((i * np.pi) / 6) * 0.1
+            noise = rng.normal(0, 0.02, size=periods)
+        
+        base_projection = (base_revenue * (1 + trend + seasonal + noise)).tolist()
+        last_date = self._last_history_date()
+        future_dates = pd.date_range(start=last_date + pd.DateOffset(months=1), periods=periods, freq='MS')
+        
+        return [
+            {
+                'date': date,
+                'forecasted_revenue': round(value),
+                'growth_5': round(value * 1.05),
+                'growth_10': round(value * 1.10),
+                'decline_5': round(value * 0.95),
+            }
+            for date, value in zip(future_dates.strftime('%Y-%m-%d'), base_projection)
+        ]
+
+    def _last_history_date(self):
+        """Last month of the revenue history (of the mock history without data)"""
+        if self.series_store is not None:
+            return pd.Timestamp(self.series_store.last_date(DEFAULT_SERIES_ID))
+        return pd.Timestamp(self._mock_historical_columns()['date'][-1])
+    
+    def get_model_metrics(self):
+        """Get model performance metrics"""
+        if self.model_metrics is not None:
+            # Blank cells (e.g. no backtest RMSE for a model that is not loaded) as null
+            metrics = self.model_metrics.astype(object)
+            return metrics.where(metrics.notna(), None).to_dict('records')
+        
+        # Mock metrics if file not available
+        return [
+            {
+                'model_type': 'lstm',
+                'rmse': 111.6,
+                'mae': 8.2,
+                'mse': 12450,
+                'accuracy': 0.874
+            },
+            {
+                'model_type': 'sarima',
+                'rmse': 114.9,
+                'mae': 9.1,
+                'mse': 13200,
+                'accuracy': 0.852
+            }
+        ]
+    
+    def get_historical_data(self):
+        """Get historical FRED data"""
+        if self.fred_data is not None:
+            return self.fred_data.to_dict('records')
+        
+        # Mock historical data if file not available
+        columns = self._mock_historical_columns()
+        return [
+            {'date': date, 'revenue': round(value)}
+            for date, value in zip(np.datetime_as_string(columns['date'], unit='D').tolist(),
+                                   columns['revenue'].tolist())
+        ]
+
+    def historical_columns(self):
+        """
+        Historical data as column arrays (same keys as :meth:`get_historical_data`)
+
+        Built once per load, without per-row objects, for columnar responses.
+
+        Returns:
+            Dict of column name -> NumPy array; dates are datetime64[D]
+        """
+        if self._historical_columns is None:
+            if self.fred_data is None:
+                self._historical_columns = self._mock_historical_columns()
+            else:
+                columns = {}
+                for name in self.fred_data.columns:
+                    values = self.fred_data[name]
+                    if name == 'Date':
+                        columns[name] = pd.to_datetime(values).to_numpy(dtype='datetime64[D]')
+                    else:
+                        columns[name] = values.to_numpy()
+                self._historical_columns = columns
+        return self._historical_columns
+
+    def _mock_historical_columns(self):
+        """Mock monthly revenue history (seeded, reproducible)"""
+        dates = pd.date_range(start='2020-01-01', end='2023-12-01', freq='MS')
+        base_revenue = 950000
+        rng = np.random.default_rng(MOCK_DATA_SEED)
+        i = np.arange(len(dates))
+        
+        trend = 0.01 * i
+        seasonal = np.sin((i * np.pi) / 6) * 0.1
+        noise = rng.normal(0, 0.05, size=len(dates))
+        revenue = base_revenue * (1 + trend + seasonal + noise)
+        
+        return {
+            'date': dates.to_numpy(dtype='datetime64[D]'),
+            'revenue': np.round(revenue)
+        }
+    
+    def get_scenario_data(self):
+        """Get scenario planning data"""
+        if self.scenario_inputs is not None:
+            return self.scenario_inputs.to_dict('records')
+        
+        # Mock scenario data
+        return [
+            {'scenario': 'base', 'growth_rate': 0.0, 'description': 'Current trajectory'},
+            {'scenario': 'optimistic_5', 'growth_rate': 0.05, 'description': '5% growth scenario'},
+            {'scenario': 'optimistic_10', 'growth_rate': 0.10, 'description': '10% growth scenario'},
+            {'scenario': 'pessimistic', 'growth_rate': -0.05, 'description': '5% decline scenario'}
+        ]
+
+
+class ModelPublishWatcher:
+    """Propagates model publishes to every worker process
+
+    ``/api/models/publish`` reaches one gunicorn worker. That worker reloads
+    and writes a new generation to a marker file shared by all workers; a
+    daemon thread in each worker polls the marker and reloads when the
+    generation changes. (A HUP to the gunicorn master would not do: with
+    ``preload_app`` the new workers are forked from the master's old models.)
+    """
+
+    def __init__(self, loader, marker_path, on_reload=None, interval=PUBLISH_POLL_SECONDS):
+        """
+        Args:
+            loader: ModelDataLoader to reload
+            marker_path: Shared JSON marker holding the latest publish generation
+            on_reload: Called with the reason after every reload (e.g. a precompute trigger)
+            interval: Seconds between marker checks
+        """
+        self.loader = loader
+        self.marker_path = Path(marker_path)
+        self.on_reload = on_reload
+        self.interval = interval
+        # Models on disk at startup are current, whatever was published before
+        self.generation = self._read_generation()
+        self.last_reload_at = None
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _read_generation(self):
+        try:
+            with open(self.marker_path) as f:
+                return json.load(f).get('generation')
+        except (OSError, ValueError):
+            return None
+
+    def _reload(self, generation):
+        self.loader.reload()
+        self.generation = generation
+        self.last_reload_at = datetime.utcnow()
+        if self.on_reload is not None:
+            self.on_reload('model_publish')
+
+    def publish(self):
+        """Reload this worker's models, then announce them to the other workers"""
+        with self._lock:
+            generation = uuid.uuid4().hex
+            self._reload(generation)
+            # Per-process temp file: workers may publish concurrently
+            tmp_path = self.marker_path.with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump({
+                    'generation': generation,
+                    'model_versions': self.loader.model_versions,
+                    'published_at': self.last_reload_at.isoformat()
+                }, f)
+            os.replace(tmp_path, self.marker_path)
+
+    def check(self):
+        """
+        Reload if another worker published since this one last loaded
+
+        Returns:
+            True if the models were reloaded
+        """
+        generation = self._read_generation()
+        if generation is None or generation == self.generation:
+            return False
+        with self._lock:
+            if generation == self.generation:
+                return False
+            self._reload(generation)
+        print(f"✅ Reloaded models published by another worker ({generation[:8]})")
+        return True
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"⚠️ Model publish check failed: {e}")
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='model-publish-watch', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self):
+        return {
+            'running': self._thread is not None and self._thread.is_alive(),
+            'generation': self.generation,
+            'last_reload_at': self.last_reload_at.isoformat() if self.last_reload_at else None,
+            'last_error': self.last_error
+        }
@@ -0,0 +1,288 @@
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+try:
+    from pymongo import MongoClient
+except ImportError:
+    MongoClient = None
+
+try:
+    from motor.motor_asyncio import AsyncIOMotorClient
+except ImportError:
+    AsyncIOMotorClient = None
+
+
+class CircuitOpenError(Exception):
+    """Raised when a database call is skipped because the circuit is open"""
+
+
+class CircuitBreaker:
+    """Thread-safe circuit breaker with background recovery probing
+
+    The breaker opens after ``failure_threshold`` consecutive failures. While
+    open, calls are rejected immediately and a daemon thread runs ``probe``
+    every ``probe_interval`` seconds; the first successful probe closes the
+    circuit again. Requests therefore never wait on an unreachable backend.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+
+    def __init__(self, failure_threshold: int = 3, probe_interval: float = 5.0,
+                 probe: Optional[Callable[[], None]] = None):
+        """
+        Initialize circuit breaker
+
+        Args:
+            failure_threshold: Consecutive failures before the circuit opens
+            probe_interval: Seconds between recovery probes while open
+            probe: Callable that raises if the backend is still unavailable
+        """
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self.probe = probe
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._last_error = None
+        self._rejected_calls = 0
+        self._probe_thread = None
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def allow(self) -> bool:
+        """Return True if a call may proceed, counting rejections otherwise"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            self._rejected_calls += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._consecutive_failures = 0
+
+    def record_failure(self, error: Exception):
+        with self._lock:
+            self._consecutive_failures += 1
+            self._last_error = str(error)
+            if self._state == self.CLOSED and self._consecutive_failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        """Open the circuit and start probing (caller holds the lock)"""
+        self._state = self.OPEN
+        self._opened_at = datetime.utcnow()
+        print(f"⚠️ Circuit opened after {self._consecutive_failures} failures: {self._last_error}")
+
+        if self.probe is not None and (self._probe_thread is None or not self._probe_thread.is_alive()):
+            self._probe_thread = threading.Thread(target=self._probe_loop, name='circuit-probe', daemon=True)
+            self._probe_thread.start()
+
+    def _close(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._consecutive_failures = 0
+            self._opened_at = None
+        print("✅ Circuit closed, backend reachable again")
+
+    def _probe_loop(self):
+        while self._state == self.OPEN:
+            time.sleep(self.probe_interval)
+            try:
+                self.probe()
+            except Exception as e:
+                with self._lock:
+                    self._last_error = str(e)
+                continue
+            self._close()
+
+    def call(self, operation: Callable, *args, **kwargs):
+        """
+        Run an operation through the breaker
+
+        Raises:
+            CircuitOpenError: If the circuit is open and the call was skipped
+        """
+        if not self.allow():
+            raise CircuitOpenError('Circuit open, call skipped')
+        try:
+            result = operation(*args, **kwargs)
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        self.record_success()
+        return result
+
+    async def call_async(self, operation: Callable, *args, **kwargs):
+        """
+        Await a coroutine operation through the breaker
+
+        Raises:
+            CircuitOpenError: If the circuit is open and the call was skipped
+        """
+        if not self.allow():
+            raise CircuitOpenError('Circuit open, call skipped')
+        try:
+            result = await operation(*args, **kwargs)
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        self.record_success()
+        return result
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {
+                'state': self._state,
+                'consecutive_failures': self._consecutive_failures,
+                'failure_threshold': self.failure_threshold,
+                'opened_at': self._opened_at.isoformat() if self._opened_at else None,
+                'rejected_calls': self._rejected_calls,
+                'last_error': self._last_error
+            }
+
+
+def pool_settings_from_env() -> Dict:
+    """Connection pool and timeout options shared by the sync and async clients"""
+    return {
+        'maxPoolSize': int(os.environ.get('MONGO_MAX_POOL_SIZE', 50)),
+        'minPoolSize': int(os.environ.get('MONGO_MIN_POOL_SIZE', 0)),
+        'maxIdleTimeMS': int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', 60000)),
+        'waitQueueTimeoutMS': int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', 1000)),
+        'serverSelectionTimeoutMS': int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 2000)),
+        'connectTimeoutMS': int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', 2000)),
+        'socketTimeoutMS': int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', 5000)),
+    }
+
+
+def breaker_from_env() -> CircuitBreaker:
+    return CircuitBreaker(
+        failure_threshold=int(os.environ.get('MONGO_BREAKER_FAILURES', 3)),
+        probe_interval=float(os.environ.get('MONGO_BREAKER_PROBE_SECONDS', 5)),
+    )
+
+
+class MongoPersistence:
+    """MongoDB connection with an explicit pool configuration and circuit breaker
+
+    All database work should go through :meth:`call` so that an outage is
+    detected once and subsequent requests fall back immediately instead of
+    each waiting out the server-selection timeout.
+    """
+
+    def __init__(self, uri: Optional[str] = None, db_name: str = 'growthiq', client=None,
+                 breaker: Optional[CircuitBreaker] = None):
+        """
+        Initialize persistence layer
+
+        Args:
+            uri: MongoDB connection string. If None, will look for MONGO_URI environment variable
+            db_name: Database name
+            client: Pre-built client (e.g. mongomock) used instead of creating one
+            breaker: Circuit breaker; a default one is built from the environment if None
+        """
+        self.uri = uri or os.environ.get('MONGO_URI')
+        self.pool_settings = pool_settings_from_env()
+
+        if client is None:
+            if MongoClient is None:
+                raise ImportError("pymongo is required for MongoDB persistence")
+            client = MongoClient(self.uri, **self.pool_settings)
+
+        self.client = client
+        self.db = client[db_name]
+        self.breaker = breaker or breaker_from_env()
+        if self.breaker.probe is None:
+            self.breaker.probe = self.ping
+
+    @property
+    def available(self) -> bool:
+        return self.breaker.state == CircuitBreaker.CLOSED
+
+    def ping(self):
+        """Round-trip to the server, raising if it is unreachable"""
+        self.db.command('ping')
+
+    def call(self, operation: Callable, *args, **kwargs):
+        """Run a database operation through the circuit breaker"""
+        return self.breaker.call(operation, *args, **kwargs)
+
+    def status(self) -> Dict:
+        return _status(self.breaker, self.pool_settings)
+
+
+class AsyncMongoPersistence:
+    """Async (Motor) counterpart of :class:`MongoPersistence` for the ASGI app
+
+    Uses the same pool settings and breaker configuration. Requests await
+    their database calls on the event loop instead of holding a thread each.
+    Recovery probing runs in the breaker's background thread, which cannot
+    use the loop-bound Motor client, so it pings through a single-connection
+    synchronous client instead.
+    """
+
+    def __init__(self, uri: Optional[str] = None, db_name: str = 'growthiq', client=None,
+                 breaker: Optional[CircuitBreaker] = None):
+        """
+        Args:
+            uri: MongoDB connection string. If None, will look for MONGO_URI environment variable
+            db_name: Database name
+            client: Pre-built Motor client used instead of creating one
+            breaker: Circuit breaker; a default one is built from the environment if None
+        """
+        self.uri = uri or os.environ.get('MONGO_URI')
+        self.pool_settings = pool_settings_from_env()
+
+        if client is None:
+            if AsyncIOMotorClient is None:
+                raise ImportError("motor is required for async MongoDB persistence")
+            client = AsyncIOMotorClient(self.uri, **self.pool_settings)
+
+        self.client = client
+        self.db = client[db_name]
+        self.db_name = db_name
+        self._probe_client = None
+        self.breaker = breaker or breaker_from_env()
+        if self.breaker.probe is None and MongoClient is not None:
+            self.breaker.probe = self._probe
+
+    @property
+    def available(self) -> bool:
+        return self.breaker.state == CircuitBreaker.CLOSED
+
+    def _probe(self):
+        if self._probe_client is None:
+            settings = dict(self.pool_settings, maxPoolSize=1, minPoolSize=0)
+            self._probe_client = MongoClient(self.uri, **settings)
+        self._probe_client[self.db_name].command('ping')
+
+    async def ping(self):
+        """Round-trip to the server, raising if it is unreachable"""
+        await self.db.command('ping')
+
+    async def call(self, operation: Callable, *args, **kwargs):
+        """Await a database coroutine through the circuit breaker"""
+        return await self.breaker.call_async(operation, *args, **kwargs)
+
+    def status(self) -> Dict:
+        return _status(self.breaker, self.pool_settings)
+
+
+def _status(breaker: CircuitBreaker, pool_settings: Dict) -> Dict:
+    return {
+        'circuit': breaker.status(),
+        'pool': {
+            'max_pool_size': pool_settings['maxPoolSize'],
+            'min_pool_size': pool_settings['minPoolSize'],
+            'server_selection_timeout_ms': pool_settings['serverSelectionTimeoutMS'],
+            'socket_timeout_ms': pool_settings['socketTimeoutMS']
+        }
+    }
@@ -0,0 +1,271 @@
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from services.series_store import DEFAULT_SERIES_ID
+
+# Dashboard horizons served from the materialized store
+STANDARD_HORIZONS = tuple(int(h) for h in os.environ.get('PRECOMPUTE_HORIZONS', '12,24,36').split(','))
+
+# Confidence level of materialized forecasts (the /api/forecast default)
+STANDARD_CONFIDENCE = 0.95
+
+
+class MaterializedForecastStore:
+    """Read-optimized store of precomputed forecasts
+
+    Entries are keyed by (model, series, horizon) and held in memory, so a
+    standard dashboard request is a dictionary lookup. Every entry records the
+    content hash it was computed for; a lookup with a different hash (new
+    model version or data) misses, so stale forecasts are never served. The
+    store is snapshotted to a JSON file so a restarted process can serve
+    immediately.
+    """
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path: JSON snapshot file; the store is memory-only if None
+        """
+        self.path = Path(path) if path else None
+        self._entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        snapshot = self._read_snapshot()
+        if snapshot is not None:
+            self._entries = snapshot
+            print(f"✅ Loaded {len(self._entries)} materialized forecasts")
+
+    def _read_snapshot(self) -> Optional[Dict[str, Dict]]:
+        if self.path is None or not self.path.exists():
+            return None
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ Could not read materialized forecasts: {e}")
+            return None
+
+    def reload(self):
+        """Take over the snapshot's entries (another worker may have materialized them)"""
+        snapshot = self._read_snapshot()
+        if snapshot:
+            with self._lock:
+                merged = dict(self._entries)
+                merged.update(snapshot)
+                self._entries = merged
+
+    @staticmethod
+    def key(model_type: str, periods: int, series_id: str = DEFAULT_SERIES_ID) -> str:
+        return f'{model_type}:{series_id}:{periods}'
+
+    def get(self, model_type: str, periods: int, content_hash: str,
+            series_id: str = DEFAULT_SERIES_ID, count: bool = True) -> Optional[Dict]:
+        """
+        Look up a materialized forecast
+
+        Args:
+            model_type: Model that produced the forecast
+            periods: Forecast horizon in months
+            content_hash: Hash the forecast must have been computed for
+            series_id: Series the forecast is for
+            count: Whether the lookup counts towards the hit ratio (False for internal reads)
+
+        Returns:
+            Entry with ``forecasts``, ``run_id`` and ``materialized_at``, or None
+        """
+        entry = self._entries.get(self.key(model_type, periods, series_id))
+        if entry is None or entry['content_hash'] != content_hash:
+            self.misses += count
+            return None
+        self.hits += count
+        return entry
+
+    def content_hash(self, model_type: str, periods: int, series_id: str = DEFAULT_SERIES_ID) -> Optional[str]:
+        entry = self._entries.get(self.key(model_type, periods, series_id))
+        return entry['content_hash'] if entry else None
+
+    def put_many(self, entries: Dict[str, Dict]):
+        """Add entries and rewrite the snapshot"""
+        with self._lock:
+            # Swap in a new dict so readers never see a partial update
+            merged = dict(self._entries)
+            merged.update(entries)
+            self._entries = merged
+
+            if self.path is not None:
+                # Per-process temp file: forked workers may write concurrently
+                tmp_path = self.path.with_suffix(f'.{os.getpid()}.tmp')
+                with open(tmp_path, 'w') as f:
+                    json.dump(merged, f)
+                os.replace(tmp_path, self.path)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0
+        }
+
+
+class ForecastPrecomputer:
+    """Materializes forecasts for every model, series and standard horizon"""
+
+    def __init__(self, loader, store: MaterializedForecastStore, models: Iterable[str],
+                 horizons: Iterable[int] = STANDARD_HORIZONS,
+                 persist: Optional[Callable[[str, int, List[Dict]], Optional[str]]] = None):
+        """
+        Args:
+            loader: ModelDataLoader used to compute forecasts
+            store: Store receiving the materialized forecasts
+            models: Model types to materialize
+            horizons: Forecast horizons in months
+            persist: Optional ``(model_type, periods, forecasts) -> run_id`` storing each run
+        """
+        self.loader = loader
+        self.store = store
+        self.models = list(models)
+        self.horizons = sorted(set(horizons))
+        self.persist = persist
+
+    def materialize(self, series_ids: Iterable[str] = (DEFAULT_SERIES_ID,)) -> int:
+        """
+        Recompute every entry whose content hash changed
+
+        Each model is run once for the longest horizon; shorter horizons are
+        prefixes of it (the forecasts are recursive, so month k does not
+        depend on the horizon).
+
+        Returns:
+            Number of entries written
+        """
+        entries = {}
+        now = datetime.utcnow().isoformat()
+
+        for series_id in series_ids:
+            for model_type in self.models:
+                hashes = {h: self.loader.forecast_hash(model_type, h) for h in self.horizons}
+                stale = [h for h in self.horizons if self.store.content_hash(model_type, h, series_id) != hashes[h]]
+                if not stale:
+                    continue
+
+                forecasts, model_version = self.loader.generate_forecast_with_version(
+                    model_type, max(stale), STANDARD_CONFIDENCE
+                )
+                # A mock fallback for a loaded model is not stored under the
+                # model's hash; the entries stay stale and are retried next run
+                if not forecasts or model_version != self.loader.model_versions.get(model_type):
+                    print(f"⚠️ Precompute failed for {model_type}/{series_id}")
+                    continue
+
+                for periods in stale:
+                    horizon_forecasts = forecasts[:periods]
+                    run_id = self.persist(model_type, periods, horizon_forecasts) if self.persist else None
+                    entries[MaterializedForecastStore.key(model_type, periods, series_id)] = {
+                        'content_hash': hashes[periods],
+                        'forecasts': horizon_forecasts,
+                        'run_id': run_id,
+                        'materialized_at': now
+                    }
+
+        if entries:
+            self.store.put_many(entries)
+        return len(entries)
+
+
+class PrecomputeScheduler:
+    """Daemon thread that rematerializes forecasts when triggered
+
+    Runs once on start, then again whenever :meth:`trigger` is called (after
+    a model publish or an exog update). Triggers arriving during a run are
+    merged into a single follow-up run. With an artifact graph, each run
+    rebuilds the graph's stale artifacts (the materialized forecasts among
+    them) instead.
+    """
+
+    def __init__(self, precomputer: ForecastPrecomputer, graph=None):
+        """
+        Args:
+            precomputer: Forecast materializer
+            graph: Optional ArtifactGraph run in place of ``precomputer.materialize``
+        """
+        self.precomputer = precomputer
+        self.graph = graph
+        self.last_run_at = None
+        self.last_reason = None
+        self.last_written = 0
+        self.last_error = None
+        self._pending_reason = 'startup'
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def trigger(self, reason: str):
+        """Request a rematerialization (returns immediately)"""
+        self._pending_reason = reason
+        self._wake.set()
+
+    def run_once(self, reason: str = 'manual') -> int:
+        """
+        Returns:
+            Forecasts materialized, or artifacts rebuilt with a graph
+        """
+        if self.graph is not None:
+            rebuilt = self.graph.run(reason)
+            written = len(rebuilt)
+        else:
+            written = self.precomputer.materialize()
+        self.last_run_at = datetime.utcnow()
+        self.last_reason = reason
+        self.last_written = written
+        self.last_error = None
+        if self.graph is not None and rebuilt:
+            print(f"✅ Rebuilt {', '.join(rebuilt)} ({reason})")
+        elif written:
+            print(f"✅ Materialized {written} forecast(s) ({reason})")
+        return written
+
+    def _loop(self):
+        self._wake.set()
+        while not self._stop.is_set():
+            self._wake.wait()
+            if self._stop.is_set():
+                break
+            self._wake.clear()
+            try:
+                self.run_once(self._pending_reason)
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"⚠️ Forecast precompute failed: {e}")
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='forecast-precompute', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def status(self) -> Dict:
+        return {
+            'running': self._thread is not None and self._thread.is_alive(),
+            'horizons': self.precomputer.horizons,
+            'last_run_at': self.last_run_at.isoformat() if self.last_run_at else None,
+            'last_reason': self.last_reason,
+            'last_written': self.last_written,
+            'last_error': self.last_error,
+            'store': self.precomputer.store.stats(),
+            'graph': self.graph.status() if self.graph is not None else None
+        }
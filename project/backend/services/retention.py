@@ -0,0 +1,276 @@
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+try:
+    from pymongo import ASCENDING
+    from pymongo.errors import OperationFailure
+except ImportError:
+    ASCENDING = 1
+    OperationFailure = Exception
+
+# Mongo error codes raised when an index exists with different options
+_INDEX_CONFLICT_CODES = (85, 86)
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+class RetentionConfig:
+    """Retention windows for raw forecast history, read from the environment"""
+
+    def __init__(self, forecast_days: Optional[int] = None, run_log_days: Optional[int] = None,
+                 upload_days: Optional[int] = None, rollup_interval_seconds: Optional[int] = None):
+        """
+        Args:
+            forecast_days: Days a run document is kept after it was last accessed
+            run_log_days: Days forecast request log entries are kept
+            upload_days: Days upload records are kept
+            rollup_interval_seconds: Seconds between background rollup passes
+        """
+        self.forecast_days = forecast_days or int(os.environ.get('FORECAST_RETENTION_DAYS', 90))
+        self.run_log_days = run_log_days or int(os.environ.get('FORECAST_RUN_LOG_RETENTION_DAYS', 30))
+        self.upload_days = upload_days or int(os.environ.get('UPLOAD_RETENTION_DAYS', 365))
+        self.rollup_interval_seconds = rollup_interval_seconds or int(
+            os.environ.get('FORECAST_ROLLUP_INTERVAL_SECONDS', 3600)
+        )
+
+        # Rollups cover whole days, so raw data must outlive at least one full day
+        if min(self.forecast_days, self.run_log_days) < 2:
+            raise ValueError("Forecast retention must be at least 2 days so rollups can run before expiry")
+
+    def as_dict(self) -> Dict:
+        return {
+            'forecast_days': self.forecast_days,
+            'run_log_days': self.run_log_days,
+            'upload_days': self.upload_days,
+            'rollup_interval_seconds': self.rollup_interval_seconds
+        }
+
+
+class ForecastRetentionManager:
+    """TTL expiry and daily rollups for forecast history
+
+    Raw run documents in ``forecasts`` expire once they have not been accessed
+    for the retention window, and ``forecast_runs``/``uploads`` expire by age.
+    Before raw data ages out, each completed day is compacted into
+    ``forecast_rollups``: one document per (day, model, target month) with
+    forecast value statistics. Historical analysis reads the rollups instead
+    of scanning raw runs.
+    """
+
+    ROLLUP_STATE_ID = 'forecast_rollups'
+
+    def __init__(self, db, config: Optional[RetentionConfig] = None):
+        """
+        Initialize retention manager
+
+        Args:
+            db: pymongo Database holding the forecast collections
+            config: Retention windows; read from the environment if None
+        """
+        self.db = db
+        self.config = config or RetentionConfig()
+        self.forecasts = db['forecasts']
+        self.rollups = db['forecast_rollups']
+        self.rollup_state = db['rollup_state']
+
+    def _ensure_ttl_index(self, collection: str, field: str, days: int):
+        """Create a TTL index, updating its expiry if it already exists"""
+        expire_after = days * SECONDS_PER_DAY
+        name = f'{field}_ttl'
+        try:
+            self.db[collection].create_index(
+                [(field, ASCENDING)], name=name, expireAfterSeconds=expire_after
+            )
+        except OperationFailure as e:
+            if getattr(e, 'code', None) not in _INDEX_CONFLICT_CODES:
+                raise
+            self.db.command('collMod', collection, index={'name': name, 'expireAfterSeconds': expire_after})
+
+    def ensure_indexes(self):
+        """Create TTL indexes for raw history and the rollup lookup indexes"""
+        self._ensure_ttl_index('forecasts', 'last_accessed_at', self.config.forecast_days)
+        self._ensure_ttl_index('forecast_runs', 'created_at', self.config.run_log_days)
+        self._ensure_ttl_index('uploads', 'created_at', self.config.upload_days)
+
+        self.rollups.create_index(
+            [('model_type', ASCENDING), ('target_date', ASCENDING), ('day', ASCENDING)],
+            name='model_type_target_date_day'
+        )
+        self.rollups.create_index(
+            [('model_type', ASCENDING), ('day', ASCENDING)],
+            name='model_type_day'
+        )
+
+    def rollup_day(self, day: datetime):
+        """
+        Compact all runs created on a given UTC day into forecast_rollups
+
+        Idempotent: re-running a day replaces its rollup documents.
+
+        Args:
+            day: Day to roll up (time component is ignored)
+        """
+        start = datetime(day.year, day.month, day.day)
+        end = start + timedelta(days=1)
+
+        pipeline = [
+            {'$match': {'created_at': {'$gte': start, '$lt': end}}},
+            {'$project': {
+                'model_type': 1,
+                'points': {'$zip': {'inputs': ['$dates', '$forecasted_revenue']}}
+            }},
+            {'$unwind': '$points'},
+            {'$group': {
+                '_id': {
+                    'day': start,
+                    'model_type': '$model_type',
+                    'target_date': {'$arrayElemAt': ['$points', 0]}
+                },
+                'runs': {'$sum': 1},
+                'mean': {'$avg': {'$arrayElemAt': ['$points', 1]}},
+                'min': {'$min': {'$arrayElemAt': ['$points', 1]}},
+                'max': {'$max': {'$arrayElemAt': ['$points', 1]}},
+                'std': {'$stdDevPop': {'$arrayElemAt': ['$points', 1]}}
+            }},
+            {'$project': {
+                'day': '$_id.day',
+                'model_type': '$_id.model_type',
+                'target_date': '$_id.target_date',
+                'runs': 1, 'mean': 1, 'min': 1, 'max': 1, 'std': 1
+            }},
+            {'$merge': {'into': 'forecast_rollups', 'whenMatched': 'replace', 'whenNotMatched': 'insert'}}
+        ]
+        self.forecasts.aggregate(pipeline, allowDiskUse=True)
+
+    def run_pending_rollups(self, now: Optional[datetime] = None) -> int:
+        """
+        Roll up every completed day since the last watermark
+
+        Args:
+            now: Current time (defaults to utcnow)
+
+        Returns:
+            Number of days rolled up
+        """
+        now = now or datetime.utcnow()
+        today = datetime(now.year, now.month, now.day)
+
+        state = self.rollup_state.find_one({'_id': self.ROLLUP_STATE_ID})
+        if state:
+            day = state['last_day'] + timedelta(days=1)
+        else:
+            # Nothing older than the retention window can still be in raw storage
+            day = today - timedelta(days=self.config.forecast_days)
+
+        days_done = 0
+        while day < today:
+            self.rollup_day(day)
+            self.rollup_state.update_one(
+                {'_id': self.ROLLUP_STATE_ID},
+                {'$set': {'last_day': day, 'updated_at': datetime.utcnow()}},
+                upsert=True
+            )
+            day += timedelta(days=1)
+            days_done += 1
+
+        return days_done
+
+    def history(self, model_type: str, start: datetime, end: datetime) -> List[Dict]:
+        """
+        Forecast value statistics per run day and target month from rollups
+
+        Args:
+            model_type: Model to look up
+            start: First run day (inclusive)
+            end: Last run day (exclusive)
+
+        Returns:
+            Rollup rows ordered by day and target month
+        """
+        cursor = self.rollups.find(
+            *history_query(model_type, start, end)
+        ).sort(HISTORY_SORT)
+
+        return [history_row(row) for row in cursor]
+
+
+# Rollup rows ordered by day and target month
+HISTORY_SORT = [('day', ASCENDING), ('target_date', ASCENDING)]
+
+
+def history_query(model_type: str, start: datetime, end: datetime):
+    """Filter and projection for rollup history between two run days"""
+    return {'model_type': model_type, 'day': {'$gte': start, '$lt': end}}, {'_id': 0}
+
+
+def history_row(row: Dict) -> Dict:
+    """JSON-serializable rollup history row"""
+    return {
+        'day': row['day'].strftime('%Y-%m-%d'),
+        'target_date': row['target_date'].strftime('%Y-%m-%d'),
+        'runs': row['runs'],
+        'mean': row['mean'],
+        'min': row['min'],
+        'max': row['max'],
+        'std': row['std']
+    }
+
+
+async def history_async(db, model_type: str, start: datetime, end: datetime) -> List[Dict]:
+    """:meth:`ForecastRetentionManager.history` for a Motor database"""
+    cursor = db['forecast_rollups'].find(*history_query(model_type, start, end)).sort(HISTORY_SORT)
+    return [history_row(row) async for row in cursor]
+
+
+class RollupScheduler:
+    """Daemon thread that periodically runs pending forecast rollups"""
+
+    def __init__(self, manager: ForecastRetentionManager, persistence=None):
+        """
+        Args:
+            manager: Retention manager whose rollups are run
+            persistence: Optional MongoPersistence; calls go through its circuit breaker
+        """
+        self.manager = manager
+        self.persistence = persistence
+        self.last_run_at = None
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self) -> int:
+        if self.persistence is not None:
+            return self.persistence.call(self.manager.run_pending_rollups)
+        return self.manager.run_pending_rollups()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                days = self.run_once()
+                self.last_run_at = datetime.utcnow()
+                self.last_error = None
+                if days:
+                    print(f"✅ Rolled up {days} day(s) of forecast history")
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"⚠️ Forecast rollup failed: {e}")
+            self._stop.wait(self.manager.config.rollup_interval_seconds)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='forecast-rollups', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self) -> Dict:
+        return {
+            'running': self._thread is not None and self._thread.is_alive(),
+            'last_run_at': self.last_run_at.isoformat() if self.last_run_at else None,
+            'last_error': self.last_error,
+            'config': self.manager.config.as_dict()
+        }
@@ -0,0 +1,232 @@
+import argparse
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Series ID used for the single revenue series loaded from fred_series.csv
+DEFAULT_SERIES_ID = 'revenue'
+
+DATE_DTYPE = 'datetime64[D]'
+VALUE_DTYPE = np.float32
+
+
+class SeriesStore:
+    """In-memory store of many time series in contiguous buffers
+
+    All series share two flat arrays: pre-parsed ``datetime64[D]`` dates and
+    ``float32`` values, with a per-series ``(offset, length)`` index. Lookups
+    return read-only NumPy views into those buffers, so taking the last N
+    points of a series never copies or re-parses data. A store can be saved to
+    a directory and reopened memory-mapped, letting many processes share the
+    same pages. Saved files are never rewritten in place: truncating a file
+    another process has mapped kills that process with SIGBUS.
+    """
+
+    def __init__(self, dates: np.ndarray, values: np.ndarray, index: Dict[str, Tuple[int, int]]):
+        """
+        Args:
+            dates: Flat datetime64[D] array for all series
+            values: Flat float32 array aligned with ``dates``
+            index: Mapping of series ID to (offset, length) in the flat arrays
+        """
+        if len(dates) != len(values):
+            raise ValueError("dates and values must have the same length")
+
+        self._dates = dates
+        self._values = values
+        self._index = index
+
+        # Hand out read-only views only
+        for buffer in (self._dates, self._values):
+            if buffer.flags.writeable:
+                buffer.setflags(write=False)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, date_column: str = 'Date', value_column: str = 'Revenue',
+                   series_column: Optional[str] = None,
+                   series_id: str = DEFAULT_SERIES_ID) -> 'SeriesStore':
+        """
+        Build a store from a DataFrame in one vectorized pass
+
+        Args:
+            df: Source frame (wide single series or long multi-series layout)
+            date_column: Column holding dates (strings or datetimes)
+            value_column: Column holding values
+            series_column: Column holding series IDs; if None, the frame is one series
+            series_id: ID used when ``series_column`` is None
+
+        Returns:
+            SeriesStore with each series sorted by date
+        """
+        dates = pd.to_datetime(df[date_column]).to_numpy(dtype='datetime64[ns]').astype(DATE_DTYPE)
+        values = df[value_column].to_numpy(dtype=VALUE_DTYPE)
+
+        if series_column is None:
+            order = np.argsort(dates, kind='stable')
+            return cls(dates[order], values[order], {series_id: (0, len(dates))})
+
+        codes, ids = pd.factorize(df[series_column], sort=True)
+        order = np.lexsort((dates, codes))
+        codes = codes[order]
+        starts = np.searchsorted(codes, np.arange(len(ids)), side='left')
+        ends = np.searchsorted(codes, np.arange(len(ids)), side='right')
+        index = {str(sid): (int(s), int(e - s)) for sid, s, e in zip(ids, starts, ends)}
+
+        return cls(dates[order], values[order], index)
+
+    @classmethod
+    def from_series(cls, series: Dict[str, Tuple[Iterable, Iterable]]) -> 'SeriesStore':
+        """Build a store from ``{series_id: (dates, values)}``"""
+        index, date_parts, value_parts = {}, [], []
+        offset = 0
+        for sid, (dates, values) in series.items():
+            d = np.asarray(pd.to_datetime(list(dates)).to_numpy(dtype='datetime64[ns]'), dtype=DATE_DTYPE)
+            v = np.asarray(values, dtype=VALUE_DTYPE)
+            order = np.argsort(d, kind='stable')
+            date_parts.append(d[order])
+            value_parts.append(v[order])
+            index[str(sid)] = (offset, len(d))
+            offset += len(d)
+
+        return cls(
+            np.concatenate(date_parts) if date_parts else np.empty(0, dtype=DATE_DTYPE),
+            np.concatenate(value_parts) if value_parts else np.empty(0, dtype=VALUE_DTYPE),
+            index
+        )
+
+    def save(self, directory):
+        """Write the store as ``dates.npy``, ``values.npy`` and ``index.json``
+
+        Each file is written under a temporary name and renamed into place, so
+        readers that mapped the previous files keep their (unlinked) pages.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        suffix = f'.{os.getpid()}.tmp'
+
+        tmp_path = directory / f'dates.npy{suffix}'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, self._dates.view('int64'))
+        os.replace(tmp_path, directory / 'dates.npy')
+
+        tmp_path = directory / f'values.npy{suffix}'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, self._values)
+        os.replace(tmp_path, directory / 'values.npy')
+
+        tmp_path = directory / f'index.json{suffix}'
+        with open(tmp_path, 'w') as f:
+            json.dump({sid: list(span) for sid, span in self._index.items()}, f)
+        os.replace(tmp_path, directory / 'index.json')
+
+    def publish(self, root, version: str) -> Path:
+        """
+        Save the store as version ``version`` under ``root`` unless it exists
+
+        A version is written to a temporary directory and renamed into place,
+        so a visible version is always complete and is never rewritten. Every
+        process loading the same data opens the same files and shares their pages.
+
+        Returns:
+            The version directory, to pass to :meth:`open`
+        """
+        root = Path(root)
+        target = root / version
+        if not (target / 'index.json').exists():
+            tmp_dir = root / f'.{version}.{os.getpid()}.tmp'
+            self.save(tmp_dir)
+            try:
+                os.replace(tmp_dir, target)
+            except OSError:
+                # Another process published the same version first
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        return target
+
+    @staticmethod
+    def prune(root, keep: str):
+        """Remove saved versions other than ``keep`` (mapped pages stay valid after unlink)"""
+        root = Path(root)
+        if not root.is_dir():
+            return
+        for path in root.iterdir():
+            if path.is_dir() and path.name != keep and not path.name.startswith('.'):
+                shutil.rmtree(path, ignore_errors=True)
+
+    @classmethod
+    def open(cls, directory, mmap: bool = True) -> 'SeriesStore':
+        """
+        Open a saved store
+
+        Args:
+            directory: Directory written by :meth:`save`
+            mmap: Memory-map the buffers read-only instead of reading them into memory
+        """
+        directory = Path(directory)
+        mode = 'r' if mmap else None
+        dates = np.load(directory / 'dates.npy', mmap_mode=mode).view(DATE_DTYPE)
+        values = np.load(directory / 'values.npy', mmap_mode=mode)
+        with open(directory / 'index.json') as f:
+            index = {sid: tuple(span) for sid, span in json.load(f).items()}
+        return cls(dates, values, index)
+
+    def __contains__(self, series_id: str) -> bool:
+        return series_id in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @property
+    def series_ids(self) -> List[str]:
+        return list(self._index)
+
+    @property
+    def nbytes(self) -> int:
+        return self._dates.nbytes + self._values.nbytes
+
+    def length(self, series_id: str) -> int:
+        return self._index[series_id][1]
+
+    def window(self, series_id: str, n: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Zero-copy view of the last ``n`` points of a series
+
+        Args:
+            series_id: Series to read
+            n: Number of trailing points; the whole series if None
+
+        Returns:
+            Tuple of (dates, values) read-only views
+
+        Raises:
+            KeyError: If the series is not in the store
+        """
+        offset, length = self._index[series_id]
+        start = offset if n is None else offset + max(length - n, 0)
+        end = offset + length
+        return self._dates[start:end], self._values[start:end]
+
+    def last_date(self, series_id: str) -> np.datetime64:
+        offset, length = self._index[series_id]
+        return self._dates[offset + length - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build a memory-mappable series store from a long CSV')
+    parser.add_argument('csv', help='CSV with series_id, Date, Revenue columns')
+    parser.add_argument('out', help='output directory')
+    parser.add_argument('--series-column', default='series_id')
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv)
+    store = SeriesStore.from_frame(df, series_column=args.series_column)
+    store.save(args.out)
+    print(f"✅ Saved {len(store)} series ({store.nbytes / 1e6:.1f} MB) to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
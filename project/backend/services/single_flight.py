@@ -0,0 +1,123 @@
+import asyncio
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Hashable, Optional
+
+
+class SingleFlightTimeout(Exception):
+    """Raised when a coalesced caller gives up waiting for the in-flight call"""
+
+
+class SingleFlight:
+    """Coalesce identical concurrent calls into a single execution
+
+    The first caller for a key runs the function; callers arriving while it is
+    in flight wait on the same future and receive its result (or exception).
+    Nothing is cached: once the call completes the key is released and the
+    next caller executes again. Shared results must be treated as read-only.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._stats = {
+            'calls': 0,
+            'executions': 0,
+            'coalesced': 0,
+            'errors': 0,
+            'timeouts': 0
+        }
+
+    def do(self, key: Hashable, fn: Callable, *args, timeout: Optional[float] = None, **kwargs):
+        """
+        Run ``fn(*args, **kwargs)`` unless an identical call is already in flight
+
+        Args:
+            key: Identity of the call; equal keys are coalesced
+            fn: Function to execute
+            timeout: Seconds a coalesced caller waits before giving up (None waits forever)
+
+        Returns:
+            The function's result, shared with all coalesced callers
+
+        Raises:
+            SingleFlightTimeout: If a coalesced caller timed out waiting
+            Exception: Whatever ``fn`` raised, re-raised in every waiting caller
+        """
+        with self._lock:
+            self._stats['calls'] += 1
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                future.set_running_or_notify_cancel()
+                self._in_flight[key] = future
+                self._stats['executions'] += 1
+            else:
+                self._stats['coalesced'] += 1
+
+        if leader:
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                with self._lock:
+                    self._stats['errors'] += 1
+                    del self._in_flight[key]
+                future.set_exception(e)
+                raise
+            with self._lock:
+                del self._in_flight[key]
+            future.set_result(result)
+            return result
+
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self._stats['timeouts'] += 1
+            raise SingleFlightTimeout(f'Timed out after {timeout}s waiting for in-flight call')
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._in_flight)
+        stats['coalesced_ratio'] = stats['coalesced'] / stats['calls'] if stats['calls'] else 0.0
+        return stats
+
+
+class AsyncSingleFlight(SingleFlight):
+    """:class:`SingleFlight` for coroutines running on one event loop
+
+    The leader awaits ``fn``; followers await a shared asyncio future, so
+    waiting callers hold no threads.
+    """
+
+    async def do(self, key: Hashable, fn: Callable, *args, timeout: Optional[float] = None, **kwargs):
+        """Await ``fn(*args, **kwargs)`` unless an identical call is already in flight"""
+        self._stats['calls'] += 1
+        future = self._in_flight.get(key)
+
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._in_flight[key] = future
+            self._stats['executions'] += 1
+            try:
+                result = await fn(*args, **kwargs)
+            except BaseException as e:
+                self._stats['errors'] += 1
+                del self._in_flight[key]
+                future.set_exception(e)
+                # Followers re-raise it; mark retrieved so a leader-only error is not logged twice
+                future.exception()
+                raise
+            del self._in_flight[key]
+            future.set_result(result)
+            return result
+
+        self._stats['coalesced'] += 1
+        try:
+            # Shield so a follower timing out does not cancel the shared future
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self._stats['timeouts'] += 1
+            raise SingleFlightTimeout(f'Timed out after {timeout}s waiting for in-flight call')
@@ -0,0 +1,65 @@
+import json
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+def sse_event(event: str, data: Dict) -> str:
+    """Encode one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def ndjson_line(event: str, data: Dict) -> str:
+    """Encode one newline-delimited JSON record, tagged with its event type"""
+    return json.dumps({'type': event, **data}) + '\n'
+
+
+# Supported stream formats: name -> (mimetype, encoder)
+STREAM_FORMATS = {
+    'sse': ('text/event-stream', sse_event),
+    'ndjson': ('application/x-ndjson', ndjson_line)
+}
+
+# Headers keeping proxies (e.g. nginx) from buffering the stream
+STREAM_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+
+def forecast_events(meta: Dict, blocks: Iterable[List[Dict]],
+                    on_complete: Optional[Callable[[List[Dict]], Dict]] = None
+                    ) -> Iterator[Tuple[str, Dict]]:
+    """
+    Event sequence for a streamed forecast
+
+    Emits ``meta`` first, then one ``points`` event per block of forecast
+    records, then ``done``. If the forecast fails part-way an ``error`` event
+    ends the stream instead.
+
+    Args:
+        meta: Request details sent before any points (model, periods, ...)
+        blocks: Iterable of forecast record lists, e.g. ``ModelDataLoader.iter_forecast``
+        on_complete: Called with all records once the forecast is complete;
+            its returned dict is merged into the ``done`` event (e.g. run ID)
+
+    Yields:
+        Tuples of (event name, payload)
+    """
+    yield 'meta', meta
+
+    forecasts = []
+    try:
+        for block in blocks:
+            forecasts.extend(block)
+            yield 'points', {'offset': len(forecasts) - len(block), 'forecasts': block}
+    except Exception as e:
+        yield 'error', {'error': str(e)}
+        return
+
+    done = {'count': len(forecasts)}
+    if on_complete is not None:
+        done.update(on_complete(forecasts))
+    yield 'done', done
+
+
+def encode_events(events: Iterable[Tuple[str, Dict]], stream_format: str) -> Iterator[str]:
+    """Encode (event, payload) tuples in the named stream format"""
+    _, encode = STREAM_FORMATS[stream_format]
+    for event, data in events:
+        yield encode(event, data)
@@ -0,0 +1,307 @@
+"""Deterministic synthetic revenue data for scale and load testing
+
+Generates panels of monthly revenue series with controllable trend,
+seasonality, noise, structural breaks and missing months, fully vectorized
+with NumPy. Output can be written in the backend's CSV formats or inserted
+into the MongoDB collections used by the API.
+
+Example:
+    python -m services.synthetic_data --series 10000 --months 180 --out data/synthetic_series.csv
+"""
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class SyntheticPanel:
+    """A block of synthetic monthly series sharing one date index"""
+
+    def __init__(self, series_ids: np.ndarray, dates: np.ndarray, values: np.ndarray):
+        """
+        Args:
+            series_ids: Array of series identifiers, one per row of ``values``
+            dates: datetime64[M] month index, one per column of ``values``
+            values: 2-D array (series x months); NaN marks a missing month
+        """
+        self.series_ids = series_ids
+        self.dates = dates
+        self.values = values
+
+    def __len__(self):
+        return len(self.series_ids)
+
+    def to_fred_frame(self, row: int = 0) -> pd.DataFrame:
+        """Single series in ``fred_series.csv`` layout (Date, Revenue), missing months dropped"""
+        mask = ~np.isnan(self.values[row])
+        return pd.DataFrame({
+            'Date': np.datetime_as_string(self.dates[mask], unit='D'),
+            'Revenue': np.round(self.values[row][mask])
+        })
+
+    def to_long_frame(self) -> pd.DataFrame:
+        """All series in long layout (series_id, Date, Revenue), missing months dropped"""
+        n_series, n_months = self.values.shape
+        flat = self.values.ravel()
+        mask = ~np.isnan(flat)
+        return pd.DataFrame({
+            'series_id': np.repeat(self.series_ids, n_months)[mask],
+            'Date': np.tile(np.datetime_as_string(self.dates, unit='D'), n_series)[mask],
+            'Revenue': np.round(flat[mask])
+        })
+
+
+class SyntheticRevenueGenerator:
+    """Seeded, vectorized generator of monthly revenue series
+
+    Each series is ``level * exp(growth * t) * (1 + seasonality) * (1 + noise)``
+    with an optional permanent level shift at a random month. Per-series
+    parameters are drawn uniformly from the configured ranges. Output is fully
+    determined by ``seed`` and ``chunk_size``.
+    """
+
+    def __init__(self, seed: int = 42, level_range: Tuple[float, float] = (2e5, 2e6),
+                 growth_range: Tuple[float, float] = (-0.002, 0.008),
+                 seasonal_range: Tuple[float, float] = (0.02, 0.12),
+                 noise_range: Tuple[float, float] = (0.005, 0.04),
+                 break_probability: float = 0.1,
+                 break_range: Tuple[float, float] = (-0.25, 0.25),
+                 missing_rate: float = 0.0,
+                 dtype=np.float64):
+        """
+        Args:
+            seed: Root random seed
+            level_range: Starting revenue level
+            growth_range: Monthly log-growth rate
+            seasonal_range: Amplitude of the 12-month seasonal cycle (fraction of level)
+            noise_range: Standard deviation of multiplicative noise
+            break_probability: Share of series with a structural level shift
+            break_range: Relative size of the level shift
+            missing_rate: Probability that any single month is missing (NaN)
+            dtype: Output value dtype (float32 halves memory for large panels)
+        """
+        self.seed = seed
+        self.level_range = level_range
+        self.growth_range = growth_range
+        self.seasonal_range = seasonal_range
+        self.noise_range = noise_range
+        self.break_probability = break_probability
+        self.break_range = break_range
+        self.missing_rate = missing_rate
+        self.dtype = dtype
+
+    def _generate_block(self, rng: np.random.Generator, n_series: int, n_months: int) -> np.ndarray:
+        t = np.arange(n_months, dtype=np.float64)[None, :]
+
+        def draw(bounds):
+            return rng.uniform(bounds[0], bounds[1], size=(n_series, 1))
+
+        level = draw(self.level_range)
+        growth = draw(self.growth_range)
+        amplitude = draw(self.seasonal_range)
+        noise_sd = draw(self.noise_range)
+        phase = rng.integers(0, 12, size=(n_series, 1))
+
+        values = level * np.exp(growth * t)
+        values *= 1 + amplitude * np.sin(2 * np.pi * (t + phase) / 12)
+        values *= 1 + noise_sd * rng.standard_normal((n_series, n_months))
+
+        if self.break_probability > 0:
+            has_break = rng.random((n_series, 1)) < self.break_probability
+            break_at = rng.integers(1, max(n_months, 2), size=(n_series, 1))
+            shift = draw(self.break_range)
+            values *= np.where(has_break & (t >= break_at), 1 + shift, 1.0)
+
+        if self.missing_rate > 0:
+            values[rng.random((n_series, n_months)) < self.missing_rate] = np.nan
+
+        return values.astype(self.dtype, copy=False)
+
+    def iter_panels(self, n_series: int, n_months: int = 180, start: str = '2010-01-01',
+                    chunk_size: int = 10000) -> Iterator[SyntheticPanel]:
+        """
+        Generate series in fixed-size chunks to bound memory
+
+        Args:
+            n_series: Total number of series
+            n_months: Months per series
+            start: First month
+            chunk_size: Series per chunk
+
+        Yields:
+            SyntheticPanel for each chunk
+        """
+        first_month = np.datetime64(start, 'D').astype('datetime64[M]')
+        dates = np.arange(first_month, first_month + n_months)
+
+        for chunk_index, offset in enumerate(range(0, n_series, chunk_size)):
+            size = min(chunk_size, n_series - offset)
+            # Independent stream per chunk, derived from the root seed
+            rng = np.random.default_rng([self.seed, chunk_index])
+            series_ids = np.char.add('series_', np.arange(offset, offset + size).astype(str))
+            yield SyntheticPanel(series_ids, dates, self._generate_block(rng, size, n_months))
+
+    def generate(self, n_series: int, n_months: int = 180, start: str = '2010-01-01',
+                 chunk_size: int = 10000) -> SyntheticPanel:
+        """Generate all series into a single panel"""
+        panels = list(self.iter_panels(n_series, n_months, start, chunk_size))
+        return SyntheticPanel(
+            np.concatenate([p.series_ids for p in panels]),
+            panels[0].dates,
+            np.vstack([p.values for p in panels])
+        )
+
+
+def write_long_csv(generator: SyntheticRevenueGenerator, path, n_series: int, n_months: int = 180,
+                   start: str = '2010-01-01', chunk_size: int = 10000) -> int:
+    """
+    Stream a multi-series panel to CSV (series_id, Date, Revenue) chunk by chunk
+
+    Returns:
+        Number of rows written
+    """
+    rows = 0
+    for i, panel in enumerate(generator.iter_panels(n_series, n_months, start, chunk_size)):
+        frame = panel.to_long_frame()
+        frame.to_csv(path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+        rows += len(frame)
+    return rows
+
+
+def insert_training_data(db, panel: SyntheticPanel, row: int = 0, source: str = 'Synthetic') -> int:
+    """
+    Replace ``training_data`` over the series' date range with one synthetic series
+
+    Returns:
+        Number of documents inserted
+    """
+    frame = panel.to_fred_frame(row)
+    now = datetime.utcnow()
+    documents = [
+        {
+            'date': date.to_pydatetime(),
+            'revenue': float(revenue),
+            'source': source,
+            'is_validated': False,
+            'created_at': now,
+            'updated_at': now
+        }
+        for date, revenue in zip(pd.to_datetime(frame['Date']), frame['Revenue'])
+    ]
+    if documents:
+        db['training_data'].delete_many({
+            'date': {'$gte': documents[0]['date'], '$lte': documents[-1]['date']}
+        })
+        db['training_data'].insert_many(documents, ordered=False)
+    return len(documents)
+
+
+def insert_forecast_runs(db, n_runs: int, periods: int = 12, seed: int = 42,
+                         batch_size: int = 1000, days: int = 30) -> int:
+    """
+    Populate ``forecasts``/``forecast_runs`` with synthetic runs spread over recent days
+
+    Documents use the same layout as ForecastStore so export, history and
+    rollup queries can be measured against realistic collection sizes.
+
+    Returns:
+        Number of runs inserted
+    """
+    from services.forecast_store import ForecastStore, FORECAST_COLUMNS
+
+    rng = np.random.default_rng(seed)
+    start = np.datetime64(datetime.utcnow().strftime('%Y-%m'), 'M') + 1
+    dates = [pd.Timestamp(d).to_pydatetime() for d in np.arange(start, start + periods)]
+    now = datetime.utcnow()
+
+    inserted = 0
+    for offset in range(0, n_runs, batch_size):
+        size = min(batch_size, n_runs - offset)
+        base = rng.uniform(2e5, 2e6, size=(size, 1)) * (1 + 0.01 * np.arange(periods))
+        ages = rng.uniform(0, days * 86400, size=size)
+        models = rng.choice(['lstm', 'sarima'], size=size)
+
+        run_docs, log_docs = [], []
+        for i in range(size):
+            created_at = now - pd.Timedelta(seconds=float(ages[i])).to_pytimedelta()
+            run_id = f'synthetic_{seed}_{offset + i}'
+            document = {
+                '_id': run_id,
+                'content_hash': run_id,
+                'model_type': str(models[i]),
+                'periods': periods,
+                'created_at': created_at,
+                'last_accessed_at': created_at,
+                'access_count': 1,
+                'dates': dates
+            }
+            values = base[i]
+            for column, factor in zip(FORECAST_COLUMNS, (1.0, 1.05, 1.10, 0.95)):
+                document[column] = np.round(values * factor).tolist()
+            run_docs.append(document)
+            log_docs.append({
+                'run_id': run_id,
+                'content_hash': run_id,
+                'model_type': document['model_type'],
+                'periods': periods,
+                'user_id': 'synthetic',
+                'reused': False,
+                'created_at': created_at
+            })
+
+        db['forecasts'].insert_many(run_docs, ordered=False)
+        db['forecast_runs'].insert_many(log_docs, ordered=False)
+        inserted += size
+
+    ForecastStore(db).ensure_indexes()
+    return inserted
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate deterministic synthetic revenue data')
+    parser.add_argument('--series', type=int, default=1000, help='number of series')
+    parser.add_argument('--months', type=int, default=180, help='months per series')
+    parser.add_argument('--start', default='2010-01-01', help='first month')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--missing-rate', type=float, default=0.0)
+    parser.add_argument('--break-probability', type=float, default=0.1)
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--out', help='multi-series CSV output (series_id, Date, Revenue)')
+    parser.add_argument('--fred-csv', help='write the first series in fred_series.csv layout')
+    parser.add_argument('--mongo-runs', type=int, default=0, help='synthetic forecast runs to insert')
+    parser.add_argument('--mongo-training-data', action='store_true',
+                        help='insert the first series into training_data')
+    args = parser.parse_args()
+
+    generator = SyntheticRevenueGenerator(
+        seed=args.seed,
+        break_probability=args.break_probability,
+        missing_rate=args.missing_rate
+    )
+
+    if args.out:
+        rows = write_long_csv(generator, Path(args.out), args.series, args.months, args.start, args.chunk_size)
+        print(f"✅ Wrote {rows} rows for {args.series} series to {args.out}")
+
+    if args.fred_csv or args.mongo_training_data:
+        first = next(generator.iter_panels(1, args.months, args.start, chunk_size=1))
+        if args.fred_csv:
+            first.to_fred_frame().to_csv(args.fred_csv, index=False)
+            print(f"✅ Wrote single series to {args.fred_csv}")
+
+    if args.mongo_runs or args.mongo_training_data:
+        from services.persistence import MongoPersistence
+        db = MongoPersistence().db
+        if args.mongo_training_data:
+            count = insert_training_data(db, first)
+            print(f"✅ Inserted {count} training_data documents")
+        if args.mongo_runs:
+            count = insert_forecast_runs(db, args.mongo_runs, seed=args.seed)
+            print(f"✅ Inserted {count} synthetic forecast runs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,296 @@
+"""CPU thread budget shared by TensorFlow, the BLAS backends and executors
+
+Left alone, TensorFlow's intra/inter-op pools, the BLAS library behind
+NumPy/statsmodels and each thread pool all size themselves to the whole
+machine, once per API worker. The budget splits the available CPUs across
+the workers on the host; within a worker, the forecast executor's threads
+share the worker's budget, so each forecast runs its BLAS/TensorFlow kernels
+on ``threads_per_worker // executor_workers`` threads.
+
+The budget is applied at startup, before NumPy is imported (BLAS reads its
+thread count once, on load). The autotune benchmark measures throughput and
+latency for each worker x thread split of the host:
+
+    python -m services.thread_budget --autotune
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    from threadpoolctl import threadpool_info, threadpool_limits
+except ImportError:
+    threadpool_info = threadpool_limits = None
+
+# Environment variables read by the BLAS/OpenMP runtimes when they load
+BLAS_THREAD_ENV_VARS = (
+    'OMP_NUM_THREADS',
+    'OPENBLAS_NUM_THREADS',
+    'MKL_NUM_THREADS',
+    'VECLIB_MAXIMUM_THREADS',
+    'NUMEXPR_NUM_THREADS'
+)
+
+# Budget applied in this process (None until ThreadBudget.apply)
+_active = None
+
+
+def available_cpus() -> int:
+    """CPUs usable by this process: affinity mask, capped by a cgroup v2 CPU quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    try:
+        quota, period = Path('/sys/fs/cgroup/cpu.max').read_text().split()
+        if quota != 'max':
+            cpus = min(cpus, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def thread_env(threads: int, inter_op_threads: int = 1) -> Dict[str, str]:
+    """Environment capping BLAS/OpenMP and TensorFlow to ``threads`` threads"""
+    env = {var: str(threads) for var in BLAS_THREAD_ENV_VARS}
+    env['TF_NUM_INTRAOP_THREADS'] = str(threads)
+    env['TF_NUM_INTEROP_THREADS'] = str(inter_op_threads)
+    return env
+
+
+class ThreadBudget:
+    """Threads available to one API worker and how they are divided"""
+
+    def __init__(self, cpus: int, workers: int = 1, threads_per_worker: Optional[int] = None,
+                 executor_workers: Optional[int] = None, inter_op_threads: int = 1):
+        """
+        Args:
+            cpus: CPUs on the host (or container)
+            workers: API worker processes sharing those CPUs
+            threads_per_worker: Override of ``cpus // workers``
+            executor_workers: Forecast executor threads; defaults to threads_per_worker,
+                at most 4, so executor x intra-op threads stay within the share
+            inter_op_threads: TensorFlow inter-op threads
+        """
+        self.cpus = cpus
+        self.workers = max(1, workers)
+        self.threads_per_worker = threads_per_worker or max(1, cpus // self.workers)
+        self.executor_workers = executor_workers or max(1, min(4, self.threads_per_worker))
+        self.inter_op_threads = inter_op_threads
+
+    @property
+    def intra_op_threads(self) -> int:
+        """BLAS and TensorFlow intra-op threads per concurrently running forecast"""
+        return max(1, self.threads_per_worker // self.executor_workers)
+
+    @classmethod
+    def from_env(cls) -> 'ThreadBudget':
+        """
+        Budget from the environment
+
+        ``GROWTHIQ_WORKERS`` (set by gunicorn.conf.py) is the number of workers
+        sharing the host; ``THREADS_PER_WORKER``, ``FORECAST_EXECUTOR_WORKERS``
+        and ``TF_INTEROP_THREADS`` override the derived values.
+        """
+        return cls(
+            cpus=available_cpus(),
+            workers=int(os.getenv('GROWTHIQ_WORKERS', 1)),
+            threads_per_worker=int(os.getenv('THREADS_PER_WORKER', 0)) or None,
+            executor_workers=int(os.getenv('FORECAST_EXECUTOR_WORKERS', 0)) or None,
+            inter_op_threads=int(os.getenv('TF_INTEROP_THREADS', 1))
+        )
+
+    def apply(self) -> 'ThreadBudget':
+        """
+        Apply the budget to this process
+
+        Sets the BLAS/OpenMP and TensorFlow thread variables; BLAS libraries
+        already loaded are limited through threadpoolctl, when installed.
+        TensorFlow itself is configured by :func:`configure_tensorflow` when
+        it is imported.
+
+        Returns:
+            self
+        """
+        global _active
+
+        os.environ.update(thread_env(self.intra_op_threads, self.inter_op_threads))
+        if 'numpy' in sys.modules:
+            if threadpool_limits is not None:
+                threadpool_limits(limits=self.intra_op_threads)
+            else:
+                print("⚠️ NumPy loaded before the thread budget; BLAS threads are not capped")
+        if 'tensorflow' in sys.modules:
+            configure_tensorflow(sys.modules['tensorflow'])
+
+        _active = self
+        print(f"✅ Thread budget: {self.threads_per_worker} thread(s) per worker "
+              f"({self.workers} worker(s) on {self.cpus} CPU(s)), "
+              f"{self.executor_workers} executor x {self.intra_op_threads} intra-op")
+        return self
+
+    def to_dict(self) -> Dict:
+        return {
+            'cpus': self.cpus,
+            'workers': self.workers,
+            'threads_per_worker': self.threads_per_worker,
+            'executor_workers': self.executor_workers,
+            'intra_op_threads': self.intra_op_threads,
+            'inter_op_threads': self.inter_op_threads
+        }
+
+
+def active_budget() -> ThreadBudget:
+    """Budget applied in this process (derived from the environment if none was)"""
+    return _active or ThreadBudget.from_env()
+
+
+def configure_tensorflow(tf):
+    """
+    Apply the active budget to TensorFlow's thread pools
+
+    Must run before TensorFlow executes its first op; later calls are ignored
+    by TensorFlow, which is reported rather than raised.
+    """
+    budget = active_budget()
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(budget.intra_op_threads)
+        tf.config.threading.set_inter_op_parallelism_threads(budget.inter_op_threads)
+    except RuntimeError as e:
+        print(f"⚠️ TensorFlow already initialized; thread budget not applied: {e}")
+
+
+def status() -> Dict:
+    """Effective thread settings of this process, for /api/health"""
+    report = {
+        'budget': _active.to_dict() if _active is not None else None,
+        'env': {var: os.environ.get(var) for var in BLAS_THREAD_ENV_VARS}
+    }
+    if threadpool_info is not None:
+        report['blas'] = [
+            {'library': p.get('internal_api'), 'num_threads': p.get('num_threads')}
+            for p in threadpool_info()
+        ]
+    tf = sys.modules.get('tensorflow')
+    if tf is not None:
+        report['tensorflow'] = {
+            'intra_op': tf.config.threading.get_intra_op_parallelism_threads(),
+            'inter_op': tf.config.threading.get_inter_op_parallelism_threads()
+        }
+    return report
+
+
+def _init_benchmark_worker(threads: int):
+    # Spawned process: NumPy has not been imported yet, so the caps take effect
+    os.environ.update(thread_env(threads))
+
+
+def _benchmark_task(size: int, repeats: int) -> float:
+    """One forecast-sized unit of BLAS work; returns its latency in seconds"""
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    a = rng.standard_normal((size, size))
+    started = time.perf_counter()
+    for _ in range(repeats):
+        a = np.tanh(a @ a.T / size)
+    return time.perf_counter() - started
+
+
+def candidate_splits(cpus: int) -> List[Dict]:
+    """Every workers x threads split using all CPUs"""
+    return [
+        {'workers': w, 'threads_per_worker': cpus // w}
+        for w in range(1, cpus + 1) if cpus % w == 0
+    ]
+
+
+def autotune(cpus: Optional[int] = None, tasks_per_worker: int = 8, size: int = 384,
+             repeats: int = 10) -> Dict:
+    """
+    Benchmark each worker x thread split and recommend one
+
+    Every split runs the same total number of tasks, each worker process
+    capped to its share of threads. The recommended split has the lowest
+    p95 latency among those within 5% of the best throughput.
+
+    Args:
+        cpus: CPUs to split; defaults to :func:`available_cpus`
+        tasks_per_worker: Tasks submitted per worker at the largest split
+        size: Matrix size of the benchmark task
+        repeats: Matrix products per task
+
+    Returns:
+        Report with per-split throughput/latency and the recommendation
+    """
+    cpus = cpus or available_cpus()
+    total_tasks = tasks_per_worker * cpus
+    context = multiprocessing.get_context('spawn')
+    results = []
+
+    for split in candidate_splits(cpus):
+        with ProcessPoolExecutor(max_workers=split['workers'], mp_context=context,
+                                 initializer=_init_benchmark_worker,
+                                 initargs=(split['threads_per_worker'],)) as pool:
+            # Warm up every worker (process start and NumPy import)
+            list(pool.map(_benchmark_task, [size] * split['workers'], [1] * split['workers']))
+
+            started = time.perf_counter()
+            latencies = sorted(pool.map(_benchmark_task, [size] * total_tasks, [repeats] * total_tasks))
+            elapsed = time.perf_counter() - started
+
+        result = {
+            **split,
+            'throughput_per_s': round(total_tasks / elapsed, 2),
+            'p50_ms': round(latencies[len(latencies) // 2] * 1000, 1),
+            'p95_ms': round(latencies[min(len(latencies) - 1, math.ceil(0.95 * len(latencies)) - 1)] * 1000, 1)
+        }
+        results.append(result)
+        print(f"✅ {split['workers']} worker(s) x {split['threads_per_worker']} thread(s): "
+              f"{result['throughput_per_s']}/s, p95 {result['p95_ms']} ms")
+
+    best_throughput = max(r['throughput_per_s'] for r in results)
+    recommended = min(
+        (r for r in results if r['throughput_per_s'] >= 0.95 * best_throughput),
+        key=lambda r: r['p95_ms']
+    )
+    return {
+        'cpus': cpus,
+        'tasks': total_tasks,
+        'results': results,
+        'recommended': {
+            'GUNICORN_WORKERS': recommended['workers'],
+            'THREADS_PER_WORKER': recommended['threads_per_worker']
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show or autotune the CPU thread budget')
+    parser.add_argument('--autotune', action='store_true', help='benchmark worker x thread splits')
+    parser.add_argument('--cpus', type=int, default=None, help='CPUs to split (default: available)')
+    parser.add_argument('--tasks-per-worker', type=int, default=8)
+    parser.add_argument('--out', help='write the autotune report to this JSON file')
+    args = parser.parse_args()
+
+    if not args.autotune:
+        print(json.dumps(ThreadBudget.from_env().to_dict(), indent=2))
+        return
+
+    report = autotune(cpus=args.cpus, tasks_per_worker=args.tasks_per_worker)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+    print(f"✅ Recommended: {report['recommended']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Columnar response encodings selected by the Accept header
+
+JSON records stay the default. Clients may instead ask for:
+
+* ``application/vnd.growthiq.columnar+json``: one JSON array per column
+  (keys are not repeated per row)
+* ``application/vnd.apache.arrow.stream``: an Arrow IPC stream, only offered
+  when pyarrow is installed; response metadata is stored in the schema
+  metadata under ``growthiq``
+
+Both are built straight from NumPy column arrays, without per-row Python
+objects.
+"""
+import json
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+from services.forecast_store import FORECAST_COLUMNS
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+JSON_MIMETYPE = 'application/json'
+COLUMNAR_JSON_MIMETYPE = 'application/vnd.growthiq.columnar+json'
+ARROW_STREAM_MIMETYPE = 'application/vnd.apache.arrow.stream'
+
+
+def available_mimetypes() -> List[str]:
+    """Response types this server can produce, default first"""
+    mimetypes = [JSON_MIMETYPE, COLUMNAR_JSON_MIMETYPE]
+    if pa is not None:
+        mimetypes.append(ARROW_STREAM_MIMETYPE)
+    return mimetypes
+
+
+def negotiate(accept) -> str:
+    """
+    Pick the response type for a request
+
+    Args:
+        accept: The request's parsed Accept header (``request.accept_mimetypes``)
+
+    Returns:
+        One of :func:`available_mimetypes`; JSON when nothing better is accepted
+    """
+    return accept.best_match(available_mimetypes(), default=JSON_MIMETYPE) or JSON_MIMETYPE
+
+
+def records_to_columns(records: List[Dict], names: List[str]) -> Dict[str, np.ndarray]:
+    """Column arrays from forecast records (bounded by the forecast horizon)"""
+    columns = {'date': np.array([r['date'] for r in records], dtype='datetime64[D]')}
+    for name in names:
+        if records and name in records[0]:
+            columns[name] = np.array([r[name] for r in records], dtype=float)
+    return columns
+
+
+def forecast_columns(forecasts: List[Dict]) -> Dict[str, np.ndarray]:
+    """Column arrays of forecast records, including confidence bounds when present"""
+    return records_to_columns(forecasts, FORECAST_COLUMNS + ['lower_bound', 'upper_bound'])
+
+
+def _json_column(values: np.ndarray) -> list:
+    if np.issubdtype(values.dtype, np.datetime64):
+        return np.datetime_as_string(values, unit='D').tolist()
+    return values.tolist()
+
+
+def columnar_json(columns: Dict[str, np.ndarray], meta: Dict) -> str:
+    """Encode columns as ``{..meta, format, length, columns: {name: [...]}}``"""
+    length = len(next(iter(columns.values()))) if columns else 0
+    return json.dumps({
+        **meta,
+        'format': 'columnar',
+        'length': length,
+        'columns': {name: _json_column(values) for name, values in columns.items()}
+    }, default=str)
+
+
+def arrow_stream(columns: Dict[str, np.ndarray], meta: Dict) -> bytes:
+    """Encode columns as an Arrow IPC stream (dates as date32)"""
+    if pa is None:
+        raise ImportError("pyarrow is required for Arrow responses")
+
+    table = pa.table({name: pa.array(values) for name, values in columns.items()})
+    table = table.replace_schema_metadata({'growthiq': json.dumps(meta, default=str)})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_columns(columns: Dict[str, np.ndarray], meta: Dict, mimetype: str) -> Tuple[Union[str, bytes], str]:
+    """
+    Encode columns in a negotiated columnar type
+
+    Returns:
+        Tuple of (body, mimetype)
+    """
+    if mimetype == ARROW_STREAM_MIMETYPE:
+        return arrow_stream(columns, meta), ARROW_STREAM_MIMETYPE
+    return columnar_json(columns, meta), COLUMNAR_JSON_MIMETYPE
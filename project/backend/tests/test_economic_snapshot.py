@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.economic_snapshot import EconomicSnapshotService, REVISION_OVERLAP_DAYS
+from services.fred_service import FREDDataService, RECESSION_INDICATORS
+
+# FRED code -> (date frequency, level, noise) of the fake observations; levels
+# sit on the recession score thresholds so revisions move the score
+FAKE_SERIES = {
+    'RECPROUSM156N': ('MS', 20.0, 15.0),
+    'T10Y2Y': ('B', 0.0, 0.5),
+    'UNRATE': ('MS', 5.0, 0.4),
+    'ICSA': ('W-SAT', 400000.0, 30000.0),
+}
+
+
+class RevisableFredClient:
+    """Fake FRED client whose observations a test can revise or extend
+
+    Only observations up to ``published_until`` are served, so moving it
+    forward publishes new data points.
+    """
+
+    def __init__(self, seed: int = 7):
+        rng = np.random.default_rng(seed)
+        end = pd.Timestamp.now().normalize()
+        specs = dict(FAKE_SERIES)
+        for code in FREDDataService(fred_client=self).indicators.values():
+            specs.setdefault(code, ('MS', 100.0, 5.0))
+        self.series = {}
+        for code, (freq, level, noise) in specs.items():
+            dates = pd.date_range(end - pd.DateOffset(years=6), end, freq=freq)
+            self.series[code] = pd.Series(level + rng.normal(0, noise, len(dates)), index=dates)
+        self.published_until = end - pd.Timedelta(days=60)
+        self.calls = []
+
+    def get_series(self, series_id, start=None, end=None, **kwargs):
+        self.calls.append((series_id, pd.Timestamp(start)))
+        values = self.series[series_id]
+        window = (values.index >= pd.Timestamp(start)) & (values.index <= pd.Timestamp(end))
+        return values[window & (values.index <= self.published_until)]
+
+    def revise(self, code: str, days_back: int, delta: float):
+        """Shift the published observations of the last ``days_back`` days"""
+        values = self.series[code]
+        recent = (values.index > self.published_until - pd.Timedelta(days=days_back)) & \
+                 (values.index <= self.published_until)
+        values[recent] += delta
+
+
+def snapshot_service(client):
+    return EconomicSnapshotService(FREDDataService(fred_client=client))
+
+
+def assert_same_snapshot(incremental, full):
+    pd.testing.assert_frame_equal(incremental._recession, full._recession)
+    assert incremental._indicators == full._indicators
+    for code, values in full._series.items():
+        pd.testing.assert_series_equal(incremental._series[code], values, check_names=False)
+
+
+@pytest.mark.parametrize('code', list(RECESSION_INDICATORS.values()))
+def test_incremental_rescore_matches_full_recompute(code):
+    client = RevisableFredClient()
+    service = snapshot_service(client)
+    service.refresh()
+    before = service._recession.copy()
+    last_known = {fetched: values.index[-1] for fetched, values in service._series.items()}
+
+    # Revise recent observations of one input and publish new ones for all
+    client.revise(code, days_back=45, delta=FAKE_SERIES[code][2] * 3)
+    client.published_until += pd.Timedelta(days=40)
+    client.calls.clear()
+    changed = service.refresh()
+
+    assert code in changed
+    # Only the tail from each series' last known date minus the overlap is fetched
+    for fetched, start in client.calls:
+        assert start == last_known[fetched] - pd.Timedelta(days=REVISION_OVERLAP_DAYS)
+
+    full = snapshot_service(client)
+    full.refresh()
+    assert_same_snapshot(service, full)
+    assert not service._recession.equals(before)
+
+
+def test_refresh_without_changes_keeps_scores():
+    client = RevisableFredClient()
+    service = snapshot_service(client)
+    service.refresh()
+    before = service._recession
+
+    assert service.refresh() == []
+    assert service._recession is before
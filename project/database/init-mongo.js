@@ -5,18 +5,26 @@
 db = db.getSiblingDB('growthiq');
 
 // Create collections with validation schemas
+// Forecasts are stored one document per run (_id = run ID) with columnar
+// arrays holding one entry per forecast month. Runs are unique by content
+// hash; repeated identical requests only add an entry to forecast_runs.
 db.createCollection('forecasts', {
   validator: {
     $jsonSchema: {
       bsonType: 'object',
-      required: ['date', 'forecasted_revenue', 'growth_5', 'growth_10', 'decline_5', 'model_type', 'created_at'],
+      required: ['_id', 'content_hash', 'model_type', 'periods', 'dates', 'forecasted_revenue', 'growth_5', 'growth_10', 'decline_5', 'created_at'],
       properties: {
-        date: { bsonType: 'date' },
-        forecasted_revenue: { bsonType: 'number' },
-        growth_5: { bsonType: 'number' },
-        growth_10: { bsonType: 'number' },
-        decline_5: { bsonType: 'number' },
+        _id: { bsonType: 'string' },
+        content_hash: { bsonType: 'string' },
         model_type: { bsonType: 'string', enum: ['lstm', 'sarima'] },
+        periods: { bsonType: 'int' },
+        dates: { bsonType: 'array', items: { bsonType: 'date' } },
+        forecasted_revenue: { bsonType: 'array', items: { bsonType: 'number' } },
+        growth_5: { bsonType: 'array', items: { bsonType: 'number' } },
+        growth_10: { bsonType: 'array', items: { bsonType: 'number' } },
+        decline_5: { bsonType: 'array', items: { bsonType: 'number' } },
+        access_count: { bsonType: 'int' },
+        last_accessed_at: { bsonType: 'date' },
         created_at: { bsonType: 'date' }
       }
     }
@@ -27,17 +35,40 @@ db.createCollection('forecast_runs', {
   validator: {
     $jsonSchema: {
       bsonType: 'object',
-      required: ['model_type', 'forecast_data', 'created_at'],
+      required: ['run_id', 'model_type', 'created_at'],
       properties: {
+        run_id: { bsonType: 'string' },
+        content_hash: { bsonType: 'string' },
         model_type: { bsonType: 'string', enum: ['lstm', 'sarima'] },
-        forecast_data: { bsonType: 'array' },
+        periods: { bsonType: 'int' },
         user_id: { bsonType: 'string' },
+        reused: { bsonType: 'bool' },
         created_at: { bsonType: 'date' }
       }
     }
   }
 });
 
+// Daily compaction of forecast history: one document per (day, model, target month)
+db.createCollection('forecast_rollups', {
+  validator: {
+    $jsonSchema: {
+      bsonType: 'object',
+      required: ['day', 'model_type', 'target_date', 'runs', 'mean'],
+      properties: {
+        day: { bsonType: 'date' },
+        model_type: { bsonType: 'string', enum: ['lstm', 'sarima'] },
+        target_date: { bsonType: 'date' },
+        runs: { bsonType: 'int' },
+        mean: { bsonType: 'number' },
+        min: { bsonType: 'number' },
+        max: { bsonType: 'number' },
+        std: { bsonType: 'number' }
+      }
+    }
+  }
+});
+
 db.createCollection('model_metrics', {
   validator: {
     $jsonSchema: {
@@ -111,12 +142,21 @@ db.createCollection('users', {
 });
 
 // Create indexes for better performance
-db.forecasts.createIndex({ 'date': 1 });
-db.forecasts.createIndex({ 'model_type': 1 });
-db.forecasts.createIndex({ 'created_at': -1 });
+// Latest run for a model is a single indexed point read
+db.forecasts.createIndex({ 'model_type': 1, 'created_at': -1 }, { name: 'model_type_created_at' });
+db.forecasts.createIndex({ 'content_hash': 1 }, { name: 'content_hash', unique: true });
+
+db.forecast_runs.createIndex({ 'model_type': 1, 'created_at': -1 }, { name: 'model_type_created_at' });
+db.forecast_runs.createIndex({ 'run_id': 1 }, { name: 'run_id' });
+
+// Retention: TTL expiry of raw history (defaults match FORECAST_RETENTION_DAYS=90,
+// FORECAST_RUN_LOG_RETENTION_DAYS=30, UPLOAD_RETENTION_DAYS=365; the API updates
+// them via collMod when the configured windows differ)
+db.forecasts.createIndex({ 'last_accessed_at': 1 }, { name: 'last_accessed_at_ttl', expireAfterSeconds: 90 * 24 * 3600 });
+db.forecast_runs.createIndex({ 'created_at': 1 }, { name: 'created_at_ttl', expireAfterSeconds: 30 * 24 * 3600 });
 
-db.forecast_runs.createIndex({ 'model_type': 1 });
-db.forecast_runs.createIndex({ 'created_at': -1 });
+db.forecast_rollups.createIndex({ 'model_type': 1, 'target_date': 1, 'day': 1 }, { name: 'model_type_target_date_day' });
+db.forecast_rollups.createIndex({ 'model_type': 1, 'day': 1 }, { name: 'model_type_day' });
 
 db.model_metrics.createIndex({ 'model_type': 1 });
 db.model_metrics.createIndex({ 'created_at': -1 });
@@ -124,7 +164,7 @@ db.model_metrics.createIndex({ 'created_at': -1 });
 db.training_data.createIndex({ 'date': 1 }, { unique: true });
 db.training_data.createIndex({ 'is_validated': 1 });
 
-db.uploads.createIndex({ 'created_at': -1 });
+db.uploads.createIndex({ 'created_at': 1 }, { name: 'created_at_ttl', expireAfterSeconds: 365 * 24 * 3600 });
 
 db.users.createIndex({ 'email': 1 }, { unique: true });
 
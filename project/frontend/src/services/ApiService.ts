@@ -19,15 +19,71 @@ export interface ScenarioData {
   description: string;
 }
 
+export interface ModelComparisonEntry {
+  forecasts: ForecastData['forecasts'];
+  run_id: string | null;
+  metrics: Partial<ModelMetrics>;
+  backtest_rmse: number | null;
+  weight: number;
+}
+
+export interface ForecastComparison {
+  periods: number;
+  models: Record<'sarima' | 'lstm', ModelComparisonEntry>;
+  ensemble: {
+    forecasts: ForecastData['forecasts'];
+    weights: Record<'sarima' | 'lstm', number>;
+  };
+  generated_at: string;
+  version: string;
+}
+
+// Compact columnar JSON: one array per field instead of one object per row
+const COLUMNAR_JSON = 'application/vnd.growthiq.columnar+json';
+const COLUMNAR_ACCEPT = `${COLUMNAR_JSON}, application/json;q=0.9`;
+
+interface ColumnarPayload {
+  format: 'columnar';
+  length: number;
+  columns: Record<string, unknown[]>;
+  [field: string]: unknown;
+}
+
+function rowsFromColumns<T>({ columns, length }: ColumnarPayload): T[] {
+  const names = Object.keys(columns);
+  const rows = new Array<T>(length);
+  for (let i = 0; i < length; i++) {
+    const row: Record<string, unknown> = {};
+    for (const name of names) {
+      row[name] = columns[name][i];
+    }
+    rows[i] = row as T;
+  }
+  return rows;
+}
+
+function isColumnar(response: Response): boolean {
+  return (response.headers.get('Content-Type') || '').startsWith(COLUMNAR_JSON);
+}
+
 export class ApiService {
   private static baseUrl = 'http://localhost:5000/api';
   
   static async getForecast(model: 'sarima' | 'lstm', periods: number = 12): Promise<ForecastData> {
     try {
-      const response = await fetch(`${this.baseUrl}/forecast?model=${model}&periods=${periods}`);
+      const response = await fetch(`${this.baseUrl}/forecast?model=${model}&periods=${periods}`, {
+        headers: { Accept: COLUMNAR_ACCEPT },
+      });
       if (!response.ok) {
         throw new Error(`HTTP error! status: ${response.status}`);
       }
+      if (isColumnar(response)) {
+        const { columns, length, format, ...meta } = await response.json();
+        return {
+          ...meta,
+          forecasts: rowsFromColumns<ForecastData['forecasts'][number]>({ columns, length, format }),
+        } as ForecastData;
+      }
       return await response.json();
     } catch (error) {
       console.error('Error fetching forecast:', error);
@@ -35,6 +91,50 @@ export class ApiService {
     }
   }
   
+  static async getForecastComparison(periods: number = 12): Promise<ForecastComparison> {
+    try {
+      // Both models run concurrently on the server in a single request
+      const response = await fetch(`${this.baseUrl}/forecast/compare?periods=${periods}`);
+      if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+      }
+      return await response.json();
+    } catch (error) {
+      console.error('Error fetching forecast comparison:', error);
+      throw error;
+    }
+  }
+  
+  static streamForecast(
+    model: 'sarima' | 'lstm',
+    periods: number,
+    onPoints: (points: ForecastData['forecasts'], offset: number) => void,
+    onDone?: (runId: string | null) => void,
+    onError?: (error: Error) => void
+  ): () => void {
+    // Points arrive as each forecast step completes, so charts can render progressively
+    const source = new EventSource(`${this.baseUrl}/forecast/stream?model=${model}&periods=${periods}`);
+    
+    source.addEventListener('points', (event) => {
+      const data = JSON.parse((event as MessageEvent).data);
+      onPoints(data.forecasts, data.offset);
+    });
+    source.addEventListener('done', (event) => {
+      source.close();
+      onDone?.(JSON.parse((event as MessageEvent).data).run_id ?? null);
+    });
+    source.addEventListener('error', (event) => {
+      // Fired both for server-sent error events and for connection failures
+      source.close();
+      const data = (event as MessageEvent).data;
+      const error = new Error(data ? JSON.parse(data).error : 'Forecast stream failed');
+      console.error('Error streaming forecast:', error);
+      onError?.(error);
+    });
+    
+    return () => source.close();
+  }
+  
   static async getMetrics(): Promise<ModelMetrics[]> {
     try {
       const response = await fetch(`${this.baseUrl}/metrics`);
@@ -51,12 +151,14 @@ export class ApiService {
   
   static async getHistoricalData(): Promise<HistoricalData[]> {
     try {
-      const response = await fetch(`${this.baseUrl}/historical`);
+      const response = await fetch(`${this.baseUrl}/historical`, {
+        headers: { Accept: COLUMNAR_ACCEPT },
+      });
       if (!response.ok) {
         throw new Error(`HTTP error! status: ${response.status}`);
       }
       const data = await response.json();
-      return data.historical_data;
+      return isColumnar(response) ? rowsFromColumns<HistoricalData>(data) : data.historical_data;
     } catch (error) {
       console.error('Error fetching historical data:', error);
       throw error;